@@ -0,0 +1,226 @@
+"""
+Benchmarks NotamFetcher.fetch_notams_by_airport_code and fetch_notams_by_latlong against
+the local stand-in API (benchmarks/fake_api.py), over real HTTP.
+
+Each method runs in its own process, so its peak RSS is its own. Reported per method:
+pages/s, NOTAMs/s, p50/p99 latency of single pages and of whole fetch calls, errors and peak RSS.
+
+The results are written as JSON. Passing an earlier results file with --compare prints
+the change of every metric and exits with status 1 if any got worse by more than --tolerance.
+
+Usage:
+    python -m benchmarks.bench_fetch [--pages 10] [--page-size 1000] [--calls 5] [--workers 1] [--parse-workers 0]
+        [--latency 0.0] [--error-rate 0.0] [--rate-limit-rate 0.0]
+        [--output bench_results/fetch.json] [--compare bench_results/baseline.json]
+"""
+
+import argparse
+import json
+import math
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable
+
+from notam_fetcher import NotamFetcher, NotamFetcherBaseError
+from notam_fetcher.metrics import FetchHooks, PageEvent
+
+from .fake_api import FakeNotamApi, FakeNotamApiConfig
+
+METHODS = ("fetch_notams_by_airport_code", "fetch_notams_by_latlong")
+
+# Metrics where a higher value is better. For every other metric lower is better.
+HIGHER_IS_BETTER = {"pages_per_second", "notams_per_second"}
+COMPARED_METRICS = (
+    "pages_per_second",
+    "notams_per_second",
+    "page_latency_p50_ms",
+    "page_latency_p99_ms",
+    "call_latency_p50_ms",
+    "call_latency_p99_ms",
+    "peak_rss_mib",
+)
+
+
+class _PageLatencies(FetchHooks):
+    """Records how long the requests of each page take, from sending the first to receiving the body of the last."""
+
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+
+    def on_page(self, event: PageEvent) -> None:
+        self.latencies.append(event.request_seconds)
+
+
+def _run_method(
+    method: str, url: str, calls: int, page_size: int, workers: int, parse_workers: int
+) -> dict[str, Any]:
+    """Runs one method calls times in this process and returns its metrics."""
+    page_latencies = _PageLatencies()
+    fetcher = NotamFetcher(
+        "CLIENT_ID",
+        "CLIENT_SECRET",
+        page_size=page_size,
+        max_workers=workers,
+        parse_workers=parse_workers,
+        hooks=[page_latencies],
+    )
+    fetcher.FAA_API_URL = url
+    fetch: Callable[[], list] = {
+        "fetch_notams_by_airport_code": lambda: fetcher.fetch_notams_by_airport_code("ORD"),
+        "fetch_notams_by_latlong": lambda: fetcher.fetch_notams_by_latlong(41.98, -87.90, 50),
+    }[method]
+
+    # Warm up connections and imports
+    try:
+        fetch()
+    except NotamFetcherBaseError:
+        pass
+    page_latencies.latencies.clear()
+
+    call_latencies: list[float] = []
+    notams = errors = 0
+    start = time.perf_counter()
+    for _ in range(calls):
+        call_start = time.perf_counter()
+        try:
+            notams += len(fetch())
+        except NotamFetcherBaseError:
+            errors += 1
+        call_latencies.append(time.perf_counter() - call_start)
+    seconds = time.perf_counter() - start
+    fetcher.close()
+
+    pages = len(page_latencies.latencies)
+    return {
+        "calls": calls,
+        "pages": pages,
+        "notams": notams,
+        "errors": errors,
+        "seconds": seconds,
+        "pages_per_second": pages / seconds,
+        "notams_per_second": notams / seconds,
+        "page_latency_p50_ms": _percentile(page_latencies.latencies, 50) * 1000,
+        "page_latency_p99_ms": _percentile(page_latencies.latencies, 99) * 1000,
+        "call_latency_p50_ms": _percentile(call_latencies, 50) * 1000,
+        "call_latency_p99_ms": _percentile(call_latencies, 99) * 1000,
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    }
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """The nearest-rank percentile of values, or NaN if there are none."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """
+    Prints the change of every metric from baseline to results.
+
+    Returns:
+        Regressions (list[str]): The "method metric" of every metric that got worse by more than tolerance
+    """
+    regressions = []
+    for method, metrics in results["results"].items():
+        baseline_metrics = baseline["results"].get(method)
+        if baseline_metrics is None:
+            continue
+        print(method)
+        for metric in COMPARED_METRICS:
+            old, new = baseline_metrics.get(metric), metrics.get(metric)
+            if not old or new is None or math.isnan(old) or math.isnan(new):
+                continue
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = " REGRESSION" if worse > tolerance else ""
+            print(f"  {metric:>22}: {old:12.2f} -> {new:12.2f} ({change:+.1%}){flag}")
+            if flag:
+                regressions.append(f"{method} {metric}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10, help="pages per query")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--calls", type=int, default=5, help="fetch calls per method")
+    parser.add_argument("--workers", type=int, default=1, help="NotamFetcher max_workers")
+    parser.add_argument("--parse-workers", type=int, default=0, help="NotamFetcher parse_workers")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--no-gzip", action="store_true")
+    parser.add_argument("--output", type=Path, default=Path("bench_results/fetch.json"))
+    parser.add_argument("--compare", type=Path, help="an earlier results file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="the change counted as a regression")
+    args = parser.parse_args()
+
+    config = FakeNotamApiConfig(
+        total_pages=args.pages,
+        page_size=args.page_size,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        gzip=not args.no_gzip,
+    )
+    results: dict[str, Any] = {
+        "benchmark": "fetch",
+        "created": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"api": asdict(config), "calls": args.calls, "workers": args.workers, "parse_workers": args.parse_workers},
+        "results": {},
+    }
+
+    with FakeNotamApi(config) as api:
+        for method in METHODS:
+            # A fresh process per method, so peak RSS is not carried over
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                metrics = executor.submit(
+                    _run_method, method, api.url, args.calls, args.page_size, args.workers, args.parse_workers
+                ).result()
+            results["results"][method] = metrics
+            print(
+                f"{method}: {metrics['pages_per_second']:.1f} pages/s, "
+                f"{metrics['notams_per_second']:.0f} NOTAMs/s, "
+                f"page p50 {metrics['page_latency_p50_ms']:.1f} ms, p99 {metrics['page_latency_p99_ms']:.1f} ms, "
+                f"errors {metrics['errors']}/{metrics['calls']}, peak RSS {metrics['peak_rss_mib']:.0f} MiB"
+            )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Results written to {args.output}")
+
+    if args.compare is not None:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Compares the ways of validating an API page into a NotamAPIResponse.
+
+  - python: response.json() then NotamAPIResponse.model_validate, the original path
+  - bytes:  NotamAPIResponse.model_validate_json on the raw body, the current path
+
+Usage:
+    python -m benchmarks.bench_parse [--page-size 1000] [--repeat 20]
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Callable
+
+from notam_fetcher.api_schema import NotamAPIResponse
+from notam_fetcher.response import parse_response_content
+
+from .synthetic_data import make_page
+
+
+def _time(function: Callable[[], object], repeat: int) -> list[float]:
+    function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    content = json.dumps(make_page(1, 1, args.page_size)).encode()
+    paths: dict[str, Callable[[], object]] = {
+        "python": lambda: NotamAPIResponse.model_validate(json.loads(content)),
+        "bytes": lambda: parse_response_content(content),
+    }
+
+    print(f"page of {args.page_size} items, {len(content) / 1024:.0f} KiB, best/median of {args.repeat}")
+    for name, function in paths.items():
+        timings = _time(function, args.repeat)
+        print(f"{name:>8}: {min(timings) * 1000:8.2f} ms {statistics.median(timings) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
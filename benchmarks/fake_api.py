@@ -0,0 +1,226 @@
+"""
+A local stand-in for the FAA NOTAM API (https://external-api.faa.gov/notamapi/v1/notams),
+serving synthetic pages over real HTTP.
+
+Every query gets total_pages pages of page_size items (or the page_size it asks for), with
+data derived from the query, so repeated runs see the same bytes. Latency, server errors
+and 429 responses can be injected to see how the fetchers cope.
+
+Usage:
+    python -m benchmarks.fake_api [--port 8080] [--pages 5] [--latency 0.05] [--error-rate 0.01]
+
+Example:
+    with FakeNotamApi(FakeNotamApiConfig(total_pages=5)) as api:
+        notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET")
+        notam_fetcher.FAA_API_URL = api.url
+        notam_fetcher.fetch_notams_by_airport_code("ORD")
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from .synthetic_data import make_page
+
+API_PATH = "/notamapi/v1/notams"
+
+
+@dataclass(frozen=True)
+class FakeNotamApiConfig:
+    """
+    Args:
+        total_pages (int): The number of pages of every query
+        page_size (int): The number of items per page, when the request does not set page_size
+        latency (float): Seconds to wait before answering each request
+        latency_jitter (float): Up to this many seconds are added to latency at random
+        error_rate (float): The fraction of requests answered with a 500 error
+        rate_limit_rate (float): The fraction of requests answered with a 429 error
+        retry_after (int): The Retry-After header of 429 responses, in seconds
+        gzip (bool): Compress responses for clients that accept gzip, as the FAA API does
+        seed (int): Changes the data of every query
+    """
+
+    total_pages: int = 5
+    page_size: int = 1000
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: int = 1
+    gzip: bool = True
+    seed: int = 0
+
+
+@dataclass
+class FakeNotamApiStats:
+    """Counts of the responses sent, by kind."""
+
+    pages: int = 0
+    items: int = 0
+    bytes_sent: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    unauthenticated: int = 0
+
+
+class FakeNotamApi:
+    """A FakeNotamApiConfig served on a background thread. Use as a context manager."""
+
+    def __init__(self, config: Optional[FakeNotamApiConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            config (FakeNotamApiConfig, optional): What to serve. Defaults to FakeNotamApiConfig().
+            host (str): The address to listen on
+            port (int): The port to listen on. 0 picks a free port, see url.
+        """
+        self.config = config if config is not None else FakeNotamApiConfig()
+        self.stats = FakeNotamApiStats()
+        self._stats_lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """The URL to use as NotamFetcher.FAA_API_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PATH}"
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def __enter__(self) -> "FakeNotamApi":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _respond(self, query: dict[str, str], headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+        """Returns the status, headers and body of the response to a request."""
+        config = self.config
+        delay = config.latency
+        with self._stats_lock:
+            roll = self._random.random()
+            if config.latency_jitter:
+                delay += self._random.uniform(0, config.latency_jitter)
+        if delay:
+            time.sleep(delay)
+
+        if not headers.get("client_id") or not headers.get("client_secret"):
+            self._count(unauthenticated=1)
+            return 401, {}, json.dumps({"error": "Invalid client id or secret"}).encode()
+        if roll < config.rate_limit_rate:
+            self._count(rate_limited=1)
+            return 429, {"Retry-After": str(config.retry_after)}, json.dumps({"error": "Too Many Requests"}).encode()
+        if roll < config.rate_limit_rate + config.error_rate:
+            self._count(errors=1)
+            return 500, {}, json.dumps({"error": "Internal Server Error"}).encode()
+
+        page_num = int(query.pop("page_num", "1"))
+        page_size = int(query.pop("page_size", str(config.page_size)))
+        # Equal queries get equal data, whatever the order of their parameters
+        query_seed = zlib.crc32(json.dumps(sorted(query.items())).encode()) ^ config.seed
+        accepts_gzip = config.gzip and "gzip" in headers.get("accept-encoding", "")
+        body, item_count = _page_body(page_num, config.total_pages, page_size, query_seed, accepts_gzip)
+        self._count(pages=1, items=item_count, bytes_sent=len(body))
+        response_headers = {"Content-Encoding": "gzip"} if accepts_gzip else {}
+        return 200, response_headers, body
+
+    def _count(self, **counts: int) -> None:
+        with self._stats_lock:
+            for name, count in counts.items():
+                setattr(self.stats, name, getattr(self.stats, name) + count)
+
+
+@lru_cache(maxsize=256)
+def _page_body(page_num: int, total_pages: int, page_size: int, seed: int, compress: bool) -> tuple[bytes, int]:
+    """Returns the encoded body of a page and its number of items. Pages past the last are empty."""
+    page = make_page(page_num, total_pages, page_size, seed=seed)
+    body = json.dumps(page).encode()
+    return (gzip.compress(body, compresslevel=6) if compress else body), len(page["items"])
+
+
+def _make_handler(api: FakeNotamApi) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately, which Nagle's algorithm would delay on kept-alive connections
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            if url.path != API_PATH:
+                self._send(404, {}, json.dumps({"error": "Not Found"}).encode())
+                return
+            headers = {name.lower(): value for name, value in self.headers.items()}
+            self._send(*api._respond(dict(parse_qsl(url.query)), headers))
+
+        def _send(self, status: int, headers: dict[str, str], body: bytes) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--no-gzip", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeNotamApiConfig(
+        total_pages=args.pages,
+        page_size=args.page_size,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        gzip=not args.no_gzip,
+        seed=args.seed,
+    )
+    api = FakeNotamApi(config, args.host, args.port)
+    print(f"Serving {api.url}")
+    try:
+        api.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
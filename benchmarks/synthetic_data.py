@@ -0,0 +1,117 @@
+"""
+Synthetic FAA NOTAM API responses, shaped like the example in notam_fetcher/api_schema.py.
+
+The data is deterministic for a given seed so benchmark runs can be compared.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+SELECTION_CODES = ["QMRLC", "QOBCE", "QMXLC", "QFAAH", "QCBLS", "QRTCA", "QNVAS", "QPIAU", "QLRAS", "QWULW"]
+CLASSIFICATIONS = ["DOM", "INTL", "FDC", "MIL", "LMIL"]
+LOCATIONS = ["ORD", "ATL", "DFW", "DEN", "LAX", "JFK", "SFO", "SEA", "MIA", "ZJX", "ZAU", "ZTL"]
+TEXT_WORDS = ["RWY", "TWY", "CLSD", "OBST", "TOWER", "LGT", "U/S", "AD", "AP", "ILS", "NOT", "AVBL", "DUE", "WIP", "ACFT", "AGL", "MSL"]
+EPOCH = datetime(2024, 10, 1, tzinfo=timezone.utc)
+
+
+def _timestamp(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def make_item(index: int, rng: random.Random) -> dict[str, Any]:
+    """Builds one NOTAM item. The item id is derived from index, everything else from rng."""
+    location = rng.choice(LOCATIONS)
+    selection_code = rng.choice(SELECTION_CODES)
+    issued = EPOCH + timedelta(minutes=rng.randrange(0, 60 * 24 * 30))
+    effective_start = issued + timedelta(minutes=rng.randrange(0, 60 * 24))
+    effective_end = (
+        "PERM"
+        if rng.random() < 0.1
+        else _timestamp(effective_start + timedelta(hours=rng.randrange(1, 24 * 60)))
+    )
+    text = " ".join(rng.choice(TEXT_WORDS) for _ in range(rng.randrange(8, 60)))
+    lat = rng.uniform(25, 49)
+    long = rng.uniform(-124, -67)
+    radius = rng.randrange(1, 50)
+    qline_position = (
+        f"{int(lat):02d}{int(lat % 1 * 60):02d}N{int(-long):03d}{int(-long % 1 * 60):02d}W{radius:03d}"
+    )
+    number = f"A{index % 10000:04d}/24"
+    return {
+        "type": "Feature",
+        "properties": {
+            "coreNOTAMData": {
+                "notamEvent": {"scenario": "6000"},
+                "notam": {
+                    "id": f"NOTAM_1_{70000000 + index}",
+                    "series": "A",
+                    "number": number,
+                    "type": "N",
+                    "issued": _timestamp(issued),
+                    "affectedFIR": f"K{location}",
+                    "selectionCode": selection_code,
+                    "minimumFL": "000",
+                    "maximumFL": f"{rng.randrange(10, 999):03d}",
+                    "location": location,
+                    "effectiveStart": _timestamp(effective_start),
+                    "effectiveEnd": effective_end,
+                    "text": text,
+                    "classification": rng.choice(CLASSIFICATIONS),
+                    "accountId": f"K{location}",
+                    "lastUpdated": _timestamp(issued),
+                    "icaoLocation": f"K{location}",
+                    "coordinates": qline_position,
+                    "radius": f"{radius:03d}",
+                    "lowerLimit": "SFC",
+                    "upperLimit": "3999FT.",
+                },
+                "notamTranslation": [
+                    {
+                        "type": "LOCAL_FORMAT",
+                        "simpleText": f"!{location} {number} {location} {text}",
+                    },
+                    {
+                        "type": "ICAO",
+                        "formattedText": (
+                            f"{number} NOTAMN\n"
+                            f"Q) K{location}/{selection_code}/IV/NBO/A/000/{rng.randrange(10, 999):03d}/{qline_position}\n"
+                            f"A) K{location}\n"
+                            f"B) {effective_start:%y%m%d%H%M}\n"
+                            f"C) {'PERM' if effective_end == 'PERM' else effective_end[2:4] + effective_end[5:7] + effective_end[8:10] + effective_end[11:13] + effective_end[14:16]}\n"
+                            f"E) {text}\n"
+                            "F) SFC   G) 3999FT."
+                        ),
+                    },
+                ],
+            }
+        },
+        "geometry": {"type": "Point", "coordinates": [round(long, 4), round(lat, 4)]},
+    }
+
+
+def make_page(
+    page_num: int, total_pages: int, page_size: int, total_count: int | None = None, seed: int = 0
+) -> dict[str, Any]:
+    """
+    Builds one page of a response. Item ids are unique across the pages of a query.
+
+    Args:
+        page_num (int): The page number (min: 1)
+        total_pages (int): The number of pages of the query
+        page_size (int): The number of items per page
+        total_count (int, optional): The number of items of the query. Defaults to a full last page.
+        seed (int): The seed of the query. Equal seeds give equal data.
+    """
+    if total_count is None:
+        total_count = total_pages * page_size
+    first_index = (page_num - 1) * page_size
+    item_count = max(0, min(page_size, total_count - first_index))
+    rng = random.Random(seed * 1_000_003 + page_num)
+    return {
+        "pageSize": page_size,
+        "pageNum": page_num,
+        "totalCount": total_count,
+        "totalPages": total_pages,
+        "items": [make_item(first_index + i, rng) for i in range(item_count)],
+    }
@@ -1,5 +1,21 @@
 from .notam_fetcher import NotamFetcher
-from .exceptions import NotamFetcherRequestError, NotamFetcherUnauthenticatedError, NotamFetcherUnexpectedError, NotamFetcherBaseError, NotamFetcherValidationError
+from .async_notam_fetcher import AsyncNotamFetcher
+from .cache import NotamCache, MemoryNotamCache, SQLiteNotamCache
+from .notam_store import NotamStore, NotamDiff
+from .route import Airport
+from .notam_table import NotamTable
+from .table_file import NotamTableFile, write_table_file
+from .spatial_index import NotamSpatialIndex, NotamGeometry
+from .interval_index import NotamIntervalIndex
+from .priority import NotamPrioritizer, PriorityRules
+from .scheduler import RequestScheduler
+from .metrics import FetchHooks, FetchMetrics, JsonlEventLog
+from .archive import NotamArchive, ArchiveReader, ReplaySession
+from .lazy_notam import LazyNotam
+from .icao_text import IcaoNotam, decode_formatted_text, decode_formatted_texts, decode_page
+from .service import NotamService, WatchedFeed, ChangeEvent, make_server
+from .snapshot import SnapshotJob, SnapshotReport, hex_tiling, read_snapshot
+from .exceptions import NotamFetcherRequestError, NotamFetcherUnauthenticatedError, NotamFetcherUnexpectedError, NotamFetcherBaseError, NotamFetcherValidationError, NotamFetcherRateLimitError, NotamFetcherServerError
 
 
-__all__ = ["NotamFetcher", "NotamFetcherRequestError", "NotamFetcherUnauthenticatedError", "NotamFetcherUnexpectedError", "NotamFetcherBaseError", "NotamFetcherValidationError"]
+__all__ = ["NotamFetcher", "AsyncNotamFetcher", "NotamCache", "MemoryNotamCache", "SQLiteNotamCache", "NotamStore", "NotamDiff", "Airport", "NotamTable", "NotamTableFile", "write_table_file", "NotamSpatialIndex", "NotamGeometry", "NotamIntervalIndex", "NotamPrioritizer", "PriorityRules", "RequestScheduler", "FetchHooks", "FetchMetrics", "JsonlEventLog", "NotamArchive", "ArchiveReader", "ReplaySession", "LazyNotam", "IcaoNotam", "decode_formatted_text", "decode_formatted_texts", "decode_page", "NotamService", "WatchedFeed", "ChangeEvent", "make_server", "SnapshotJob", "SnapshotReport", "hex_tiling", "read_snapshot", "NotamFetcherRequestError", "NotamFetcherUnauthenticatedError", "NotamFetcherUnexpectedError", "NotamFetcherBaseError", "NotamFetcherValidationError", "NotamFetcherRateLimitError", "NotamFetcherServerError"]
@@ -55,8 +55,19 @@ Example response:
 
 
 from datetime import datetime
-from typing import Any, Literal, Optional
-from pydantic import BaseModel, ConfigDict, Field, alias_generators
+from typing import Annotated, Any, Literal, Optional
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    TypeAdapter,
+    alias_generators,
+)
+
+from . import effective_time
+
+
+_datetime_adapter = TypeAdapter(datetime)
 
 
 class NotamTranslationObject(BaseModel):
@@ -68,6 +79,8 @@ class LocalFormatTranslationObject(NotamTranslationObject):
     simple_text: str = Field(alias="simpleText")
 
 class ICAOTranslationObject(NotamTranslationObject):
+    """formatted_text is decoded by icao_text.decode_formatted_text and, a page at a time, icao_text.decode_page."""
+
     type: Literal["ICAO"]
     formatted_text: str = Field(alias="formattedText")
 
@@ -84,13 +97,25 @@ class Notam(BaseModel):
     selection_code: Optional[str]
     location: str
     effective_start: datetime
-    effective_end: datetime | str
+    # A string as returned by the API (a date, or e.g. "PERM"), see effective_end_datetime.
+    # Tried in order so JSON validation keeps strings too, as Python validation does
+    effective_end: str | datetime = Field(union_mode="left_to_right")
     text: str
     classification: str
     account_id: str
     last_updated: datetime
     icao_location: str
 
+    @property
+    def effective_end_datetime(self) -> Optional[datetime]:
+        """
+        effective_end as a datetime, or None if the NOTAM has no fixed end (e.g. "PERM").
+
+        The API may return effective_end as a string: ISO 8601 dates are parsed, and an estimated
+        end (a date followed by "EST") is taken as the end. A naive datetime is assumed to be UTC.
+        """
+        return effective_time.effective_end_datetime(self.effective_end)
+
 
 class NotamEvent(BaseModel):
     scenario: str
@@ -99,7 +124,12 @@ class NotamEvent(BaseModel):
 class CoreNotamData(BaseModel):
     notamEvent: NotamEvent
     notam: Notam
-    notamTranslation: list[ICAOTranslationObject | LocalFormatTranslationObject]
+    notamTranslation: list[
+        Annotated[
+            ICAOTranslationObject | LocalFormatTranslationObject,
+            Field(discriminator="type"),
+        ]
+    ]
 
 
 class NotamApiItemProperties(BaseModel):
@@ -130,4 +160,5 @@ class NotamAPIResponse(BaseModel):
     page_num: int
     total_count: int
     total_pages: int
-    items: list[NotamApiItem | OtherResponseItem]
+    # An item that is not a valid NOTAM, whatever its type, is kept as an OtherResponseItem
+    items: list[Annotated[NotamApiItem | OtherResponseItem, Field(union_mode="left_to_right")]]
@@ -0,0 +1,282 @@
+"""
+An append-only archive of raw API pages, and a replay backend reading it instead of the network.
+
+The archive is a JSONL file in which every line is compressed as its own gzip member, so the
+whole file is a valid .jsonl.gz (zcat pages.jsonl.gz) and any page can be decompressed on its
+own. Every line holds the query, status and raw body of one response. An index next to the
+archive ("pages.jsonl.gz.idx") records the offset and length of each line with its cache_key.
+
+Example:
+    with NotamArchive("pages.jsonl.gz") as archive:
+        notam_fetcher = NotamFetcher(CLIENT_ID, CLIENT_SECRET, archive=archive)
+        notam_fetcher.fetch_notams_by_airport_code("ORD")
+
+    # Later, without the network
+    with ArchiveReader("pages.jsonl.gz") as reader:
+        notam_fetcher = NotamFetcher(CLIENT_ID, CLIENT_SECRET, session=ReplaySession(reader))
+        notams = notam_fetcher.fetch_notams_by_airport_code("ORD")
+"""
+
+import gzip
+import json
+import mmap
+import os
+import threading
+import time
+import zlib
+from typing import Any, Iterator, NamedTuple, Optional
+
+from .api_schema import NotamAPIResponse
+from .cache import cache_key
+from .exceptions import NotamFetcherUnexpectedError
+from .response import parse_response_content
+
+
+class ArchiveRecord(NamedTuple):
+    """One archived response."""
+
+    time: float
+    query: dict[str, str]
+    status: int
+    content: bytes
+
+
+class NotamArchive:
+    """Appends raw API responses to an archive. Thread-safe."""
+
+    def __init__(self, path: str, compresslevel: int = 6):
+        """
+        Args:
+            path (str): The archive file, created if missing. The index is written to path + ".idx".
+            compresslevel (int): The gzip compression level of each line, from 1 (fastest) to 9 (smallest)
+        """
+        self.path = path
+        self.index_path = path + ".idx"
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        _repair_index(path, self.index_path)
+        self._file = open(path, "ab")
+        self._index = open(self.index_path, "a", encoding="utf-8")
+
+    def __enter__(self) -> "NotamArchive":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+            self._index.close()
+
+    def append(self, query_string: dict[str, str], status: int, content: bytes) -> None:
+        """Archives one response to the query. The body is kept byte for byte, even if it is not JSON."""
+        line = json.dumps(
+            {
+                "time": time.time(),
+                "query": query_string,
+                "status": status,
+                # surrogateescape keeps bodies that are not UTF-8 as they are
+                "body": content.decode("utf-8", errors="surrogateescape"),
+            }
+        )
+        member = gzip.compress((line + "\n").encode(), compresslevel=self.compresslevel, mtime=0)
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(member)
+            self._file.flush()
+            # The index is written after the page, so it never points past the archive
+            self._index.write(f"{offset}\t{len(member)}\t{cache_key(query_string)}\n")
+            self._index.flush()
+
+
+class ArchiveReader:
+    """
+    Reads an archive through a memory map. Sees the pages archived before it was opened.
+
+    A reader never writes: it can be opened while a NotamArchive appends to the archive.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The archive file
+        """
+        self.path = path
+        self.index_path = path + ".idx"
+        # Read before the archive is mapped, so that every indexed page is in the mapping
+        entries, _ = _read_index(self.index_path)
+
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map: Optional[mmap.mmap] = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+        # A NotamArchive may be writing the archive: the pages it has not indexed yet are found
+        # in the mapping, and neither file is changed. A page cut short is left out.
+        indexed_end = entries[-1][0] + entries[-1][1] if entries else 0
+        if self._map is not None and indexed_end < size:
+            entries.extend(_scan_members(memoryview(self._map)[indexed_end:], indexed_end))
+
+        self._entries: list[tuple[int, int]] = []
+        # The latest response to each query
+        self._latest: dict[str, int] = {}
+        for offset, length, key in entries:
+            self._latest[key] = len(self._entries)
+            self._entries.append((offset, length))
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def get(self, query_string: dict[str, str]) -> Optional[ArchiveRecord]:
+        """Returns the latest archived response to a query, or None if it was never archived."""
+        entry = self._latest.get(cache_key(query_string))
+        return None if entry is None else self._read(entry)
+
+    def __iter__(self) -> Iterator[ArchiveRecord]:
+        """Yields every archived response, in the order they were archived."""
+        for entry in range(len(self._entries)):
+            yield self._read(entry)
+
+    def iter_pages(self) -> Iterator[NotamAPIResponse]:
+        """
+        Validates and yields every archived page answered with status 200, in the order they were archived.
+
+        Raises:
+            NotamFetcherValidationError: If an archived page does not match the schema.
+        """
+        for record in self:
+            if record.status == 200:
+                yield parse_response_content(record.content)
+
+    def _read(self, entry: int) -> ArchiveRecord:
+        assert self._map is not None
+        offset, length = self._entries[entry]
+        data = json.loads(zlib.decompress(self._map[offset : offset + length], wbits=31))
+        return ArchiveRecord(
+            data["time"], data["query"], data["status"], data["body"].encode("utf-8", errors="surrogateescape")
+        )
+
+
+class ReplaySession:
+    """
+    Answers the requests of a NotamFetcher from an archive, in place of a requests.Session.
+
+    Every query is answered with its latest archived response. Queries that were never
+    archived raise NotamFetcherUnexpectedError, which the fetcher does not retry.
+    """
+
+    def __init__(self, reader: ArchiveReader):
+        """
+        Args:
+            reader (ArchiveReader): The archive to answer from
+        """
+        self.reader = reader
+        self.headers: dict[str, str] = {}
+
+    def get(self, url: str, params: Optional[dict[str, str]] = None, **kwargs: Any) -> "_ReplayResponse":
+        record = self.reader.get(params or {})
+        if record is None:
+            raise NotamFetcherUnexpectedError(f"No archived response for query {params}")
+        return _ReplayResponse(record.status, record.content)
+
+    def close(self) -> None:
+        pass
+
+
+class _ReplayResponse:
+    """The parts of a requests.Response used by NotamFetcher."""
+
+    def __init__(self, status_code: int, content: bytes):
+        self.status_code = status_code
+        self.content = content
+        self.headers: dict[str, str] = {}
+
+
+def _read_index(index_path: str) -> tuple[list[tuple[int, int, str]], bool]:
+    """
+    Reads the offset, length and cache_key of each indexed line.
+
+    Returns:
+        tuple[list[tuple[int, int, str]], bool]: The complete lines of the index, and whether
+        its last line was cut short.
+    """
+    if not os.path.exists(index_path):
+        return [], False
+    with open(index_path, "rb") as index:
+        lines = index.read().split(b"\n")
+    entries = []
+    for line in lines[:-1]:
+        offset, length, key = line.decode("utf-8").split("\t", 2)
+        entries.append((int(offset), int(length), key))
+    return entries, bool(lines[-1])
+
+
+def _scan_members(data: memoryview, start: int) -> list[tuple[int, int, str]]:
+    """
+    Finds the lines of an archive by decompressing its gzip members one after another.
+
+    Args:
+        data (memoryview): The archive from offset start
+        start (int): The offset of data in the archive
+
+    Returns:
+        list[tuple[int, int, str]]: The offset, length and cache_key of each complete member,
+        up to the end of data or to a member cut short.
+    """
+    entries = []
+    position = 0
+    while position < len(data):
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            line = decompressor.decompress(data[position:])
+        except zlib.error:
+            break
+        if not decompressor.eof:
+            break
+        length = len(data) - position - len(decompressor.unused_data)
+        record = json.loads(line)
+        entries.append((start + position, length, cache_key(record["query"])))
+        position += length
+    return entries
+
+
+def _repair_index(path: str, index_path: str) -> None:
+    """
+    Brings the index up to date with the archive, after a crash between writing a page and its index line.
+
+    Only called by NotamArchive, before it appends. An index line cut short is removed, the lines
+    missing from the end of the index are added, and a member cut short is truncated from the archive.
+    """
+    if not os.path.exists(path):
+        return
+    entries, cut_short = _read_index(index_path)
+    if cut_short:
+        with open(index_path, "w", encoding="utf-8") as index:
+            index.writelines(f"{offset}\t{length}\t{key}\n" for offset, length, key in entries)
+    indexed_end = entries[-1][0] + entries[-1][1] if entries else 0
+
+    size = os.path.getsize(path)
+    if indexed_end >= size:
+        return
+    with open(path, "rb") as archive:
+        archive.seek(indexed_end)
+        data = archive.read()
+    missing = _scan_members(memoryview(data), indexed_end)
+    with open(index_path, "a", encoding="utf-8") as index:
+        index.writelines(f"{offset}\t{length}\t{key}\n" for offset, length, key in missing)
+    end = missing[-1][0] + missing[-1][1] if missing else indexed_end
+    if end < size:
+        with open(path, "r+b") as archive:
+            archive.truncate(end)
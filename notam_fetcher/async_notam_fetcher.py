@@ -0,0 +1,422 @@
+import asyncio
+import time
+from collections import deque
+from itertools import islice
+from typing import AsyncIterator, Awaitable, Callable, Optional, Sequence, TypeVar
+
+import aiohttp
+
+from .exceptions import NotamFetcherBaseError, NotamFetcherRequestError
+from .api_schema import Notam, NotamAPIResponse, NotamApiItem
+from .metrics import FetchHooks, PageEvent, RequestEvent
+from .archive import NotamArchive
+from .route import Airport, corridor_circles, merge_notams
+from .scheduler import RequestScheduler, _raise_for_status, default_scheduler
+from .single_flight import AsyncSingleFlight
+from .response import notams_from_page, parse_response_content
+from .notam_fetcher import (
+    NotamFetcher,
+    _airport_code_flight_key,
+    _airport_code_query,
+    _latlong_flight_key,
+    _latlong_query,
+)
+
+
+T = TypeVar("T")
+
+
+class AsyncNotamFetcher:
+    """
+    asyncio version of NotamFetcher.
+
+    All requests share one aiohttp session, so keep-alive connections are pooled
+    between calls. At most max_concurrent_requests requests are in flight at once,
+    across every call made on the same fetcher.
+
+    Example:
+        async with AsyncNotamFetcher(CLIENT_ID, CLIENT_SECRET) as notam_fetcher:
+            notams = await notam_fetcher.fetch_notams_by_airport_code("ORD")
+    """
+
+    FAA_API_URL = NotamFetcher.FAA_API_URL
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        page_size: int = 1000,
+        max_concurrent_requests: int = 10,
+        session: Optional[aiohttp.ClientSession] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        coalesce: bool = True,
+        hooks: Sequence[FetchHooks] = (),
+        archive: Optional[NotamArchive] = None,
+    ):
+        """
+        Args:
+            client_id (str): The client id for the FAA NOTAM API
+            client_secret (str): The client secret for the FAA NOTAM API
+            page_size (int): The number of NOTAMs per page (max: 1000)
+            max_concurrent_requests (int): The maximum number of requests in flight at once.
+                Also the size of the connection pool.
+            session (aiohttp.ClientSession, optional): A session to send requests with.
+                If None, one is created on first use and closed by close().
+            scheduler (RequestScheduler, optional): Schedules and retries the requests to the API.
+                If None, the scheduler shared by every fetcher of the process is used.
+            coalesce (bool): Whether concurrent fetch_notams_by_* calls for the same query share
+                one fetch, and all receive its result or its exception.
+            hooks (Sequence[FetchHooks]): Called for every request and page, see metrics.FetchMetrics
+                and metrics.JsonlEventLog.
+            archive (NotamArchive, optional): Records the raw response of every request to the API.
+        """
+        if max_concurrent_requests < 1:
+            raise ValueError("max_concurrent_requests must be greater than 0")
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self._page_size = page_size
+        self._max_concurrent_requests = max_concurrent_requests
+        self._session = session
+        self._owns_session = session is None
+        self._request_slots = asyncio.Semaphore(max_concurrent_requests)
+        self._scheduler = scheduler if scheduler is not None else default_scheduler()
+        self._in_flight: Optional[AsyncSingleFlight[list[Notam]]] = AsyncSingleFlight() if coalesce else None
+        self._hooks = tuple(hooks)
+        self._archive = archive
+
+    async def __aenter__(self) -> "AsyncNotamFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Closes the session and its pooled connections if this fetcher created them."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def fetch_notams_by_airport_code(self, airport_code: str) -> list[Notam]:
+        """
+        Fetches ALL notams for a particular airport code.
+
+        Args:
+            airport_code (str): A valid airport code.
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        Returns:
+            Notams (List[Notam]): A list of NOTAMs
+        """
+        return await self._coalesced(
+            _airport_code_flight_key(airport_code, self._page_size),
+            lambda: self._collect(self.iter_notams_by_airport_code(airport_code)),
+        )
+
+    async def fetch_notams_by_latlong(
+        self, lat: float, long: float, radius: float = 100.0
+    ) -> list[Notam]:
+        """
+        Fetches ALL notams for a particular latitude and longitude.
+
+        Args:
+            lat (float): The latitude to fetch NOTAMs from
+            long (float): The longitude to fetch NOTAMs from
+            radius (float): The location radius criteria in nautical miles. (max:100)
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        Returns:
+            Notams (List[Notam]): A list of NOTAMs
+        """
+        return await self._coalesced(
+            _latlong_flight_key(lat, long, radius, self._page_size),
+            lambda: self._collect(self.iter_notams_by_latlong(lat, long, radius)),
+        )
+
+    async def fetch_notams_by_route(
+        self, departure: Airport, destination: Airport, corridor_half_width: float = 25.0
+    ) -> list[Notam]:
+        """
+        Fetches ALL notams along the great circle between two airports.
+
+        The corridor is covered by the fewest 100 NM circles centered on the route, see
+        corridor_circles. The circles and both airports are fetched concurrently and the
+        results are merged, keeping one NOTAM per id.
+
+        Args:
+            departure (Airport): The departure airport and its position.
+            destination (Airport): The destination airport and its position.
+            corridor_half_width (float): The distance either side of the route to cover,
+                in nautical miles. (max: 99)
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        Returns:
+            Notams (List[Notam]): The NOTAMs of the departure airport, then along the route,
+                then of the destination airport
+        """
+        circles = corridor_circles(departure, destination, corridor_half_width)
+        return merge_notams(
+            await _gather_cancelling(
+                [
+                    self.fetch_notams_by_airport_code(departure.code),
+                    *(
+                        self.fetch_notams_by_latlong(lat, long, radius)
+                        for lat, long, radius in circles
+                    ),
+                    self.fetch_notams_by_airport_code(destination.code),
+                ]
+            )
+        )
+
+    def iter_notams_by_airport_code(self, airport_code: str) -> AsyncIterator[Notam]:
+        """
+        Yields ALL notams for a particular airport code, page by page.
+
+        Args:
+            airport_code (str): A valid airport code.
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        Returns:
+            Notams (AsyncIterator[Notam]): An async iterator of NOTAMs
+        """
+        return self._iter_notams(
+            lambda page_num: self._fetch_notams_by_airport_code(
+                airport_code, page_num, self._page_size
+            )
+        )
+
+    def iter_notams_by_latlong(
+        self, lat: float, long: float, radius: float = 100.0
+    ) -> AsyncIterator[Notam]:
+        """
+        Yields ALL notams for a particular latitude and longitude, page by page.
+
+        Args:
+            lat (float): The latitude to fetch NOTAMs from
+            long (float): The longitude to fetch NOTAMs from
+            radius (float): The location radius criteria in nautical miles. (max:100)
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        Returns:
+            Notams (AsyncIterator[Notam]): An async iterator of NOTAMs
+        """
+        if radius > 100:
+            raise ValueError(f"Radius must be less than 100")
+        if radius <= 0:
+            raise ValueError(f"Radius must be greater than 0")
+
+        return self._iter_notams(
+            lambda page_num: self._fetch_notams_by_latlong(
+                lat, long, radius, page_num, self._page_size
+            )
+        )
+
+    async def _coalesced(
+        self, key: tuple, fetch: Callable[[], Awaitable[list[Notam]]]
+    ) -> list[Notam]:
+        """Runs fetch, or waits for the identical fetch already in flight. Every caller gets its own list."""
+        if self._in_flight is None:
+            return await fetch()
+        return list(await self._in_flight.do(key, fetch))
+
+    @staticmethod
+    async def _collect(notams: AsyncIterator[Notam]) -> list[Notam]:
+        return [notam async for notam in notams]
+
+    async def _iter_notams(
+        self, fetch_page: Callable[[int], Awaitable[NotamAPIResponse]]
+    ) -> AsyncIterator[Notam]:
+        """Yields the NOTAMs of every page, in page order."""
+        async for page in self._iter_pages(fetch_page):
+            for notam in notams_from_page(page):
+                yield notam
+
+    async def _iter_pages(
+        self, fetch_page: Callable[[int], Awaitable[NotamAPIResponse]]
+    ) -> AsyncIterator[NotamAPIResponse]:
+        """
+        Fetches the first page, then every remaining page concurrently, and yields them in
+        page order.
+
+        At most 2 * max_concurrent_requests pages are fetched ahead of the consumer. If any
+        page fails, or the consumer stops iterating, the other pages are cancelled.
+        """
+        first_page = await fetch_page(1)
+        remaining_page_nums = iter(range(2, first_page.total_pages + 1))
+        yield first_page
+        del first_page
+
+        pending: deque[asyncio.Future[NotamAPIResponse]] = deque(
+            asyncio.ensure_future(fetch_page(page_num))
+            for page_num in islice(remaining_page_nums, 2 * self._max_concurrent_requests)
+        )
+        try:
+            while pending:
+                page = await pending.popleft()
+                for page_num in islice(remaining_page_nums, 1):
+                    pending.append(asyncio.ensure_future(fetch_page(page_num)))
+                yield page
+                del page
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _fetch_notams_by_latlong(
+        self, lat: float, long: float, radius: float, page_num: int, page_size: int = 1000
+    ) -> NotamAPIResponse:
+        """
+        Fetches a response from the API using latitude and longitude.
+
+        Args:
+            lat (float): The latitude to fetch NOTAMs from
+            long (float): The longitude to fetch NOTAMs from
+            radius (float): The location radius criteria in nautical miles. (max:100)
+            page_num (int): The page number of the response (min: 1)
+            page_size (int): The number of NOTAMs per page (max: 1000)
+
+        Returns:
+            NotamAPIResponse: A Notam API Response
+        """
+        return await self._fetch_page(_latlong_query(lat, long, radius, page_num, page_size))
+
+    async def _fetch_notams_by_airport_code(
+        self, airport_code: str, page_num: int, page_size: int = 1000
+    ) -> NotamAPIResponse:
+        """
+        Fetches a response from the API using an airport code.
+
+        Args:
+            airport_code (str): A valid airport code.
+            page_num (int): The page number of the response (min: 1)
+            page_size (int): The number of NOTAMs per page (max: 1000)
+
+        Returns:
+            NotamAPIResponse: A Notam API Response
+        """
+        return await self._fetch_page(_airport_code_query(airport_code, page_num, page_size))
+
+    async def _fetch_page(self, query_string: dict[str, str]) -> NotamAPIResponse:
+        """
+        Fetches and validates a single page from the API.
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API,
+                after retrying. NotamFetcherRateLimitError and NotamFetcherServerError if the API
+                answered 429 or 5xx.
+            NotamFetcherUnauthenticatedError: If client_id or client_secret are invalid.
+            NotamFetcherValidationError: If the response does not match the schema.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        """
+        if not self._hooks:
+            return await self._scheduler.run_async(self.client_id, lambda: self._fetch_page_once(query_string))
+
+        event = PageEvent(query_string, int(query_string["page_num"]))
+        start = time.perf_counter()
+        try:
+            page = await self._scheduler.run_async(
+                self.client_id, lambda: self._fetch_page_once(query_string, event)
+            )
+            event.items = sum(isinstance(item, NotamApiItem) for item in page.items)
+            return page
+        except NotamFetcherBaseError as e:
+            event.error = type(e).__name__
+            raise
+        finally:
+            event.seconds = event.request_seconds = time.perf_counter() - start
+            event.request_seconds -= event.parse_seconds
+            for hook in self._hooks:
+                hook.on_page(event)
+
+    async def _fetch_page_once(
+        self, query_string: dict[str, str], event: Optional[PageEvent] = None
+    ) -> NotamAPIResponse:
+        """
+        Fetches and validates a single page from the API, without retrying. See _fetch_page.
+
+        With event, the request is timed and emitted as a RequestEvent, and added to event.
+        """
+        if event is None:
+            return parse_response_content(await self._request_content_once(query_string))
+
+        request = RequestEvent(query_string, attempt=event.requests)
+        event.requests += 1
+        start = time.perf_counter()
+        try:
+            content = await self._request_content_once(query_string, request)
+        except NotamFetcherBaseError as e:
+            request.error = type(e).__name__
+            raise
+        finally:
+            request.seconds = time.perf_counter() - start
+            event.http_seconds += request.seconds
+            for hook in self._hooks:
+                hook.on_request(request)
+
+        event.bytes = len(content)
+        start = time.perf_counter()
+        try:
+            return parse_response_content(content)
+        finally:
+            event.parse_seconds += time.perf_counter() - start
+
+    async def _request_content_once(
+        self, query_string: dict[str, str], request: Optional[RequestEvent] = None
+    ) -> bytes:
+        """Requests the raw body of a single page from the API, without retrying."""
+        async with self._request_slots:
+            try:
+                async with self._get_session().get(
+                    self.FAA_API_URL,
+                    headers={
+                        "client_id": self.client_id,
+                        "client_secret": self.client_secret,
+                    },
+                    params=query_string,
+                ) as response:
+                    content = await response.read()
+                    status, retry_after = response.status, response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise NotamFetcherRequestError from e
+
+        if request is not None:
+            request.status = status
+            request.bytes = len(content)
+        if self._archive is not None:
+            self._archive.append(query_string, status, content)
+        _raise_for_status(status, retry_after)
+        return content
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._max_concurrent_requests),
+            )
+        return self._session
+
+
+async def _gather_cancelling(awaitables: Sequence[Awaitable[T]]) -> list[T]:
+    """
+    Runs awaitables concurrently and returns their results in the same order.
+
+    On the first failure the others are cancelled and the failure is raised as is.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            task.result()
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,267 @@
+"""
+Response caches used by NotamFetcher.
+
+Pages are cached under a key built from their normalized query, meaning the airport code
+or latitude/longitude/radius, plus page number and page size. Every entry has a TTL and
+an optional stale window after it, during which the entry is still served while
+NotamFetcher refreshes it in the background (stale-while-revalidate).
+
+Example:
+    cache = MemoryNotamCache(max_entries=1000, ttl=300, stale_ttl=60)
+    notam_fetcher = NotamFetcher(CLIENT_ID, CLIENT_SECRET, cache=cache)
+"""
+
+import abc
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from .api_schema import NotamAPIResponse
+
+
+@dataclass
+class CacheEntry:
+    page: NotamAPIResponse
+    expires_at: float
+    stale_until: float
+
+    @property
+    def is_stale(self) -> bool:
+        """True if the entry is past its TTL but still inside its stale window."""
+        return time.time() >= self.expires_at
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+def cache_key(query_string: dict[str, str]) -> str:
+    """
+    Builds the cache key of a page request from its query string.
+
+    Airport codes are upper-cased and coordinates are rounded to 4 decimal places
+    (about 11 m) so equivalent queries share an entry.
+    """
+    normalized = dict(query_string)
+    if "domesticLocation" in normalized:
+        normalized["domesticLocation"] = normalized["domesticLocation"].strip().upper()
+    for coordinate in ("locationLatitude", "locationLongitude", "locationRadius"):
+        if coordinate in normalized:
+            normalized[coordinate] = f"{float(normalized[coordinate]):.4f}"
+    return "&".join(f"{name}={value}" for name, value in sorted(normalized.items()))
+
+
+class NotamCache(abc.ABC):
+    """
+    Base class of the NotamFetcher response caches.
+
+    Subclasses implement _get, _set and _delete. Lookups, expiry and the hit/miss
+    counters are handled here.
+    """
+
+    def __init__(self, ttl: float = 300.0, stale_ttl: float = 0.0):
+        """
+        Args:
+            ttl (float): Seconds an entry is served as fresh.
+            stale_ttl (float): Seconds after the TTL during which an entry is still served
+                while it is refreshed in the background. 0 disables stale-while-revalidate.
+        """
+        if ttl <= 0:
+            raise ValueError("ttl must be greater than 0")
+        if stale_ttl < 0:
+            raise ValueError("stale_ttl must not be negative")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = CacheStats()
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Returns the entry for key, or None if it is missing or past its stale window.
+
+        A returned entry may be stale, see CacheEntry.is_stale.
+        """
+        entry = self._get(key)
+        if entry is not None and time.time() >= entry.stale_until:
+            self._delete(key)
+            entry = None
+
+        with self._stats_lock:
+            if entry is None:
+                self.stats.misses += 1
+            elif entry.is_stale:
+                self.stats.stale_hits += 1
+            else:
+                self.stats.hits += 1
+        return entry
+
+    def set(self, key: str, page: NotamAPIResponse, ttl: Optional[float] = None) -> None:
+        """
+        Stores a page.
+
+        Args:
+            key (str): The cache key, see cache_key.
+            page (NotamAPIResponse): The page to store.
+            ttl (float, optional): Overrides the TTL of the cache for this entry.
+        """
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._set(key, CacheEntry(page, expires_at, expires_at + self.stale_ttl))
+
+    def _record_evictions(self, count: int) -> None:
+        with self._stats_lock:
+            self.stats.evictions += count
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> Optional[CacheEntry]: ...
+
+    @abc.abstractmethod
+    def _set(self, key: str, entry: CacheEntry) -> None: ...
+
+    @abc.abstractmethod
+    def _delete(self, key: str) -> None: ...
+
+
+class MemoryNotamCache(NotamCache):
+    """An in-process cache holding at most max_entries pages, evicting the least recently used."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0, stale_ttl: float = 0.0):
+        """
+        Args:
+            max_entries (int): The maximum number of pages kept in memory.
+            ttl (float): Seconds an entry is served as fresh.
+            stale_ttl (float): Seconds after the TTL during which an entry is still served
+                while it is refreshed in the background.
+        """
+        super().__init__(ttl, stale_ttl)
+        if max_entries < 1:
+            raise ValueError("max_entries must be greater than 0")
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self._record_evictions(evicted)
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLiteNotamCache(NotamCache):
+    """
+    A cache stored in a SQLite database file, which several processes can share.
+
+    Pages are stored as JSON. At most max_entries pages are kept, evicting the least
+    recently used. Each thread uses its own connection to the database.
+    """
+
+    def __init__(
+        self, path: str, max_entries: int = 10000, ttl: float = 300.0, stale_ttl: float = 0.0
+    ):
+        """
+        Args:
+            path (str): The path of the database file. Created if it does not exist.
+            max_entries (int): The maximum number of pages kept in the database.
+            ttl (float): Seconds an entry is served as fresh.
+            stale_ttl (float): Seconds after the TTL during which an entry is still served
+                while it is refreshed in the background.
+        """
+        super().__init__(ttl, stale_ttl)
+        if max_entries < 1:
+            raise ValueError("max_entries must be greater than 0")
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS notam_cache ("
+                " key TEXT PRIMARY KEY,"
+                " page TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " stale_until REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS notam_cache_last_access ON notam_cache (last_access)"
+            )
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM notam_cache").fetchone()[0]
+
+    def close(self) -> None:
+        """Closes the connection of the calling thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _get(self, key: str) -> Optional[CacheEntry]:
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT page, expires_at, stale_until FROM notam_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE notam_cache SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+        page, expires_at, stale_until = row
+        return CacheEntry(NotamAPIResponse.model_validate_json(page), expires_at, stale_until)
+
+    def _set(self, key: str, entry: CacheEntry) -> None:
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO notam_cache VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.page.model_dump_json(by_alias=True),
+                    entry.expires_at,
+                    entry.stale_until,
+                    time.time(),
+                ),
+            )
+            evicted = connection.execute(
+                "DELETE FROM notam_cache WHERE key IN ("
+                " SELECT key FROM notam_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        if evicted:
+            self._record_evictions(evicted)
+
+    def _delete(self, key: str) -> None:
+        with self._connection() as connection:
+            connection.execute("DELETE FROM notam_cache WHERE key = ?", (key,))
@@ -0,0 +1,59 @@
+"""
+Parsing of NOTAM effective times, shared by the NOTAM models, the store and the indexes.
+"""
+
+import math
+from datetime import datetime, timezone
+from typing import Optional
+
+# The timestamp of NotamTable's PERMANENT effective_end
+PERMANENT_TIMESTAMP = datetime(9999, 12, 31, 23, 59, 59, 999000, tzinfo=timezone.utc).timestamp()
+
+
+def timestamp(value: datetime) -> float:
+    """The POSIX timestamp of value. A naive datetime is assumed to be UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def parse_effective_end(effective_end: datetime | str) -> tuple[float, bool]:
+    """
+    Parses the effective_end of a NOTAM.
+
+    Args:
+        effective_end (datetime | str): A datetime, or a string as returned by the API:
+            an ISO date, optionally followed by "EST", or "PERM"
+
+    Returns:
+        tuple[float, bool]: effective_end as a POSIX timestamp (PERMANENT_TIMESTAMP for "PERM",
+        NaN if it is not a date) and whether it is estimated.
+    """
+    if isinstance(effective_end, datetime):
+        return timestamp(effective_end), False
+
+    text = effective_end.strip().upper()
+    if text == "PERM":
+        return PERMANENT_TIMESTAMP, False
+
+    estimated = text.endswith("EST")
+    if estimated:
+        text = text[: -len("EST")].strip()
+    try:
+        return timestamp(datetime.fromisoformat(text.replace("Z", "+00:00"))), estimated
+    except ValueError:
+        return float("nan"), estimated
+
+
+def effective_end_datetime(effective_end: datetime | str) -> Optional[datetime]:
+    """
+    The end of a NOTAM as a datetime, see parse_effective_end. An estimated end counts as the end.
+
+    Returns:
+        Optional[datetime]: The end in UTC, or None if the NOTAM has no fixed end ("PERM")
+        or effective_end is not a date.
+    """
+    end, _ = parse_effective_end(effective_end)
+    if math.isnan(end) or end >= PERMANENT_TIMESTAMP:
+        return None
+    return datetime.fromtimestamp(end, timezone.utc)
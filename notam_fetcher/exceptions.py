@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Optional
 class NotamFetcherBaseError(Exception):
     """Base exception for NotamFetcher errors."""
 
@@ -15,6 +15,34 @@ class NotamFetcherUnauthenticatedError(NotamFetcherBaseError):
 class NotamFetcherValidationError(NotamFetcherBaseError):
     """Raised when Pydantic could not validate the response of the API"""
     invalid_object : Any
-    def __init__(self, message: str, obj: Any):
+    page_num: Optional[int]
+    def __init__(self, message: str, obj: Any, page_num: Optional[int] = None):
         super().__init__(message)
         self.invalid_object = obj
+        self.page_num = page_num
+
+    def __reduce__(self):
+        # So the error can be raised from worker processes
+        return (type(self), (str(self), self.invalid_object, self.page_num))
+
+
+class NotamFetcherRateLimitError(NotamFetcherRequestError):
+    """Raised when the API answers 429 Too Many Requests"""
+    retry_after: Optional[float]
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    def __reduce__(self):
+        return (type(self), (str(self), self.retry_after))
+
+
+class NotamFetcherServerError(NotamFetcherRequestError):
+    """Raised when the API answers with a 5xx status"""
+    status_code: int
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+    def __reduce__(self):
+        return (type(self), (str(self), self.status_code))
@@ -0,0 +1,240 @@
+"""
+Decodes the ICAO formatted text of NOTAMs (ICAOTranslationObject.formatted_text) into typed fields.
+
+Example formatted text:
+    A2157/24 NOTAMN
+    Q) KZJX/QCBLS/IV/NBO/A/000/040/3224N07812W049
+    A) KZJX
+    B) 2410021950
+    C) 2410142200 EST
+    E) ZJX AIRSPACE ADS-B SER MAY NOT BE AVBL
+    F) SFC   G) 3999FT.
+
+Texts are decoded with one precompiled pattern up to E); F) and G) are found from the end of the text. Decoding a batch never
+raises: texts that do not follow the format are reported as DecodeErrors.
+
+Example:
+    result = decode_page(page)
+    for notam_id, decoded in result.notams.items():
+        print(notam_id, decoded.qcode, decoded.start, decoded.end)
+    for error in result.errors:
+        log.warning("Malformed NOTAM %s on page %s: %s", error.notam_id, result.page_num, error.message)
+"""
+
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Iterable, NamedTuple, Optional
+
+from .api_schema import ICAOTranslationObject, NotamAPIResponse, NotamApiItem
+
+# The items of a NOTAM in order up to E). C) and D) are optional
+_HEAD_PATTERN = re.compile(
+    r"\s*(?P<number>\S+)\s+NOTAM(?P<kind>[NRC])(?:[ \t]+(?P<reference>\S+))?\s+"
+    r"Q\)[ \t]*(?P<q>\S+)\s+"
+    r"A\)\s*(?P<a>[^\n]*?)\s+"
+    r"B\)\s*(?P<b>\S+)\s*"
+    r"(?:C\)\s*(?P<c>\d{10}|\S+)(?:[ \t]*(?P<estimated>EST))?\s*)?"
+    r"(?:D\)\s*(?P<d>.*?)\s*)?"
+    r"E\)\s*",
+    re.DOTALL,
+)
+_COORDINATES_PATTERN = re.compile(
+    r"(?P<lat>\d{2})(?P<lat_minutes>\d{2})(?P<lat_hemisphere>[NS])"
+    r"(?P<long>\d{3})(?P<long_minutes>\d{2})(?P<long_hemisphere>[EW])"
+    r"(?P<radius>\d{3})?"
+)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class IcaoNotam(NamedTuple):
+    """
+    The items of an ICAO formatted NOTAM.
+
+    kind is "N" (new), "R" (replaces reference) or "C" (cancels reference). The Q-line is split
+    into fir, qcode, traffic, purpose, scope, lower and upper (flight levels) and the position
+    and radius (in nautical miles) of the area. end is None for a permanent NOTAM (C) PERM).
+    """
+
+    number: str
+    kind: str
+    reference: Optional[str]
+    fir: str
+    qcode: str
+    traffic: Optional[str]
+    purpose: Optional[str]
+    scope: Optional[str]
+    lower: Optional[int]
+    upper: Optional[int]
+    lat: Optional[float]
+    long: Optional[float]
+    radius: Optional[float]
+    locations: tuple[str, ...]
+    start: datetime
+    end: Optional[datetime]
+    is_estimated: bool
+    is_permanent: bool
+    schedule: Optional[str]
+    text: str
+    lower_limit: Optional[str]
+    upper_limit: Optional[str]
+
+
+class DecodeError(NamedTuple):
+    """A formatted text that could not be decoded, and why. index is its position in the batch."""
+
+    index: int
+    notam_id: Optional[str]
+    message: str
+    text: str
+
+
+class DecodeResult(NamedTuple):
+    """The texts of a batch, decoded in order, with None for the texts that could not be decoded."""
+
+    decoded: list[Optional[IcaoNotam]]
+    errors: list[DecodeError]
+
+
+class PageDecodeResult(NamedTuple):
+    """The ICAO translations of a page, by NOTAM id, and the NOTAMs whose translation could not be decoded."""
+
+    page_num: int
+    notams: dict[str, IcaoNotam]
+    errors: list[DecodeError]
+
+
+def decode_formatted_text(text: str) -> IcaoNotam:
+    """
+    Decodes one ICAO formatted text.
+
+    Raises:
+        ValueError: If the text does not follow the format.
+    """
+    head = _HEAD_PATTERN.match(text)
+    if head is None:
+        raise ValueError("Not an ICAO formatted NOTAM")
+    number, kind, reference, q, a, b, c, estimated, d = head.groups()
+    start = head.end()
+    end = len(text.rstrip())
+    g_at = _find_item(text, "G)", start, end)
+    g = text[g_at + 2 : end].strip() if g_at >= 0 else None
+    end = g_at if g_at >= 0 else end
+    f_at = _find_item(text, "F)", start, end)
+    f = text[f_at + 2 : end].strip() if f_at >= 0 else None
+    e = text[start : f_at if f_at >= 0 else end].rstrip()
+
+    fields = q.split("/")
+    if len(fields) < 2:
+        raise ValueError(f"Invalid Q) item {q!r}")
+    lat = long = radius = None
+    if len(fields) > 7:
+        coordinates = _COORDINATES_PATTERN.match(fields[7])
+        if coordinates:
+            lat = int(coordinates["lat"]) + int(coordinates["lat_minutes"]) / 60
+            long = int(coordinates["long"]) + int(coordinates["long_minutes"]) / 60
+            if coordinates["lat_hemisphere"] == "S":
+                lat = -lat
+            if coordinates["long_hemisphere"] == "W":
+                long = -long
+            radius = float(coordinates["radius"]) if coordinates["radius"] else None
+
+    is_permanent = c == "PERM"
+    return IcaoNotam(
+        number,
+        kind,
+        reference,
+        sys.intern(fields[0].strip()),
+        sys.intern(fields[1].strip()),
+        _item(fields, 2),
+        _item(fields, 3),
+        _item(fields, 4),
+        _flight_level(fields, 5),
+        _flight_level(fields, 6),
+        lat,
+        long,
+        radius,
+        tuple(a.split()),
+        _parse_time(b, "B)"),
+        None if is_permanent or c is None else _parse_time(c, "C)"),
+        estimated is not None,
+        is_permanent,
+        _WHITESPACE_PATTERN.sub(" ", d) if d else None,
+        e,
+        f or None,
+        g or None,
+    )
+
+
+def decode_formatted_texts(texts: Iterable[str]) -> DecodeResult:
+    """Decodes a batch of ICAO formatted texts, reporting the ones that could not be decoded."""
+    decoded: list[Optional[IcaoNotam]] = []
+    errors: list[DecodeError] = []
+    for index, text in enumerate(texts):
+        try:
+            decoded.append(decode_formatted_text(text))
+        except (ValueError, TypeError, AttributeError) as e:
+            decoded.append(None)
+            errors.append(DecodeError(index, None, str(e), text))
+    return DecodeResult(decoded, errors)
+
+
+def decode_page(page: NotamAPIResponse) -> PageDecodeResult:
+    """
+    Decodes the ICAO translation of every NOTAM of a page.
+
+    NOTAMs without an ICAO translation are skipped. The index of a DecodeError is the position
+    of the item in the page.
+    """
+    notams: dict[str, IcaoNotam] = {}
+    errors: list[DecodeError] = []
+    for index, item in enumerate(page.items):
+        if not isinstance(item, NotamApiItem):
+            continue
+        core = item.properties.coreNOTAMData
+        for translation in core.notamTranslation:
+            if isinstance(translation, ICAOTranslationObject):
+                try:
+                    notams[core.notam.id] = decode_formatted_text(translation.formatted_text)
+                except ValueError as e:
+                    errors.append(DecodeError(index, core.notam.id, str(e), translation.formatted_text))
+                break
+    return PageDecodeResult(page.page_num, notams, errors)
+
+
+def _find_item(text: str, item: str, start: int, end: int) -> int:
+    """The position of the last item marker ("F)", "G)") after whitespace in text[start:end], or -1."""
+    position = text.rfind(item, start, end)
+    if position > start and text[position - 1].isspace():
+        return position
+    return -1
+
+
+def _item(fields: list[str], index: int) -> Optional[str]:
+    if index >= len(fields):
+        return None
+    value = fields[index].strip()
+    return sys.intern(value) if value else None
+
+
+def _flight_level(fields: list[str], index: int) -> Optional[int]:
+    if index >= len(fields):
+        return None
+    value = fields[index].strip()
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ValueError(f"Invalid flight level {value!r} in Q) item")
+    return int(value)
+
+
+def _parse_time(value: str, item: str) -> datetime:
+    """Parses a YYMMDDHHMM time in UTC."""
+    if len(value) != 10 or not value.isdigit():
+        raise ValueError(f"Invalid time {value!r} in {item} item")
+    try:
+        return datetime(
+            2000 + int(value[0:2]), int(value[2:4]), int(value[4:6]), int(value[6:8]), int(value[8:10]), tzinfo=timezone.utc
+        )
+    except ValueError:
+        raise ValueError(f"Invalid time {value!r} in {item} item") from None
@@ -0,0 +1,151 @@
+"""
+An index of NOTAM effective windows, for "active during my flight" queries.
+
+Example:
+    index = NotamIntervalIndex(notam_fetcher.fetch_notams_by_route(departure, destination))
+    notams = index.overlapping(departure_time, arrival_time, locations={"ORD", "ATL"})
+
+    # Kept up to date from a NotamStore
+    index.apply_diff(store.sync(notam_fetcher.fetch_notams_by_airport_code("ORD")))
+"""
+
+import math
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Collection, Container, Iterable, Optional
+
+from .api_schema import Notam
+from .notam_store import NotamDiff
+from .effective_time import PERMANENT_TIMESTAMP, parse_effective_end, timestamp
+
+# The group of windows without an end; other groups are numbered by the power of two of their length in seconds
+_OPEN_ENDED = -1
+
+
+class _Entry:
+    __slots__ = ("notam", "start", "end", "group")
+
+    def __init__(self, notam: Notam, start: float, end: float, group: int):
+        self.notam = notam
+        self.start = start
+        self.end = end
+        self.group = group
+
+    @property
+    def key(self) -> tuple[float, str]:
+        return self.start, self.notam.id
+
+
+class NotamIntervalIndex:
+    """
+    NOTAMs indexed by their effective window, from effective_start to effective_end.
+
+    Windows are split into groups by length: group k holds windows between 2^k and 2^(k+1)
+    seconds long, sorted by start. A window of group k that overlaps [a, b] must start in
+    [a - 2^(k+1), b], found by binary search, and nearly all windows found that way do overlap.
+    Windows without an end ("PERM", or an effective_end that is not a date) overlap [a, b]
+    if they start before b. A query therefore takes O(log n) per group plus the size of the result,
+    and adding or removing a NOTAM is a single sorted insert or delete.
+    """
+
+    def __init__(self, notams: Iterable[Notam] = ()):
+        """
+        Args:
+            notams (Iterable[Notam]): The NOTAMs to index. Building in bulk sorts each group once.
+        """
+        self._entries: dict[str, _Entry] = {}
+        self._groups: dict[int, list[tuple[float, str]]] = {}
+        for notam in notams:
+            self._entries[notam.id] = _make_entry(notam)
+        for entry in self._entries.values():
+            self._groups.setdefault(entry.group, []).append(entry.key)
+        for keys in self._groups.values():
+            keys.sort()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, notam_id: object) -> bool:
+        return notam_id in self._entries
+
+    def add(self, notam: Notam) -> None:
+        """Adds a NOTAM, replacing the NOTAM with the same id if there is one."""
+        self.remove(notam.id)
+        entry = _make_entry(notam)
+        self._entries[notam.id] = entry
+        insort(self._groups.setdefault(entry.group, []), entry.key)
+
+    def remove(self, notam_id: str) -> Optional[Notam]:
+        """Removes a NOTAM. Returns it, or None if it was not in the index."""
+        entry = self._entries.pop(notam_id, None)
+        if entry is None:
+            return None
+        keys = self._groups[entry.group]
+        del keys[bisect_left(keys, entry.key)]
+        return entry.notam
+
+    def remove_ended(self, time: datetime) -> list[Notam]:
+        """Removes and returns the NOTAMs whose effective_end is before time."""
+        cutoff = timestamp(time)
+        ended = [entry.notam.id for entry in self._entries.values() if entry.end < cutoff]
+        return [notam for notam in map(self.remove, ended) if notam is not None]
+
+    def apply_diff(self, diff: NotamDiff) -> None:
+        """Applies the changes of a NotamStore sync."""
+        for notam in diff.expired:
+            self.remove(notam.id)
+        for notam in diff.inserted + diff.updated:
+            self.add(notam)
+
+    def overlapping(
+        self,
+        start: datetime,
+        end: datetime,
+        locations: Optional[Collection[str]] = None,
+        notam_ids: Optional[Container[str]] = None,
+    ) -> list[Notam]:
+        """
+        Returns the NOTAMs in effect at any time between start and end, ordered by effective_start.
+
+        Args:
+            start (datetime): The start of the window, e.g. the departure time
+            end (datetime): The end of the window, e.g. the arrival time
+            locations (Collection[str], optional): Only NOTAMs whose location or icao_location is one of these
+            notam_ids (Container[str], optional): Only NOTAMs with one of these ids, e.g. the NOTAMs
+                NotamSpatialIndex.along_route found for a leg
+        """
+        window_start, window_end = timestamp(start), timestamp(end)
+        if window_start > window_end:
+            raise ValueError("start must not be after end")
+
+        matching: list[_Entry] = []
+        for group, keys in self._groups.items():
+            earliest = -math.inf if group == _OPEN_ENDED else window_start - 2.0 ** (group + 1)
+            low = bisect_left(keys, (earliest, ""))
+            high = bisect_right(keys, (window_end, "\U0010ffff"))
+            for _, notam_id in keys[low:high]:
+                entry = self._entries[notam_id]
+                if entry.end < window_start:
+                    continue
+                if notam_ids is not None and notam_id not in notam_ids:
+                    continue
+                if locations is not None and not (
+                    entry.notam.location in locations or entry.notam.icao_location in locations
+                ):
+                    continue
+                matching.append(entry)
+
+        matching.sort(key=lambda entry: entry.key)
+        return [entry.notam for entry in matching]
+
+    def active_at(self, time: datetime, locations: Optional[Collection[str]] = None) -> list[Notam]:
+        """Returns the NOTAMs in effect at time."""
+        return self.overlapping(time, time, locations)
+
+
+def _make_entry(notam: Notam) -> _Entry:
+    start = timestamp(notam.effective_start)
+    end, _ = parse_effective_end(notam.effective_end)
+    if math.isnan(end) or end >= PERMANENT_TIMESTAMP:
+        return _Entry(notam, start, math.inf, _OPEN_ENDED)
+    return _Entry(notam, start, end, max(0, math.frexp(max(end - start, 1.0))[1] - 1))
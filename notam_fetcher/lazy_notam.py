@@ -0,0 +1,206 @@
+"""
+A lightweight, read-only view of a NOTAM over the decoded JSON of its page.
+
+A page is only decoded with json.loads: nothing is validated until it is read, and the
+translations of the NOTAMs are not validated at all.
+Each field of a LazyNotam is checked on first access, and datetimes are parsed once and
+cached. Fields have the names and types of the Notam model, so a LazyNotam can be used
+where a Notam is read, e.g. NotamTable.from_notams, and to_notam() builds the full model.
+
+Example:
+    for notam in notam_fetcher.fetch_lazy_notams_by_airport_code("ORD"):
+        if notam.selection_code and notam.selection_code.startswith("QMR"):
+            closures.append(notam.to_notam())
+"""
+
+import json
+import sys
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Union
+
+from pydantic import ValidationError
+
+from . import effective_time
+from .api_schema import Notam, _datetime_adapter
+from .exceptions import NotamFetcherUnexpectedError, NotamFetcherValidationError
+from .response import parse_response_data
+
+# The fields of Notam, by alias, in the order LazyNotam keeps their raw values
+_ALIASES = (
+    "id",
+    "number",
+    "type",
+    "issued",
+    "selectionCode",
+    "location",
+    "effectiveStart",
+    "effectiveEnd",
+    "text",
+    "classification",
+    "accountId",
+    "lastUpdated",
+    "icaoLocation",
+)
+# Fields with few distinct values, interned so NOTAMs of a fetch share them
+_INTERNED = tuple(_ALIASES.index(alias) for alias in ("type", "selectionCode", "location", "classification", "accountId", "icaoLocation"))
+
+# A field missing from the raw NOTAM, or a slot that has not been decoded yet
+_MISSING: Any = object()
+_UNSET: Any = object()
+
+
+class _Field:
+    """A string field of LazyNotam, checked on every access and returned as it was decoded."""
+
+    def __init__(self, alias: str, optional: bool = False):
+        self.index = _ALIASES.index(alias)
+        self.optional = optional
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, notam: Optional["LazyNotam"], owner: Optional[type] = None) -> Any:
+        if notam is None:
+            return self
+        value = notam._values[self.index]
+        if isinstance(value, str) or (value is None and self.optional):
+            return value
+        raise _invalid_field(notam, self.name)
+
+
+class _DatetimeField(_Field):
+    """A datetime field, parsed on first access and cached in the slot "_" + name."""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        self.slot = "_" + name
+
+    def __get__(self, notam: Optional["LazyNotam"], owner: Optional[type] = None) -> Any:
+        if notam is None:
+            return self
+        value = getattr(notam, self.slot)
+        if value is _UNSET:
+            value = self._parse(notam)
+            setattr(notam, self.slot, value)
+        return value
+
+    def _parse(self, notam: "LazyNotam") -> Any:
+        try:
+            return _datetime_adapter.validate_python(notam._values[self.index])
+        except ValidationError:
+            raise _invalid_field(notam, self.name) from None
+
+
+class LazyNotam:
+    """
+    A NOTAM of a page, decoded on access.
+
+    Keeps the decoded values of the Notam fields only. Like Notam, it has no translations,
+    see NotamFetcher.iter_pages_by_airport_code for them. Raises NotamFetcherValidationError
+    when a field that does not match the Notam model is read.
+    """
+
+    __slots__ = ("_values", "_issued", "_effective_start", "_effective_end", "_last_updated")
+
+    id = _Field("id")
+    number = _Field("number")
+    type = _Field("type")
+    issued = _DatetimeField("issued")
+    selection_code = _Field("selectionCode", optional=True)
+    location = _Field("location")
+    effective_start = _DatetimeField("effectiveStart")
+    effective_end = _Field("effectiveEnd")
+    text = _Field("text")
+    classification = _Field("classification")
+    account_id = _Field("accountId")
+    last_updated = _DatetimeField("lastUpdated")
+    icao_location = _Field("icaoLocation")
+
+    def __init__(self, raw: dict[str, Any]):
+        """
+        Args:
+            raw (dict[str, Any]): The decoded JSON of the notam object of an item
+        """
+        values = [raw.get(alias, _MISSING) for alias in _ALIASES]
+        for index in _INTERNED:
+            if type(values[index]) is str:
+                values[index] = sys.intern(values[index])
+        self._values = tuple(values)
+        self._issued = self._effective_start = self._effective_end = self._last_updated = _UNSET
+
+    def __repr__(self) -> str:
+        return f"LazyNotam(id={self._values[0]!r})"
+
+    @property
+    def effective_end_datetime(self) -> Optional[datetime]:
+        """See Notam.effective_end_datetime. Parsed on first access and cached."""
+        effective_end = self._effective_end
+        if effective_end is _UNSET:
+            effective_end = self._effective_end = effective_time.effective_end_datetime(self.effective_end)
+        return effective_end
+
+    def to_notam(self) -> Notam:
+        """
+        Validates the whole NOTAM into a Notam model.
+
+        Raises:
+            NotamFetcherValidationError: If the NOTAM does not match the Notam model.
+        """
+        raw = self._raw()
+        try:
+            return Notam.model_validate(raw)
+        except ValidationError:
+            raise NotamFetcherValidationError("Could not validate NOTAM.", raw) from None
+
+    def _raw(self) -> dict[str, Any]:
+        """The Notam fields of the raw NOTAM."""
+        return {alias: value for alias, value in zip(_ALIASES, self._values) if value is not _MISSING}
+
+
+class LazyPage(NamedTuple):
+    """The NOTAMs of a page, and what is needed to fetch the other pages."""
+
+    page_num: int
+    total_pages: int
+    notams: list[LazyNotam]
+
+
+def parse_lazy_page(content: Union[bytes, str]) -> LazyPage:
+    """
+    Decodes the raw body of an API response into LazyNotams. Items that are not NOTAMs are skipped.
+
+    Only the structure of the page is checked; the NOTAMs are checked as they are read.
+
+    Raises:
+        NotamFetcherUnauthenticatedError: If client_id or client_secret are invalid.
+        NotamFetcherValidationError: If the response is not a page.
+        NotamFetcherUnexpectedError: If the response is not JSON.
+    """
+    try:
+        data = json.loads(content)
+    except ValueError:
+        text = content.decode(errors="replace") if isinstance(content, bytes) else content
+        raise NotamFetcherUnexpectedError(f"Response from API unexpectedly not JSON. Received text: {text} ")
+
+    try:
+        page_num, total_pages, items = data["pageNum"], data["totalPages"], data["items"]
+        if not (isinstance(page_num, int) and isinstance(total_pages, int) and isinstance(items, list)):
+            raise TypeError
+        notams = []
+        for item in items:
+            properties = item.get("properties")
+            if item.get("type") != "Feature" or not isinstance(properties, dict) or "coreNOTAMData" not in properties:
+                continue
+            notam = properties["coreNOTAMData"]["notam"]
+            if not isinstance(notam, dict):
+                raise TypeError
+            notams.append(LazyNotam(notam))
+    except (KeyError, TypeError, AttributeError):
+        # Raises the error of the response, e.g. invalid credentials
+        parse_response_data(data)
+        raise NotamFetcherValidationError("Could not validate response from API.", data)
+    return LazyPage(page_num, total_pages, notams)
+
+
+def _invalid_field(notam: LazyNotam, name: str) -> NotamFetcherValidationError:
+    return NotamFetcherValidationError(f"Could not validate {name} of NOTAM {notam._values[0]!r}.", notam._raw())
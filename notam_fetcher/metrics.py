@@ -0,0 +1,295 @@
+"""
+Instrumentation of NotamFetcher and AsyncNotamFetcher.
+
+Fetchers created with hooks call them for every HTTP request sent to the API (RequestEvent) and
+for every page fetched (PageEvent), with the time spent in each phase. Without hooks, the
+fetchers take no timings at all.
+
+FetchMetrics is a hook keeping counters and histograms of the events, which can be exported in
+the Prometheus text format or appended to a JSONL file. JsonlEventLog writes every event to a
+JSONL file.
+
+Example:
+    metrics = FetchMetrics()
+    notam_fetcher = NotamFetcher(CLIENT_ID, CLIENT_SECRET, hooks=[metrics, JsonlEventLog("events.jsonl")])
+    notam_fetcher.fetch_notams_by_airport_code("ORD")
+    print(metrics.prometheus_text())
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field
+from typing import IO, Any, Optional, Sequence, Union
+
+
+@dataclass
+class RequestEvent:
+    """
+    One HTTP request to the API. A page that is retried sends several.
+
+    status is None if no response was received. seconds is the time from sending the request
+    to receiving the whole body, without the time waiting for the scheduler.
+    """
+
+    query: dict[str, str]
+    attempt: int = 0
+    status: Optional[int] = None
+    bytes: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class PageEvent:
+    """
+    One page fetched, from the cache or the API.
+
+    Phases:
+        request_seconds: Sending the requests of the page, including waiting for the scheduler and
+            the backoff between retries. http_seconds is the part spent in the requests themselves.
+        parse_seconds: Decoding and validating the body. In a parse worker process for fetchers
+            with parse_workers.
+        seconds: The whole page, from the cache lookup to the validated page.
+
+    cache is "hit", "stale" or "miss" for fetchers with a cache, otherwise None.
+    """
+
+    query: dict[str, str]
+    page_num: int
+    cache: Optional[str] = None
+    requests: int = 0
+    bytes: int = 0
+    items: int = 0
+    request_seconds: float = 0.0
+    http_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.requests - 1)
+
+
+class FetchHooks:
+    """
+    Base class of fetcher hooks. Subclasses override the events they observe.
+
+    Hooks are called on the thread (or event loop) that fetched the page, so they must be
+    thread-safe and quick. An exception raised by a hook is raised by the fetch.
+    """
+
+    def on_request(self, event: RequestEvent) -> None:
+        """Called after every HTTP request, whether it succeeded or not."""
+
+    def on_page(self, event: PageEvent) -> None:
+        """Called after every page, whether it succeeded or not."""
+
+
+# Default bucket upper bounds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    """Counts observations in buckets of upper bounds, like a Prometheus histogram. Not thread-safe on its own."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> list[int]:
+        """The number of observations less than or equal to each bucket, and in total."""
+        counts = []
+        total = 0
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+
+@dataclass
+class _Metric:
+    kind: str
+    help: str
+    values: dict[tuple[tuple[str, str], ...], Any] = field(default_factory=dict)
+
+
+class FetchMetrics(FetchHooks):
+    """A hook keeping counters and histograms of every request and page of the fetchers it is attached to."""
+
+    def __init__(
+        self,
+        duration_buckets: Sequence[float] = DURATION_BUCKETS,
+        size_buckets: Sequence[float] = SIZE_BUCKETS,
+    ):
+        """
+        Args:
+            duration_buckets (Sequence[float]): The bucket upper bounds of the duration histograms, in seconds
+            size_buckets (Sequence[float]): The bucket upper bounds of the page size histogram, in bytes
+        """
+        self._duration_buckets = tuple(duration_buckets)
+        self._size_buckets = tuple(size_buckets)
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {
+            "requests_total": _Metric("counter", "HTTP requests sent to the API, by status."),
+            "request_errors_total": _Metric("counter", "HTTP requests that failed, by error."),
+            "retries_total": _Metric("counter", "HTTP requests that were retries of a failed request."),
+            "received_bytes_total": _Metric("counter", "Bytes of response bodies received from the API."),
+            "pages_total": _Metric("counter", "Pages fetched, by cache outcome."),
+            "page_errors_total": _Metric("counter", "Pages that could not be fetched, by error."),
+            "items_total": _Metric("counter", "Items of the pages fetched."),
+            "request_duration_seconds": _Metric("histogram", "Duration of HTTP requests to the API."),
+            "page_duration_seconds": _Metric("histogram", "Duration of fetching a page, from the cache or the API."),
+            "parse_duration_seconds": _Metric("histogram", "Duration of decoding and validating a page."),
+            "page_size_bytes": _Metric("histogram", "Size of the response bodies of the pages."),
+        }
+
+    def on_request(self, event: RequestEvent) -> None:
+        status = str(event.status) if event.status is not None else "none"
+        with self._lock:
+            self._increment("requests_total", 1, status=status)
+            if event.error is not None:
+                self._increment("request_errors_total", 1, error=event.error)
+            if event.attempt:
+                self._increment("retries_total", 1)
+            self._increment("received_bytes_total", event.bytes)
+            self._observe("request_duration_seconds", self._duration_buckets, event.seconds)
+
+    def on_page(self, event: PageEvent) -> None:
+        with self._lock:
+            self._increment("pages_total", 1, cache=event.cache or "none")
+            if event.error is not None:
+                self._increment("page_errors_total", 1, error=event.error)
+                return
+            self._increment("items_total", event.items)
+            self._observe("page_duration_seconds", self._duration_buckets, event.seconds)
+            if event.requests:
+                self._observe("parse_duration_seconds", self._duration_buckets, event.parse_seconds)
+                self._observe("page_size_bytes", self._size_buckets, event.bytes)
+
+    def value(self, name: str, **labels: str) -> float:
+        """The value of a counter, or the number of observations of a histogram. 0 if never recorded."""
+        with self._lock:
+            value = self._metrics[name].values.get(tuple(sorted(labels.items())), 0)
+        return value.count if isinstance(value, Histogram) else value
+
+    def to_dict(self) -> dict[str, Any]:
+        """The metrics as JSON-serializable data: counters by label string, histograms with their cumulative buckets."""
+        result: dict[str, Any] = {}
+        with self._lock:
+            for name, metric in self._metrics.items():
+                values: dict[str, Any] = {}
+                for labels, value in metric.values.items():
+                    label_string = ",".join(f"{key}={label}" for key, label in labels)
+                    if isinstance(value, Histogram):
+                        values[label_string] = {
+                            "buckets": dict(zip(map(str, value.buckets), value.cumulative_counts())),
+                            "sum": value.sum,
+                            "count": value.count,
+                        }
+                    else:
+                        values[label_string] = value
+                result[name] = values
+        return result
+
+    def write_jsonl(self, file: Union[str, IO[str]]) -> None:
+        """Appends the metrics to a JSONL file as one line, with the current time."""
+        line = json.dumps({"time": time.time(), "metrics": self.to_dict()}) + "\n"
+        if isinstance(file, str):
+            with open(file, "a", encoding="utf-8") as opened:
+                opened.write(line)
+        else:
+            file.write(line)
+
+    def prometheus_text(self, prefix: str = "notam_fetcher") -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, metric in self._metrics.items():
+                full_name = f"{prefix}_{name}"
+                lines.append(f"# HELP {full_name} {metric.help}")
+                lines.append(f"# TYPE {full_name} {metric.kind}")
+                for labels, value in sorted(metric.values.items()):
+                    if isinstance(value, Histogram):
+                        bounds = [*map(_format_number, value.buckets), "+Inf"]
+                        for bound, count in zip(bounds, value.cumulative_counts()):
+                            lines.append(f"{full_name}_bucket{_format_labels(labels + (('le', bound),))} {count}")
+                        lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_number(value.sum)}")
+                        lines.append(f"{full_name}_count{_format_labels(labels)} {value.count}")
+                    else:
+                        lines.append(f"{full_name}{_format_labels(labels)} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _increment(self, name: str, amount: float, **labels: str) -> None:
+        values = self._metrics[name].values
+        key = tuple(sorted(labels.items()))
+        values[key] = values.get(key, 0) + amount
+
+    def _observe(self, name: str, buckets: Sequence[float], value: float) -> None:
+        values = self._metrics[name].values
+        histogram = values.get(())
+        if histogram is None:
+            histogram = values[()] = Histogram(buckets)
+        histogram.observe(value)
+
+
+class JsonlEventLog(FetchHooks):
+    """A hook writing every event to a JSONL file, one line per event."""
+
+    def __init__(self, file: Union[str, IO[str]]):
+        """
+        Args:
+            file (str | IO[str]): A path to append to, or an open text file
+        """
+        self._owns_file = isinstance(file, str)
+        self._file: IO[str] = open(file, "a", encoding="utf-8") if isinstance(file, str) else file
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "JsonlEventLog":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the file if this log opened it."""
+        if self._owns_file:
+            self._file.close()
+
+    def on_request(self, event: RequestEvent) -> None:
+        self._write("request", asdict(event))
+
+    def on_page(self, event: PageEvent) -> None:
+        self._write("page", {**asdict(event), "retries": event.retries})
+
+    def _write(self, kind: str, data: dict[str, Any]) -> None:
+        line = json.dumps({"event": kind, "time": time.time(), **data}) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels) + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
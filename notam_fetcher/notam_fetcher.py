@@ -1,30 +1,144 @@
-import requests
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Any, Callable, Iterator, Optional, Protocol, Sequence, TypeVar
 
-from pydantic import ValidationError
+import requests
+from requests.adapters import HTTPAdapter
 
-from .exceptions import (
-    NotamFetcherRequestError,
-    NotamFetcherUnauthenticatedError,
-    NotamFetcherUnexpectedError,
-    NotamFetcherValidationError,
-)
+from .exceptions import NotamFetcherBaseError, NotamFetcherRequestError
 
 
 from .api_schema import Notam, NotamAPIResponse, NotamApiItem 
+from .cache import NotamCache, cache_key
+from .route import Airport, corridor_circles, merge_notams
+from .scheduler import RequestScheduler, _raise_for_status, default_scheduler
+from .single_flight import SingleFlight
+from .pipeline import PageBatch, iter_page_batches
+from .metrics import FetchHooks, PageEvent, RequestEvent
+from .archive import NotamArchive
+from .lazy_notam import LazyNotam, LazyPage, parse_lazy_page
+from .response import notams_from_page, parse_response_content
+
+
+T = TypeVar("T")
+
+
+class _Page(Protocol):
+    @property
+    def total_pages(self) -> int: ...
+
 
+P = TypeVar("P", bound=_Page)
 
 
 class NotamFetcher:
     FAA_API_URL = "https://external-api.faa.gov/notamapi/v1/notams"
 
-    def __init__(self, client_id: str, client_secret: str, page_size: int = 1000):
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        page_size: int = 1000,
+        max_workers: int = 1,
+        pool_size: Optional[int] = None,
+        session: Optional[requests.Session] = None,
+        cache: Optional[NotamCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        coalesce: bool = True,
+        parse_workers: int = 0,
+        hooks: Sequence[FetchHooks] = (),
+        archive: Optional[NotamArchive] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            client_id (str): The client id for the FAA NOTAM API
+            client_secret (str): The client secret for the FAA NOTAM API
+            page_size (int): The number of NOTAMs per page (max: 1000)
+            max_workers (int): The number of pages fetched in parallel after the first page.
+                1 fetches the pages one after another.
+            pool_size (int, optional): The number of keep-alive connections kept open to the API.
+                Defaults to max_workers, with a minimum of 10.
+            session (requests.Session, optional): A session to send requests with.
+                If None, the fetcher creates its own and closes it in close().
+            cache (NotamCache, optional): A cache for API pages, see MemoryNotamCache and
+                SQLiteNotamCache. If None, every page is requested from the API.
+            scheduler (RequestScheduler, optional): Schedules and retries the requests to the API.
+                If None, the scheduler shared by every fetcher of the process is used.
+            coalesce (bool): Whether concurrent fetch_notams_by_* calls for the same query share
+                one fetch, and all receive its result or its exception.
+            parse_workers (int): The number of worker processes validating pages for
+                fetch_notams_by_* and iter_notams_by_*, while max_workers threads download the
+                next pages. 0 validates pages on the thread that downloads them. Cannot be
+                combined with cache.
+            hooks (Sequence[FetchHooks]): Called for every request and page, see metrics.FetchMetrics
+                and metrics.JsonlEventLog.
+            archive (NotamArchive, optional): Records the raw response of every request to the API.
+                See archive.ReplaySession to fetch from an archive instead of the API.
+            timeout (float, optional): The longest to wait, in seconds, to connect to the API and for
+                each read of a response, see requests. A request that times out raises
+                NotamFetcherRequestError. If None, a stalled connection is waited on forever.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0")
+        if parse_workers < 0:
+            raise ValueError("parse_workers must not be negative")
+        if parse_workers and cache is not None:
+            raise ValueError("parse_workers cannot be combined with cache")
+        if pool_size is not None and pool_size < 1:
+            raise ValueError("pool_size must be greater than 0")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be greater than 0")
         self.client_id = client_id
         self.client_secret = client_secret
         self._page_size = page_size
+        self._max_workers = max_workers
+        self._cache = cache
+        self._scheduler = scheduler if scheduler is not None else default_scheduler()
+        self._in_flight: Optional[SingleFlight[list[Any]]] = SingleFlight() if coalesce else None
+        self._parse_workers = parse_workers
+        self._hooks = tuple(hooks)
+        self._archive = archive
+        self._timeout = timeout
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._parse_pool_lock = threading.Lock()
+        self._refresher: Optional[ThreadPoolExecutor] = None
+        self._refreshing: set[str] = set()
+        self._refreshing_lock = threading.Lock()
+        self._owns_session = session is None
+        self._session = session if session is not None else requests.Session()
+        # Sent with each request rather than set on the session, which may be the caller's
+        self._auth_headers = {"client_id": self.client_id, "client_secret": self.client_secret}
+        if self._owns_session:
+            pool_size = pool_size if pool_size is not None else max(max_workers, 10)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+    def __enter__(self) -> "NotamFetcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the session and its pooled connections if this fetcher created them, and stops the parse workers."""
+        if self._refresher is not None:
+            self._refresher.shutdown(wait=True)
+            self._refresher = None
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=True, cancel_futures=True)
+            self._parse_pool = None
+        if self._owns_session:
+            self._session.close()
 
     def fetch_notams_by_airport_code(self, airport_code: str):
         """
-        Fetches ALL notams for a particular latitude and longitude.
+        Fetches ALL notams for a particular airport code.
 
         Args:
             airport_code (str): A valid airport code.
@@ -35,29 +149,11 @@ class NotamFetcher:
         Returns:
             Notams (List[Notam]): A list of NOTAMs
         """
-        notamItems: list[Notam] = []
-
-        first_page = self._fetch_notams_by_airport_code(airport_code, 1, self._page_size)
-
-        notamItems.extend(
-            [
-                item.properties.coreNOTAMData.notam
-                for item in first_page.items
-                if isinstance(item, NotamApiItem)
-            ]
+        return self._coalesced(
+            _airport_code_flight_key(airport_code, self._page_size),
+            lambda: list(self.iter_notams_by_airport_code(airport_code)),
         )
 
-        for i in range(2, first_page.total_pages + 1):
-            nextPage = self._fetch_notams_by_airport_code(airport_code, i, self._page_size)
-            notamItems.extend(
-                [
-                    item.properties.coreNOTAMData.notam
-                    for item in nextPage.items
-                    if isinstance(item, NotamApiItem)
-                ]
-            )
-        return notamItems
-
     def fetch_notams_by_latlong(self, lat: float, long: float, radius: float = 100.0):
         """
         Fetches ALL notams for a particular latitude and longitude.
@@ -73,111 +169,344 @@ class NotamFetcher:
         Returns:
             Notams (List[Notam]): A list of NOTAMs
         """
+        return self._coalesced(
+            _latlong_flight_key(lat, long, radius, self._page_size),
+            lambda: list(self.iter_notams_by_latlong(lat, long, radius)),
+        )
+
+    def fetch_lazy_notams_by_airport_code(self, airport_code: str) -> list[LazyNotam]:
+        """
+        Fetches ALL notams for a particular airport code, as LazyNotams.
+
+        Pages are only decoded, and each NOTAM is validated field by field as it is read,
+        see lazy_notam. Pages are always requested from the API, as the cache holds validated pages.
+
+        Args:
+            airport_code (str): A valid airport code.
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        Returns:
+            Notams (List[LazyNotam]): A list of NOTAMs
+        """
+        return self._coalesced(
+            ("lazy", *_airport_code_flight_key(airport_code, self._page_size)),
+            lambda: self._fetch_lazy_notams(
+                lambda page_num: _airport_code_query(airport_code, page_num, self._page_size)
+            ),
+        )
+
+    def fetch_lazy_notams_by_latlong(self, lat: float, long: float, radius: float = 100.0) -> list[LazyNotam]:
+        """
+        Fetches ALL notams for a particular latitude and longitude, as LazyNotams.
+
+        See fetch_lazy_notams_by_airport_code.
+
+        Args:
+            lat (float): The latitude to fetch NOTAMs from
+            long (float): The longitude to fetch NOTAMs from
+            radius (float): The location radius criteria in nautical miles. (max:100)
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        Returns:
+            Notams (List[LazyNotam]): A list of NOTAMs
+        """
         if radius > 100:
             raise ValueError(f"Radius must be less than 100")
         if radius <= 0:
             raise ValueError(f"Radius must be greater than 0")
-        
-        notamItems: list[Notam] = []
-
-        first_page = self._fetch_notams_by_latlong(lat, long, radius, 1, self._page_size)
 
-        notamItems.extend(
-            [
-                item.properties.coreNOTAMData.notam
-                for item in first_page.items
-                if isinstance(item, NotamApiItem)
-            ]
+        return self._coalesced(
+            ("lazy", *_latlong_flight_key(lat, long, radius, self._page_size)),
+            lambda: self._fetch_lazy_notams(
+                lambda page_num: _latlong_query(lat, long, radius, page_num, self._page_size)
+            ),
         )
 
-        for i in range(2, first_page.total_pages + 1):
-            nextPage = self._fetch_notams_by_latlong(lat, long, radius, i, self._page_size)
-            notamItems.extend(
-                [
-                    item.properties.coreNOTAMData.notam
-                    for item in nextPage.items
-                    if isinstance(item, NotamApiItem)
-                ]
-            )
+    def iter_notams_by_airport_code(self, airport_code: str) -> Iterator[Notam]:
+        """
+        Yields ALL notams for a particular airport code, page by page.
 
-        return notamItems
+        NOTAMs are yielded as soon as their page is validated, and only the current page
+        (plus the pages being prefetched when max_workers is greater than 1) is held in memory.
 
-    def _fetch_notams_by_latlong(
-        self, lat: float, long: float, radius: float, page_num: int, page_size: int = 1000
-    ) -> NotamAPIResponse:
+        Args:
+            airport_code (str): A valid airport code.
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        Returns:
+            Notams (Iterator[Notam]): An iterator of NOTAMs
         """
-        Fetches a response from the API using latitude and longitude.
+        return self._iter_notams(
+            lambda page_num: _airport_code_query(airport_code, page_num, self._page_size)
+        )
+
+    def iter_notams_by_latlong(
+        self, lat: float, long: float, radius: float = 100.0
+    ) -> Iterator[Notam]:
+        """
+        Yields ALL notams for a particular latitude and longitude, page by page.
+
+        NOTAMs are yielded as soon as their page is validated, and only the current page
+        (plus the pages being prefetched when max_workers is greater than 1) is held in memory.
 
         Args:
             lat (float): The latitude to fetch NOTAMs from
             long (float): The longitude to fetch NOTAMs from
             radius (float): The location radius criteria in nautical miles. (max:100)
-            page_num (int): The page number of the response (min: 1)
-            page_size (int): The number of NOTAMs per page (max: 1000)
-
-        Returns:
-            NotamAPIResponse: A Notam API Response
 
         Raises:
             NotamFetcherRequestError: If a request error occurs while fetching from the API.
             NotamFetcherUnexpectedError: If an unexpected error occurs.
+        Returns:
+            Notams (Iterator[Notam]): An iterator of NOTAMs
         """
         if radius > 100:
-            raise ValueError("radius must be less than 100")
+            raise ValueError(f"Radius must be less than 100")
         if radius <= 0:
-            raise ValueError("radius must be greater than 0")
-        if page_size > 1000:
-            raise ValueError("page_size must be less than 1000")
-        if page_num < 1:
-            raise ValueError("page_num must be greater than 0")
-        
-
-        query_string = {
-            "locationLongitude": str(long),
-            "locationLatitude": str(lat),
-            "locationRadius": str(radius),
-            "page_num": str(page_num),
-            "page_size": str(page_size),
-        }
+            raise ValueError(f"Radius must be greater than 0")
 
-        try:
-            response = requests.get(
-                self.FAA_API_URL,
-                headers={
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret,
-                },
-                params=query_string,
+        return self._iter_notams(
+            lambda page_num: _latlong_query(lat, long, radius, page_num, self._page_size)
+        )
+
+    def iter_pages_by_airport_code(self, airport_code: str) -> Iterator[NotamAPIResponse]:
+        """
+        Yields every API page for a particular airport code, in page order.
+
+        Unlike iter_notams_by_airport_code, the pages keep the translations and geometry of each NOTAM.
+
+        Args:
+            airport_code (str): A valid airport code.
+
+        Returns:
+            Pages (Iterator[NotamAPIResponse]): An iterator of pages
+        """
+        return self._iter_pages(
+            lambda page_num: self._fetch_notams_by_airport_code(
+                airport_code, page_num, self._page_size
             )
+        )
 
-        except requests.exceptions.RequestException as e:
-            raise NotamFetcherRequestError from e
+    def iter_pages_by_latlong(
+        self, lat: float, long: float, radius: float = 100.0
+    ) -> Iterator[NotamAPIResponse]:
+        """
+        Yields every API page for a particular latitude and longitude, in page order.
 
-        try:
-            data = response.json()
-        except requests.exceptions.JSONDecodeError:
-            raise (
-                NotamFetcherUnexpectedError(
-                    f"Response from API unexpectedly not JSON. Received text: {response.text} "
+        Unlike iter_notams_by_latlong, the pages keep the translations and geometry of each NOTAM.
+
+        Args:
+            lat (float): The latitude to fetch NOTAMs from
+            long (float): The longitude to fetch NOTAMs from
+            radius (float): The location radius criteria in nautical miles. (max:100)
+
+        Returns:
+            Pages (Iterator[NotamAPIResponse]): An iterator of pages
+        """
+        if radius > 100:
+            raise ValueError(f"Radius must be less than 100")
+        if radius <= 0:
+            raise ValueError(f"Radius must be greater than 0")
+
+        return self._iter_pages(
+            lambda page_num: self._fetch_notams_by_latlong(
+                lat, long, radius, page_num, self._page_size
+            )
+        )
+
+    def fetch_notams_by_route(
+        self,
+        departure: Airport,
+        destination: Airport,
+        corridor_half_width: float = 25.0,
+        max_workers: Optional[int] = None,
+    ) -> list[Notam]:
+        """
+        Fetches ALL notams along the great circle between two airports.
+
+        The corridor is covered by the fewest 100 NM circles centered on the route, see
+        corridor_circles. The circles and both airports are fetched concurrently and the
+        results are merged, keeping one NOTAM per id.
+
+        Args:
+            departure (Airport): The departure airport and its position.
+            destination (Airport): The destination airport and its position.
+            corridor_half_width (float): The distance either side of the route to cover,
+                in nautical miles. (max: 99)
+            max_workers (int, optional): The number of queries fetched in parallel.
+                Defaults to one thread per query.
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        Returns:
+            Notams (List[Notam]): The NOTAMs of the departure airport, then along the route,
+                then of the destination airport
+        """
+        circles = corridor_circles(departure, destination, corridor_half_width)
+        queries: list[Callable[[], list[Notam]]] = [
+            lambda: self.fetch_notams_by_airport_code(departure.code),
+            *(
+                lambda lat=lat, long=long, radius=radius: self.fetch_notams_by_latlong(
+                    lat, long, radius
                 )
+                for lat, long, radius in circles
+            ),
+            lambda: self.fetch_notams_by_airport_code(destination.code),
+        ]
+        return merge_notams(_call_concurrently(queries, max_workers or len(queries)))
+
+    def _coalesced(self, key: tuple, fetch: Callable[[], list[T]]) -> list[T]:
+        """Runs fetch, or waits for the identical fetch already in flight. Every caller gets its own list."""
+        if self._in_flight is None:
+            return fetch()
+        return list(self._in_flight.do(key, fetch))
+
+    def _fetch_lazy_notams(self, query: Callable[[int], dict[str, str]]) -> list[LazyNotam]:
+        """The LazyNotams of every page, in page order. See _iter_notams."""
+        pages = self._iter_pages(lambda page_num: self._fetch_lazy_page(query(page_num)))
+        return [notam for page in pages for notam in page.notams]
+
+    def _iter_notams(self, query: Callable[[int], dict[str, str]]) -> Iterator[Notam]:
+        """
+        Yields the NOTAMs of every page, in page order.
+
+        With parse_workers, pages are downloaded by max_workers threads and validated by the
+        parse workers, see pipeline.iter_page_batches.
+
+        Args:
+            query (Callable[[int], dict[str, str]]): Builds the query string of a page by page number
+        """
+        if not self._parse_workers:
+            for page in self._iter_pages(lambda page_num: self._fetch_page(query(page_num))):
+                yield from notams_from_page(page)
+            return
+
+        for batch in self._iter_page_batches(query):
+            yield from batch.notams
+
+    def _iter_page_batches(self, query: Callable[[int], dict[str, str]]) -> Iterator[PageBatch]:
+        """pipeline.iter_page_batches for the pages of a query, calling the hooks for every page."""
+        max_pending = 2 * (self._max_workers + self._parse_workers)
+        if not self._hooks:
+            yield from iter_page_batches(
+                lambda page_num: self._request_content(query(page_num)),
+                self._max_workers,
+                self._get_parse_pool(),
+                max_pending,
             )
-        if data.get("error", "") == "Invalid client id or secret":
-            raise (NotamFetcherUnauthenticatedError("Invalid client id or secret"))
+            return
+
+        # The time of a page runs from its download until it is handed to the consumer
+        events: dict[int, tuple[PageEvent, float]] = {}
+
+        def fetch_content(page_num: int) -> bytes:
+            event = PageEvent(query(page_num), page_num)
+            events[page_num] = (event, time.perf_counter())
+            return self._request_content(event.query, event)
+
+        def finish(page_num: int, batch: Optional[PageBatch], error: Optional[BaseException]) -> None:
+            event, start = events.pop(page_num)
+            event.seconds = time.perf_counter() - start
+            if batch is not None:
+                event.items = len(batch.notams)
+                event.parse_seconds = batch.parse_seconds
+            if error is not None:
+                event.error = type(error).__name__
+            self._emit_page(event)
+
         try:
-            valid_response = NotamAPIResponse.model_validate(data)
-            return valid_response
-        except ValidationError:
-            raise (
-                NotamFetcherValidationError(
-                    f"Could not validate response from API.", data
+            for batch in iter_page_batches(fetch_content, self._max_workers, self._get_parse_pool(), max_pending):
+                finish(batch.page_num, batch, None)
+                yield batch
+        except NotamFetcherBaseError as e:
+            # Pages come out in page order, so the page that failed is the first one left.
+            # The io threads have stopped by the time the error is raised.
+            if events:
+                finish(min(events), None, e)
+            raise
+
+    def _get_parse_pool(self) -> ProcessPoolExecutor:
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                # Worker processes are spawned rather than forked, as the fetcher runs threads
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=self._parse_workers, mp_context=multiprocessing.get_context("spawn")
                 )
+            return self._parse_pool
+
+    def _iter_pages(self, fetch_page: Callable[[int], P]) -> Iterator[P]:
+        """
+        Fetches the first page, then every remaining page, and yields them in page order.
+
+        When max_workers is greater than 1 the remaining pages are fetched concurrently,
+        keeping at most 2 * max_workers pages fetched ahead of the consumer. If any page
+        fails, or the consumer stops iterating, the pages that have not started are cancelled.
+
+        Args:
+            fetch_page (Callable[[int], P]): Fetches a single page by page number, e.g. a NotamAPIResponse.
+
+        Returns:
+            Pages (Iterator[P]): The pages, in page order
+        """
+        first_page = fetch_page(1)
+        remaining_page_nums = iter(range(2, first_page.total_pages + 1))
+        yield first_page
+        del first_page
+
+        if self._max_workers == 1:
+            for page_num in remaining_page_nums:
+                yield fetch_page(page_num)
+            return
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            pending: deque[Future[P]] = deque(
+                executor.submit(fetch_page, page_num)
+                for page_num in islice(remaining_page_nums, 2 * self._max_workers)
             )
+            try:
+                while pending:
+                    page = pending.popleft().result()
+                    for page_num in islice(remaining_page_nums, 1):
+                        pending.append(executor.submit(fetch_page, page_num))
+                    yield page
+                    del page
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def _fetch_notams_by_latlong(
+        self, lat: float, long: float, radius: float, page_num: int, page_size: int = 1000
+    ) -> NotamAPIResponse:
+        """
+        Fetches a response from the API using latitude and longitude.
+
+        Args:
+            lat (float): The latitude to fetch NOTAMs from
+            long (float): The longitude to fetch NOTAMs from
+            radius (float): The location radius criteria in nautical miles. (max:100)
+            page_num (int): The page number of the response (min: 1)
+            page_size (int): The number of NOTAMs per page (max: 1000)
+
+        Returns:
+            NotamAPIResponse: A Notam API Response
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        """
+        return self._fetch_page(_latlong_query(lat, long, radius, page_num, page_size))
 
     def _fetch_notams_by_airport_code(
         self, airport_code: str, page_num: int, page_size: int = 1000
     ) -> NotamAPIResponse:
         """
-        Fetches a response from the API using latitude and longitude.
+        Fetches a response from the API using an airport code.
 
         Args:
             airport_code (str): A valid airport code.
@@ -191,47 +520,261 @@ class NotamFetcher:
             NotamFetcherRequestError: If a request error occurs while fetching from the API.
             NotamFetcherUnexpectedError: If an unexpected error occurs.
         """
-        if page_size > 1000:
-            raise ValueError("page_size must be less than 1000")
-        if page_num < 1:
-            raise ValueError("page_num must be greater than 0")
-        
-        query_string = {
-            "domesticLocation": str(airport_code),
-            "page_num": str(page_num),
-            "page_size": str(page_size),
-        }
+        return self._fetch_page(_airport_code_query(airport_code, page_num, page_size))
+
+    def _fetch_page(self, query_string: dict[str, str]) -> NotamAPIResponse:
+        """
+        Returns a single page, from the cache if possible, otherwise from the API.
+
+        A stale cached page is returned as is and refreshed in the background.
+        With hooks, a PageEvent of the page is emitted.
+
+        Args:
+            query_string (dict[str, str]): The query parameters of the request
+
+        Returns:
+            NotamAPIResponse: A Notam API Response
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API.
+            NotamFetcherUnauthenticatedError: If client_id or client_secret are invalid.
+            NotamFetcherValidationError: If the response does not match the schema.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        """
+        return self._observe_page(query_string, self._get_page)
+
+    def _fetch_lazy_page(self, query_string: dict[str, str]) -> LazyPage:
+        """Requests a single page from the API and decodes it into LazyNotams. The cache is not used."""
+        return self._observe_page(
+            query_string, lambda query_string, event: self._request_page(query_string, event, parse_lazy_page)
+        )
+
+    def _observe_page(
+        self, query_string: dict[str, str], fetch_page: Callable[[dict[str, str], Optional[PageEvent]], P]
+    ) -> P:
+        """Calls fetch_page(query_string, event). With hooks, event records the page and is emitted."""
+        if not self._hooks:
+            return fetch_page(query_string, None)
+
+        event = PageEvent(query_string, int(query_string["page_num"]))
+        start = time.perf_counter()
+        try:
+            page = fetch_page(query_string, event)
+            event.items = _count_notams(page)
+            return page
+        except NotamFetcherBaseError as e:
+            event.error = type(e).__name__
+            raise
+        finally:
+            event.seconds = time.perf_counter() - start
+            self._emit_page(event)
+
+    def _get_page(self, query_string: dict[str, str], event: Optional[PageEvent]) -> NotamAPIResponse:
+        """_fetch_page, recording the cache outcome and the phases of the page in event if given."""
+        if self._cache is None:
+            return self._request_page(query_string, event)
+
+        key = cache_key(query_string)
+        entry = self._cache.get(key)
+        if entry is None:
+            if event is not None:
+                event.cache = "miss"
+            page = self._request_page(query_string, event)
+            self._cache.set(key, page)
+            return page
+
+        if event is not None:
+            event.cache = "stale" if entry.is_stale else "hit"
+        if entry.is_stale:
+            self._refresh_in_background(key, query_string)
+        return entry.page
+
+    def _refresh_in_background(self, key: str, query_string: dict[str, str]) -> None:
+        """Re-requests a stale cached page on a background thread, once per key at a time."""
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresher is None:
+                self._refresher = ThreadPoolExecutor(max_workers=1)
+            self._refresher.submit(self._refresh, key, query_string)
+
+    def _refresh(self, key: str, query_string: dict[str, str]) -> None:
+        try:
+            assert self._cache is not None
+            self._cache.set(key, self._request_page(query_string))
+        except NotamFetcherBaseError:
+            # The stale page keeps being served until the next refresh succeeds or it expires
+            pass
+        finally:
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
+
+    def _request_page(
+        self,
+        query_string: dict[str, str],
+        event: Optional[PageEvent] = None,
+        parse: Optional[Callable[[bytes], Any]] = None,
+    ) -> Any:
+        """
+        Requests and validates a single page from the API, through the scheduler.
+
+        Args:
+            query_string (dict[str, str]): The query parameters of the request
+            event (PageEvent, optional): Records the requests and the phases of the page
+            parse (Callable[[bytes], Any], optional): Turns the body into a page. Defaults to
+                validating it into a NotamAPIResponse; parse_lazy_page only decodes it.
+
+        Returns:
+            Page (Any): What parse returned, a NotamAPIResponse by default
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API,
+                after retrying. NotamFetcherRateLimitError and NotamFetcherServerError if the API
+                answered 429 or 5xx.
+            NotamFetcherUnauthenticatedError: If client_id or client_secret are invalid.
+            NotamFetcherValidationError: If the response does not match the schema.
+            NotamFetcherUnexpectedError: If an unexpected error occurs.
+        """
+        if parse is None:
+            parse = parse_response_content
+        if event is None:
+            return parse(self._request_content(query_string))
+
+        content = self._request_content(query_string, event)
+        start = time.perf_counter()
+        page = parse(content)
+        event.parse_seconds = time.perf_counter() - start
+        return page
+
+    def _request_content(self, query_string: dict[str, str], event: Optional[PageEvent] = None) -> bytes:
+        """
+        Requests the raw body of a single page from the API, through the scheduler.
+
+        With event, every request is timed and emitted as a RequestEvent.
+
+        Raises:
+            NotamFetcherRequestError: If a request error occurs while fetching from the API,
+                after retrying.
+        """
+        if event is None:
+            return self._scheduler.run(self.client_id, lambda: self._request_content_once(query_string))
 
+        start = time.perf_counter()
+        try:
+            content = self._scheduler.run(
+                self.client_id, lambda: self._request_content_observed(query_string, event)
+            )
+        finally:
+            event.request_seconds = time.perf_counter() - start
+        event.bytes = len(content)
+        return content
+
+    def _request_content_observed(self, query_string: dict[str, str], event: PageEvent) -> bytes:
+        """_request_content_once, emitting a RequestEvent and adding it to the requests of event."""
+        request = RequestEvent(query_string, attempt=event.requests)
+        event.requests += 1
+        start = time.perf_counter()
+        try:
+            return self._request_content_once(query_string, request)
+        except NotamFetcherBaseError as e:
+            request.error = type(e).__name__
+            raise
+        finally:
+            request.seconds = time.perf_counter() - start
+            event.http_seconds += request.seconds
+            for hook in self._hooks:
+                hook.on_request(request)
+
+    def _request_content_once(self, query_string: dict[str, str], request: Optional[RequestEvent] = None) -> bytes:
+        """Requests the raw body of a single page from the API, without retrying. See _request_content."""
         try:
-            response = requests.get(
-                self.FAA_API_URL,
-                headers={
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret,
-                },
-                params=query_string,
+            response = self._session.get(
+                self.FAA_API_URL, params=query_string, headers=self._auth_headers, timeout=self._timeout
             )
+            content = response.content
 
         except requests.exceptions.RequestException as e:
             raise NotamFetcherRequestError from e
 
+        if request is not None:
+            request.status = response.status_code
+            request.bytes = len(content)
+        if self._archive is not None:
+            self._archive.append(query_string, response.status_code, content)
+        _raise_for_status(response.status_code, response.headers.get("Retry-After"))
+        return content
+
+    def _emit_page(self, event: PageEvent) -> None:
+        for hook in self._hooks:
+            hook.on_page(event)
+
+
+def _count_notams(page: NotamAPIResponse | LazyPage) -> int:
+    if isinstance(page, LazyPage):
+        return len(page.notams)
+    return sum(isinstance(item, NotamApiItem) for item in page.items)
+
+
+def _call_concurrently(calls: Sequence[Callable[[], T]], max_workers: int) -> list[T]:
+    """
+    Runs calls on a pool of threads and returns their results in the same order.
+
+    If any call fails, calls that have not started are cancelled and the error is raised
+    once the running calls have finished.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(call) for call in calls]
         try:
-            data = response.json()
-        except requests.exceptions.JSONDecodeError:
-            raise (
-                NotamFetcherUnexpectedError(
-                    f"Response from API unexpectedly not JSON. Received text: {response.text} "
-                )
-            )
-        if data.get("error", "") == "Invalid client id or secret":
-            raise (NotamFetcherUnauthenticatedError("Invalid client id or secret"))
-        try:
-            valid_response = NotamAPIResponse.model_validate(data)
-            return valid_response
-        except ValidationError:
-            raise (
-                NotamFetcherValidationError(
-                    f"Could not validate response from API.",
-                    data
-                )
-            )
\ No newline at end of file
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        return [future.result() for future in futures]
+
+
+def _latlong_query(
+    lat: float, long: float, radius: float, page_num: int, page_size: int
+) -> dict[str, str]:
+    """Builds the query string for a latitude/longitude request, validating its arguments."""
+    if radius > 100:
+        raise ValueError("radius must be less than 100")
+    if radius <= 0:
+        raise ValueError("radius must be greater than 0")
+    if page_size > 1000:
+        raise ValueError("page_size must be less than 1000")
+    if page_num < 1:
+        raise ValueError("page_num must be greater than 0")
+
+    return {
+        "locationLongitude": str(long),
+        "locationLatitude": str(lat),
+        "locationRadius": str(radius),
+        "page_num": str(page_num),
+        "page_size": str(page_size),
+    }
+
+
+def _airport_code_flight_key(airport_code: str, page_size: int) -> tuple:
+    """The key identical airport code fetches are coalesced on."""
+    return ("airport_code", str(airport_code).strip().upper(), page_size)
+
+
+def _latlong_flight_key(lat: float, long: float, radius: float, page_size: int) -> tuple:
+    """The key identical latitude/longitude fetches are coalesced on, to the precision of cache_key."""
+    return ("latlong", f"{float(lat):.4f}", f"{float(long):.4f}", f"{float(radius):.4f}", page_size)
+
+
+def _airport_code_query(airport_code: str, page_num: int, page_size: int) -> dict[str, str]:
+    """Builds the query string for an airport code request, validating its arguments."""
+    if page_size > 1000:
+        raise ValueError("page_size must be less than 1000")
+    if page_num < 1:
+        raise ValueError("page_num must be greater than 0")
+
+    return {
+        "domesticLocation": str(airport_code),
+        "page_num": str(page_num),
+        "page_size": str(page_size),
+    }
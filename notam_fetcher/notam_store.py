@@ -0,0 +1,96 @@
+"""
+A local store of NOTAMs that is kept in sync with the API incrementally.
+
+Example:
+    store = NotamStore()
+    diff = store.sync(notam_fetcher.fetch_notams_by_airport_code("ORD"))
+    for notam in diff.inserted + diff.updated:
+        ...
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+
+from .api_schema import Notam
+
+
+@dataclass
+class NotamDiff:
+    """The changes made to a NotamStore by one sync."""
+
+    inserted: list[Notam] = field(default_factory=list)
+    updated: list[Notam] = field(default_factory=list)
+    expired: list[Notam] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.inserted or self.updated or self.expired)
+
+
+class NotamStore:
+    """
+    NOTAMs of one feed (e.g. one airport or one area), keyed by Notam.id.
+
+    Each sync compares the fetched NOTAMs with the stored ones using Notam.last_updated
+    and returns only what changed.
+    """
+
+    def __init__(self, notams: Iterable[Notam] = ()):
+        self._notams: dict[str, Notam] = {notam.id: notam for notam in notams}
+
+    def __len__(self) -> int:
+        return len(self._notams)
+
+    def __contains__(self, notam_id: object) -> bool:
+        return notam_id in self._notams
+
+    def __iter__(self) -> Iterator[Notam]:
+        return iter(self._notams.values())
+
+    def get(self, notam_id: str) -> Optional[Notam]:
+        return self._notams.get(notam_id)
+
+    def sync(self, notams: Iterable[Notam], now: Optional[datetime] = None) -> NotamDiff:
+        """
+        Replaces the stored NOTAMs with the current feed and returns what changed.
+
+        Args:
+            notams (Iterable[Notam]): Every NOTAM currently returned by the feed.
+            now (datetime, optional): The time used to decide which NOTAMs have ended.
+                Defaults to the current time.
+
+        Returns:
+            NotamDiff: NOTAMs that are new, that have a newer last_updated than the stored
+                copy, and that expired. A NOTAM expires when its effective_end has passed or
+                when it is no longer in the feed. Expired NOTAMs are removed from the store.
+        """
+        if now is None:
+            now = datetime.now(timezone.utc)
+        elif now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+
+        diff = NotamDiff()
+        current: dict[str, Notam] = {}
+        for notam in notams:
+            if _has_ended(notam, now):
+                continue
+            current[notam.id] = notam
+
+            stored = self._notams.get(notam.id)
+            if stored is None:
+                diff.inserted.append(notam)
+            elif notam.last_updated > stored.last_updated:
+                diff.updated.append(notam)
+            else:
+                current[notam.id] = stored
+
+        diff.expired = [
+            notam for notam_id, notam in self._notams.items() if notam_id not in current
+        ]
+        self._notams = current
+        return diff
+
+
+def _has_ended(notam: Notam, now: datetime) -> bool:
+    effective_end = notam.effective_end_datetime
+    return effective_end is not None and effective_end <= now
@@ -0,0 +1,361 @@
+"""
+A columnar container for filtering and sorting large sets of NOTAMs.
+
+Example:
+    table = NotamTable.from_notams(notam_fetcher.iter_notams_by_airport_code("ORD"))
+    closures = table.filter(
+        table.active_between(departure_time, arrival_time)
+        & table.startswith("selection_code", "QMR")
+    ).sort("effective_start")
+    for notam in closures:
+        ...
+"""
+
+import sys
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union, overload
+
+import numpy as np
+import numpy.typing as npt
+
+from .api_schema import Notam
+from .effective_time import parse_effective_end, timestamp
+
+DATETIME_COLUMNS = ("issued", "effective_start", "effective_end", "last_updated")
+CATEGORICAL_COLUMNS = ("type", "selection_code", "location", "classification", "account_id", "icao_location")
+TEXT_COLUMNS = ("id", "number", "text")
+
+# effective_end of NOTAMs without a fixed end, so they sort after every dated NOTAM
+# and are active at any time after they start
+PERMANENT = np.datetime64("9999-12-31T23:59:59.999", "ms")
+
+
+def to_datetime64(value: datetime) -> np.datetime64:
+    """value as a datetime64[ms], comparable with the datetime columns. A naive datetime is assumed to be UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, "ms")
+
+
+class _Categorical:
+    """A string column stored as int32 codes into a list of distinct values. None is code -1."""
+
+    def __init__(self, codes: npt.NDArray[np.int32], categories: list[str]):
+        self.codes = codes
+        self.categories = categories
+        self._lookup = {category: code for code, category in enumerate(categories)}
+
+    @classmethod
+    def from_values(cls, values: Sequence[Optional[str]]) -> "_Categorical":
+        lookup: dict[str, int] = {}
+        categories: list[str] = []
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            if value is None:
+                codes[i] = -1
+                continue
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(categories)
+                categories.append(sys.intern(value))
+            codes[i] = code
+        return cls(codes, categories)
+
+    def take(self, indices: npt.NDArray[np.intp]) -> "_Categorical":
+        return _Categorical(self.codes[indices], self.categories)
+
+    def code_of(self, value: Optional[str]) -> int:
+        """The code of value, or -2 (which no row has) if no row has that value."""
+        if value is None:
+            return -1
+        return self._lookup.get(value, -2)
+
+    def value(self, row: int) -> Optional[str]:
+        code = self.codes[row]
+        return None if code < 0 else self.categories[code]
+
+    def values(self) -> npt.NDArray[np.object_]:
+        lookup = np.array(self.categories + [None], dtype=object)
+        return lookup[self.codes]
+
+
+class _Strings:
+    """
+    A string column stored as UTF-8 bytes and the offset of each row in them, e.g. in a table file.
+
+    Rows are decoded when they are read. Indexing with an array of rows returns the column of
+    those rows without decoding them, and np.asarray decodes the column into an object array.
+    """
+
+    def __init__(self, offsets: npt.NDArray[np.int64], data: memoryview, rows: Optional[npt.NDArray[np.intp]] = None):
+        self.offsets = offsets
+        self.data = data
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1 if self.rows is None else len(self.rows)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: npt.NDArray[np.intp]) -> "_Strings": ...
+
+    def __getitem__(self, index: Union[int, npt.NDArray[np.intp]]) -> Union[str, "_Strings"]:
+        if isinstance(index, np.ndarray):
+            return _Strings(self.offsets, self.data, index if self.rows is None else self.rows[index])
+        row = int(index) if self.rows is None else int(self.rows[index])
+        if row < 0:
+            row += len(self)
+        return str(self.data[self.offsets[row] : self.offsets[row + 1]], "utf-8")
+
+    def __array__(self, dtype: Any = None, copy: Optional[bool] = None) -> npt.NDArray[np.object_]:
+        offsets = self.offsets.tolist()
+        rows = range(len(self)) if self.rows is None else self.rows.tolist()
+        data = self.data
+        return _object_array([str(data[offsets[row] : offsets[row + 1]], "utf-8") for row in rows])
+
+
+class NotamTable:
+    """
+    NOTAMs stored column by column.
+
+    - issued, effective_start, effective_end and last_updated are datetime64[ms] arrays in UTC.
+    - type, selection_code, location, classification, account_id and icao_location are
+      categorical: int32 codes into a list of distinct, interned strings.
+    - id, number and text are object arrays of interned strings, or UTF-8 bytes decoded as rows
+      are read for a table opened from a table file (see table_file).
+
+    effective_end is a string for some NOTAMs, and is stored as follows:
+    - "PERM": PERMANENT, with is_permanent set.
+    - A date followed by "EST" (an estimated end): that date, with is_estimated set.
+    - Anything else that is not a date: NaT, treated as having no known end.
+    The original string is kept, so rows materialize to an identical Notam.
+
+    Filters return boolean masks that can be combined with & and |, and are applied with filter().
+    """
+
+    def __init__(
+        self,
+        datetimes: dict[str, npt.NDArray[np.datetime64]],
+        categoricals: dict[str, _Categorical],
+        texts: dict[str, Union[npt.NDArray[np.object_], _Strings]],
+        effective_end_text: npt.NDArray[np.object_],
+        is_estimated: npt.NDArray[np.bool_],
+    ):
+        self._datetimes = datetimes
+        self._categoricals = categoricals
+        self._texts = texts
+        self._effective_end_text = effective_end_text
+        self.is_estimated = is_estimated
+
+    @classmethod
+    def from_notams(cls, notams: Iterable[Notam]) -> "NotamTable":
+        """Builds a table in a single pass over a list or stream of NOTAMs."""
+        # POSIX timestamps, converted to datetime64 in one go at the end
+        datetimes: dict[str, list[float]] = {name: [] for name in DATETIME_COLUMNS}
+        categoricals: dict[str, list[Optional[str]]] = {name: [] for name in CATEGORICAL_COLUMNS}
+        texts: dict[str, list[str]] = {name: [] for name in TEXT_COLUMNS}
+        effective_end_text: list[Optional[str]] = []
+        is_estimated: list[bool] = []
+
+        for notam in notams:
+            for name in ("issued", "effective_start", "last_updated"):
+                datetimes[name].append(timestamp(getattr(notam, name)))
+            effective_end, estimated = parse_effective_end(notam.effective_end)
+            datetimes["effective_end"].append(effective_end)
+            is_estimated.append(estimated)
+            effective_end_text.append(
+                notam.effective_end if isinstance(notam.effective_end, str) else None
+            )
+            for name in CATEGORICAL_COLUMNS:
+                categoricals[name].append(getattr(notam, name))
+            texts["id"].append(sys.intern(notam.id))
+            texts["number"].append(sys.intern(notam.number))
+            texts["text"].append(notam.text)
+
+        return cls(
+            {name: _timestamps_to_datetime64(values) for name, values in datetimes.items()},
+            {name: _Categorical.from_values(values) for name, values in categoricals.items()},
+            {name: _object_array(values) for name, values in texts.items()},
+            _object_array(effective_end_text),
+            np.array(is_estimated, dtype=bool),
+        )
+
+    def __len__(self) -> int:
+        return len(self._texts["id"])
+
+    def __getitem__(self, row: int) -> Notam:
+        """Materializes the NOTAM of a row."""
+        if row < 0:
+            row += len(self)
+        effective_end_text = self._effective_end_text[row]
+        return Notam.model_construct(
+            id=self._texts["id"][row],
+            number=self._texts["number"][row],
+            type=self._categoricals["type"].value(row),
+            issued=_to_datetime(self._datetimes["issued"][row]),
+            selection_code=self._categoricals["selection_code"].value(row),
+            location=self._categoricals["location"].value(row),
+            effective_start=_to_datetime(self._datetimes["effective_start"][row]),
+            effective_end=(
+                effective_end_text
+                if effective_end_text is not None
+                else _to_datetime(self._datetimes["effective_end"][row])
+            ),
+            text=self._texts["text"][row],
+            classification=self._categoricals["classification"].value(row),
+            account_id=self._categoricals["account_id"].value(row),
+            last_updated=_to_datetime(self._datetimes["last_updated"][row]),
+            icao_location=self._categoricals["icao_location"].value(row),
+        )
+
+    def __iter__(self) -> Iterator[Notam]:
+        return (self[row] for row in range(len(self)))
+
+    @property
+    def is_permanent(self) -> npt.NDArray[np.bool_]:
+        return self._datetimes["effective_end"] == PERMANENT
+
+    def column(self, name: str) -> npt.NDArray:
+        """
+        Returns a column as an array.
+
+        Datetime columns are datetime64[ms], every other column is an object array of strings.
+        """
+        if name in self._datetimes:
+            return self._datetimes[name]
+        if name in self._categoricals:
+            return self._categoricals[name].values()
+        if name in self._texts:
+            return np.asarray(self._texts[name])
+        raise KeyError(f"Unknown column {name}")
+
+    def codes(self, name: str) -> tuple[npt.NDArray[np.int32], list[str]]:
+        """Returns the codes and categories of a categorical column. None is code -1."""
+        categorical = self._categoricals[name]
+        return categorical.codes, categorical.categories
+
+    def take(self, indices: npt.ArrayLike) -> "NotamTable":
+        """Returns a table of the given rows, in the given order."""
+        indices = np.asarray(indices, dtype=np.intp)
+        return NotamTable(
+            {name: values[indices] for name, values in self._datetimes.items()},
+            {name: values.take(indices) for name, values in self._categoricals.items()},
+            {name: values[indices] for name, values in self._texts.items()},
+            self._effective_end_text[indices],
+            self.is_estimated[indices],
+        )
+
+    def filter(self, mask: npt.NDArray[np.bool_]) -> "NotamTable":
+        """Returns a table of the rows where mask is True."""
+        return self.take(np.flatnonzero(mask))
+
+    def equals(self, name: str, value: Optional[str]) -> npt.NDArray[np.bool_]:
+        """Mask of the rows where a categorical column equals value."""
+        categorical = self._categoricals[name]
+        return categorical.codes == categorical.code_of(value)
+
+    def isin(self, name: str, values: Iterable[Optional[str]]) -> npt.NDArray[np.bool_]:
+        """Mask of the rows where a categorical column is one of values."""
+        categorical = self._categoricals[name]
+        return np.isin(categorical.codes, [categorical.code_of(value) for value in values])
+
+    def startswith(self, name: str, prefix: str) -> npt.NDArray[np.bool_]:
+        """Mask of the rows where a categorical column starts with prefix, e.g. selection_code "QMR"."""
+        categorical = self._categoricals[name]
+        matching = [
+            code for code, category in enumerate(categorical.categories) if category.startswith(prefix)
+        ]
+        return np.isin(categorical.codes, matching)
+
+    def active_between(self, start: datetime, end: datetime) -> npt.NDArray[np.bool_]:
+        """
+        Mask of the NOTAMs in effect at any time between start and end.
+
+        NOTAMs without a known end are treated as never ending.
+        """
+        effective_end = self._datetimes["effective_end"]
+        return (self._datetimes["effective_start"] <= to_datetime64(end)) & (
+            np.isnat(effective_end) | (effective_end >= to_datetime64(start))
+        )
+
+    def active_at(self, time: datetime) -> npt.NDArray[np.bool_]:
+        """Mask of the NOTAMs in effect at time."""
+        return self.active_between(time, time)
+
+    def argsort(self, name: str, descending: bool = False) -> npt.NDArray[np.intp]:
+        """
+        Returns the row order that sorts a column. The sort is stable.
+
+        Categorical and text columns sort by value. NaT and None sort last.
+        """
+        keys, missing = self._sort_keys(name)
+        if descending:
+            keys = -keys
+        keys[missing] = np.iinfo(np.int64).max
+        return np.argsort(keys, kind="stable")
+
+    def sort(self, name: str, descending: bool = False) -> "NotamTable":
+        """Returns the table sorted by a column, see argsort."""
+        return self.take(self.argsort(name, descending))
+
+    def group_by(self, name: str) -> dict[Optional[str], "NotamTable"]:
+        """Splits the table by the value of a categorical column, keeping the row order in each group."""
+        categorical = self._categoricals[name]
+        order = np.argsort(categorical.codes, kind="stable")
+        codes, starts = np.unique(categorical.codes[order], return_index=True)
+        stops = np.append(starts[1:], len(order))
+        return {
+            (None if code < 0 else categorical.categories[code]): self.take(order[start:stop])
+            for code, start, stop in zip(codes, starts, stops)
+        }
+
+    def _sort_keys(self, name: str) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.bool_]]:
+        """Returns an int64 key per row that sorts like the column, and a mask of missing values."""
+        if name in self._datetimes:
+            values = self._datetimes[name]
+            missing = np.isnat(values)
+            keys = values.astype(np.int64)
+        elif name in self._categoricals:
+            categorical = self._categoricals[name]
+            ranks = np.zeros(len(categorical.categories) + 1, dtype=np.int64)
+            ranks[np.argsort(_object_array(categorical.categories), kind="stable")] = np.arange(
+                len(categorical.categories)
+            )
+            missing = categorical.codes < 0
+            keys = ranks[categorical.codes]
+        elif name in self._texts:
+            missing = np.zeros(len(self), dtype=bool)
+            keys = np.unique(np.asarray(self._texts[name]), return_inverse=True)[1].astype(np.int64)
+        else:
+            raise KeyError(f"Unknown column {name}")
+        keys[missing] = 0
+        return keys, missing
+
+    def value_counts(self, name: str) -> dict[Optional[str], int]:
+        """Counts the rows of each value of a categorical column."""
+        categorical = self._categoricals[name]
+        codes, counts = np.unique(categorical.codes, return_counts=True)
+        return {
+            (None if code < 0 else categorical.categories[code]): int(count)
+            for code, count in zip(codes, counts)
+        }
+
+
+def _object_array(values: Sequence[Optional[str]]) -> npt.NDArray[np.object_]:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _to_datetime(value: np.datetime64) -> datetime:
+    return value.astype("datetime64[ms]").item().replace(tzinfo=timezone.utc)
+
+
+def _timestamps_to_datetime64(timestamps: list[float]) -> npt.NDArray[np.datetime64]:
+    """Converts POSIX timestamps to datetime64[ms]. NaN becomes NaT."""
+    seconds = np.array(timestamps, dtype=np.float64)
+    milliseconds = np.round(seconds * 1000)
+    milliseconds[np.isnan(seconds)] = np.iinfo(np.int64).min
+    return milliseconds.astype(np.int64).view("datetime64[ms]")
@@ -0,0 +1,135 @@
+"""
+A fetch pipeline that overlaps downloading pages with validating them on other cores.
+
+I/O threads download the raw bytes of each page. As soon as a page is downloaded it is
+validated by a pool of worker processes, which send back only the NOTAMs of the page.
+Pages come out in page order, and at most max_pending pages are downloaded or validated
+ahead of the consumer, so a slow consumer holds back the downloads.
+
+Used by NotamFetcher when it is created with parse_workers.
+"""
+
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Executor, Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterator
+
+from .api_schema import Notam
+from .exceptions import NotamFetcherValidationError
+from .response import notams_from_page, parse_response_content
+
+
+class PageBatch:
+    """The NOTAMs of one page, as validated by a worker process."""
+
+    __slots__ = ("page_num", "total_pages", "notams", "parse_seconds")
+
+    def __init__(self, page_num: int, total_pages: int, notams: list[Notam], parse_seconds: float = 0.0):
+        self.page_num = page_num
+        self.total_pages = total_pages
+        self.notams = notams
+        self.parse_seconds = parse_seconds
+
+    def __reduce__(self):
+        return (PageBatch, (self.page_num, self.total_pages, self.notams, self.parse_seconds))
+
+
+def validate_page(content: bytes, page_num: int) -> PageBatch:
+    """
+    Validates the raw body of a page in a worker process.
+
+    Raises:
+        NotamFetcherValidationError: If the page does not match the schema, with page_num set.
+        NotamFetcherUnauthenticatedError: If client_id or client_secret are invalid.
+        NotamFetcherUnexpectedError: If the page is not JSON.
+    """
+    start = time.perf_counter()
+    try:
+        page = parse_response_content(content)
+    except NotamFetcherValidationError as e:
+        raise NotamFetcherValidationError(
+            f"Could not validate page {page_num} of the response from API.", e.invalid_object, page_num
+        ) from None
+    notams = notams_from_page(page)
+    return PageBatch(page_num, page.total_pages, notams, time.perf_counter() - start)
+
+
+def iter_page_batches(
+    fetch_content: Callable[[int], bytes],
+    io_workers: int,
+    parse_pool: Executor,
+    max_pending: int,
+) -> Iterator[PageBatch]:
+    """
+    Downloads and validates every page of a query, and yields their NOTAMs in page order.
+
+    The first page is downloaded and validated on its own, to learn the number of pages.
+    If any page fails, or the consumer stops iterating, the pages that have not started
+    are cancelled and the error is raised as is.
+
+    Args:
+        fetch_content (Callable[[int], bytes]): Downloads the raw body of a page by page number
+        io_workers (int): The number of threads downloading pages
+        parse_pool (Executor): Validates pages, usually a ProcessPoolExecutor
+        max_pending (int): The most pages downloaded or validated ahead of the consumer
+    """
+    first_batch = parse_pool.submit(validate_page, fetch_content(1), 1).result()
+    remaining_page_nums = iter(range(2, first_batch.total_pages + 1))
+    yield first_batch
+    del first_batch
+
+    with ThreadPoolExecutor(max_workers=io_workers) as io_pool:
+        pending: deque[Future[PageBatch]] = deque()
+
+        def submit(page_num: int) -> None:
+            pending.append(_chain(io_pool.submit(fetch_content, page_num), parse_pool, page_num))
+
+        for page_num in islice(remaining_page_nums, max_pending):
+            submit(page_num)
+        try:
+            while pending:
+                batch = pending.popleft().result()
+                for page_num in islice(remaining_page_nums, 1):
+                    submit(page_num)
+                yield batch
+                del batch
+        finally:
+            # Pages already handed to parse_pool are validated, and their result dropped
+            io_pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _chain(download: "Future[bytes]", parse_pool: Executor, page_num: int) -> "Future[PageBatch]":
+    """Returns a future of the validated page, submitted to parse_pool as soon as download is done."""
+    batch: Future[PageBatch] = Future()
+    batch.set_running_or_notify_cancel()
+
+    def on_downloaded(download: "Future[bytes]") -> None:
+        if download.cancelled():
+            batch.set_exception(CancelledError())
+            return
+        error = download.exception()
+        if error is not None:
+            batch.set_exception(error)
+            return
+        try:
+            validation = parse_pool.submit(validate_page, download.result(), page_num)
+        except RuntimeError as e:
+            # The pool was shut down while the page was downloading
+            batch.set_exception(e)
+            return
+        validation.add_done_callback(lambda validation: _copy_result(validation, batch))
+
+    download.add_done_callback(on_downloaded)
+    return batch
+
+
+def _copy_result(source: "Future[PageBatch]", target: "Future[PageBatch]") -> None:
+    if source.cancelled():
+        target.set_exception(CancelledError())
+        return
+    error = source.exception()
+    if error is not None:
+        target.set_exception(error)
+    else:
+        target.set_result(source.result())
@@ -0,0 +1,204 @@
+"""
+Ranks a NotamTable by how much each NOTAM matters to a flight.
+
+Each NOTAM is scored as the sum of:
+- The weight of its Q-code (selection_code), by longest matching prefix, so "QMRLC" (runway closed)
+  can be weighted above "QMR" (any other runway NOTAM).
+- The weight of its classification.
+- The weight of each keyword found in its text, counted once per NOTAM.
+- time_weight if it is in effect during the flight window, decaying by half every
+  time_half_life_hours it starts after or ends before the window.
+
+Example:
+    table = NotamTable.from_notams(notam_fetcher.fetch_notams_by_route(departure, destination))
+    prioritizer = NotamPrioritizer()
+    rows = prioritizer.rank(table, window=(departure_time, arrival_time), top_k=50)
+    for notam in table.take(rows):
+        ...
+"""
+
+import re
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Mapping, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from .notam_table import NotamTable, to_datetime64
+
+DEFAULT_QCODE_WEIGHTS = {
+    "QFA": 60.0,  # Aerodrome
+    "QFALC": 100.0,  # Aerodrome closed
+    "QMR": 60.0,  # Runway
+    "QMRLC": 100.0,  # Runway closed
+    "QMX": 30.0,  # Taxiway
+    "QMXLC": 40.0,  # Taxiway closed
+    "QIC": 50.0,  # Instrument landing system
+    "QN": 40.0,  # Navigation aids
+    "QRT": 70.0,  # Temporary restricted area
+    "QRTCA": 90.0,  # Temporary restricted area activated
+    "QR": 50.0,  # Airspace restrictions
+    "QW": 50.0,  # Navigation warnings
+    "QA": 30.0,  # Airspace organization
+    "QS": 30.0,  # Air traffic services
+    "QP": 30.0,  # Air traffic procedures
+    "QOB": 20.0,  # Obstacles
+    "QOBCE": 25.0,  # Obstacle erected
+    "QL": 15.0,  # Lighting
+    "QC": 10.0,  # Communications and surveillance
+}
+DEFAULT_CLASSIFICATION_WEIGHTS = {"FDC": 30.0, "INTL": 10.0, "DOM": 10.0, "MIL": 0.0, "LMIL": 0.0}
+DEFAULT_KEYWORD_WEIGHTS = {
+    "CLSD": 20.0,
+    "TFR": 30.0,
+    "U/S": 15.0,
+    "UNUSABLE": 15.0,
+    "UNSERVICEABLE": 15.0,
+    "UAS": 10.0,
+    "OBST": 5.0,
+    "CRANE": 5.0,
+}
+
+
+@dataclass(frozen=True)
+class PriorityRules:
+    """The weights a NotamPrioritizer scores with. Missing Q-codes, classifications and keywords score 0."""
+
+    qcode_weights: Mapping[str, float] = field(default_factory=lambda: dict(DEFAULT_QCODE_WEIGHTS))
+    classification_weights: Mapping[str, float] = field(
+        default_factory=lambda: dict(DEFAULT_CLASSIFICATION_WEIGHTS)
+    )
+    keyword_weights: Mapping[str, float] = field(default_factory=lambda: dict(DEFAULT_KEYWORD_WEIGHTS))
+    time_weight: float = 50.0
+    time_half_life_hours: float = 6.0
+
+
+class NotamPrioritizer:
+    """
+    Scores every row of a NotamTable in a few array operations.
+
+    Q-code and classification weights are looked up once per distinct value of the column, then
+    gathered by the column's codes. The keyword score needs a pass over the text of every row,
+    so it is computed once per table and reused while the table is alive: scoring the same
+    table for another flight window only redoes the time score.
+    """
+
+    def __init__(self, rules: Optional[PriorityRules] = None):
+        """
+        Args:
+            rules (PriorityRules, optional): The weights to score with. Defaults to PriorityRules().
+        """
+        self.rules = rules if rules is not None else PriorityRules()
+        if self.rules.time_half_life_hours <= 0:
+            raise ValueError("time_half_life_hours must be greater than 0")
+        # Longest prefixes first, so the first match is the most specific
+        self._qcode_prefixes = sorted(self.rules.qcode_weights, key=len, reverse=True)
+        self._keyword_pattern = (
+            re.compile(
+                r"(?<![A-Z0-9])(?:"
+                + "|".join(
+                    re.escape(keyword.upper())
+                    for keyword in sorted(self.rules.keyword_weights, key=len, reverse=True)
+                )
+                + r")(?![A-Z0-9])"
+            )
+            if self.rules.keyword_weights
+            else None
+        )
+        self._keyword_weights = {
+            keyword.upper(): weight for keyword, weight in self.rules.keyword_weights.items()
+        }
+        self._keyword_scores: "weakref.WeakKeyDictionary[NotamTable, npt.NDArray[np.float64]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def score(
+        self, table: NotamTable, window: Optional[tuple[datetime, datetime]] = None
+    ) -> npt.NDArray[np.float64]:
+        """
+        Returns the score of every row of table.
+
+        Args:
+            table (NotamTable): The NOTAMs to score
+            window (tuple[datetime, datetime], optional): The (departure, arrival) times of the flight.
+                Without a window, the time score is 0.
+        """
+        scores = self._category_scores(table, "selection_code", self._qcode_weight)
+        scores += self._category_scores(
+            table, "classification", lambda value: self.rules.classification_weights.get(value, 0.0)
+        )
+        scores += self._keyword_scores_of(table)
+        if window is not None:
+            scores += self._time_scores(table, *window)
+        return scores
+
+    def rank(
+        self,
+        table: NotamTable,
+        window: Optional[tuple[datetime, datetime]] = None,
+        top_k: Optional[int] = None,
+    ) -> npt.NDArray[np.intp]:
+        """
+        Returns the rows of table from highest to lowest score. Equal scores keep the table order.
+
+        Args:
+            table (NotamTable): The NOTAMs to rank
+            window (tuple[datetime, datetime], optional): The (departure, arrival) times of the flight
+            top_k (int, optional): Only return the top_k highest scoring rows. Only those rows are sorted.
+        """
+        scores = self.score(table, window)
+        if top_k is None or top_k >= len(scores):
+            return np.argsort(-scores, kind="stable")
+        if top_k <= 0:
+            return np.empty(0, dtype=np.intp)
+
+        # Every row scoring above the k-th highest score, plus as many rows tied with it as fit
+        threshold = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+        candidates = np.flatnonzero(scores >= threshold)
+        order = np.argsort(-scores[candidates], kind="stable")
+        return candidates[order[:top_k]]
+
+    def _qcode_weight(self, selection_code: str) -> float:
+        for prefix in self._qcode_prefixes:
+            if selection_code.startswith(prefix):
+                return self.rules.qcode_weights[prefix]
+        return 0.0
+
+    @staticmethod
+    def _category_scores(
+        table: NotamTable, name: str, weight_of: Callable[[str], float]
+    ) -> npt.NDArray[np.float64]:
+        codes, categories = table.codes(name)
+        # The last weight is for code -1 (None)
+        weights = np.array([weight_of(category) for category in categories] + [0.0], dtype=np.float64)
+        return weights[codes]
+
+    def _keyword_scores_of(self, table: NotamTable) -> npt.NDArray[np.float64]:
+        if self._keyword_pattern is None:
+            return np.zeros(len(table), dtype=np.float64)
+        scores = self._keyword_scores.get(table)
+        if scores is None:
+            pattern, weights = self._keyword_pattern, self._keyword_weights
+            scores = np.fromiter(
+                (
+                    sum(weights[keyword] for keyword in set(pattern.findall(text.upper())))
+                    for text in table.column("text")
+                ),
+                dtype=np.float64,
+                count=len(table),
+            )
+            self._keyword_scores[table] = scores
+        return scores
+
+    def _time_scores(self, table: NotamTable, start: datetime, end: datetime) -> npt.NDArray[np.float64]:
+        effective_start = table.column("effective_start")
+        effective_end = table.column("effective_end")
+        # Milliseconds between the NOTAM and the window, 0 if they overlap. NOTAMs without a known end never end.
+        starts_after = (effective_start - to_datetime64(end)).astype(np.int64)
+        ends_before = np.where(
+            np.isnat(effective_end), 0, (to_datetime64(start) - effective_end).astype(np.int64)
+        )
+        gap_hours = np.maximum(np.maximum(starts_after, ends_before), 0) / 3_600_000
+        return self.rules.time_weight * np.exp2(-gap_hours / self.rules.time_half_life_hours)
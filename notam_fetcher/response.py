@@ -0,0 +1,79 @@
+"""
+Validation of API response bodies into pages of NOTAMs, shared by the fetchers, the fetch
+pipeline and the page archive.
+
+Example:
+    page = parse_response_content(response.content)
+    notams = notams_from_page(page)
+"""
+
+import json
+from typing import Any
+
+from pydantic import ValidationError
+
+from .api_schema import Notam, NotamAPIResponse, NotamApiItem
+from .exceptions import (
+    NotamFetcherUnauthenticatedError,
+    NotamFetcherUnexpectedError,
+    NotamFetcherValidationError,
+)
+
+
+def notams_from_page(page: NotamAPIResponse) -> list[Notam]:
+    """Returns the NOTAMs of a page, skipping items that are not NOTAMs."""
+    return [
+        item.properties.coreNOTAMData.notam
+        for item in page.items
+        if isinstance(item, NotamApiItem)
+    ]
+
+
+def parse_response_content(content: bytes | str) -> NotamAPIResponse:
+    """
+    Validates the raw body of an API response.
+
+    The body is validated straight from its bytes, without decoding it to Python objects
+    first. Only if that fails is it decoded, to raise the same errors as parse_response_data.
+
+    Raises:
+        NotamFetcherUnauthenticatedError: If client_id or client_secret are invalid.
+        NotamFetcherValidationError: If the response does not match the schema.
+        NotamFetcherUnexpectedError: If the response is not JSON.
+    """
+    try:
+        return NotamAPIResponse.model_validate_json(content)
+    except ValidationError:
+        pass
+
+    try:
+        data = json.loads(content)
+    except ValueError:
+        text = content.decode(errors="replace") if isinstance(content, bytes) else content
+        raise (
+            NotamFetcherUnexpectedError(
+                f"Response from API unexpectedly not JSON. Received text: {text} "
+            )
+        )
+    return parse_response_data(data)
+
+
+def parse_response_data(data: Any) -> NotamAPIResponse:
+    """
+    Validates the decoded JSON of an API response.
+
+    Raises:
+        NotamFetcherUnauthenticatedError: If client_id or client_secret are invalid.
+        NotamFetcherValidationError: If the response does not match the schema.
+    """
+    if isinstance(data, dict) and data.get("error", "") == "Invalid client id or secret":
+        raise (NotamFetcherUnauthenticatedError("Invalid client id or secret"))
+    try:
+        valid_response = NotamAPIResponse.model_validate(data)
+        return valid_response
+    except ValidationError:
+        raise (
+            NotamFetcherValidationError(
+                f"Could not validate response from API.", data
+            )
+        )
@@ -0,0 +1,136 @@
+"""
+Geometry used to fetch the NOTAMs along a route.
+
+The API only answers circles of at most 100 NM, so a route is covered by a row of
+circles centered on the great circle between the two airports.
+"""
+
+import math
+from typing import Iterable, NamedTuple
+
+from .api_schema import Notam
+
+EARTH_RADIUS_NM = 3440.065
+MAX_QUERY_RADIUS_NM = 100.0
+
+
+class Airport(NamedTuple):
+    code: str
+    lat: float
+    long: float
+
+
+def great_circle_distance(lat1: float, long1: float, lat2: float, long2: float) -> float:
+    """Returns the great-circle distance between two points in nautical miles."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(long2 - long1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def interpolate_great_circle(
+    lat1: float, long1: float, lat2: float, long2: float, fraction: float
+) -> tuple[float, float]:
+    """Returns the point at fraction (0 to 1) of the way along the great circle between two points."""
+    phi1, lambda1 = math.radians(lat1), math.radians(long1)
+    phi2, lambda2 = math.radians(lat2), math.radians(long2)
+    delta = great_circle_distance(lat1, long1, lat2, long2) / EARTH_RADIUS_NM
+    if delta == 0:
+        return lat1, long1
+
+    a = math.sin((1 - fraction) * delta) / math.sin(delta)
+    b = math.sin(fraction * delta) / math.sin(delta)
+    x = a * math.cos(phi1) * math.cos(lambda1) + b * math.cos(phi2) * math.cos(lambda2)
+    y = a * math.cos(phi1) * math.sin(lambda1) + b * math.cos(phi2) * math.sin(lambda2)
+    z = a * math.sin(phi1) + b * math.sin(phi2)
+    return math.degrees(math.atan2(z, math.hypot(x, y))), math.degrees(math.atan2(y, x))
+
+
+def initial_bearing(lat1: float, long1: float, lat2: float, long2: float) -> float:
+    """Returns the initial great-circle bearing from the first point to the second, in radians."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dlambda = math.radians(long2 - long1)
+    return math.atan2(
+        math.sin(dlambda) * math.cos(phi2),
+        math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(dlambda),
+    )
+
+
+def distance_to_segment(
+    lat: float, long: float, start: tuple[float, float], end: tuple[float, float]
+) -> float:
+    """Returns the distance in nautical miles from a point to the great-circle segment between start and end."""
+    distance_from_start = great_circle_distance(start[0], start[1], lat, long)
+    segment_length = great_circle_distance(start[0], start[1], end[0], end[1])
+    if segment_length == 0 or distance_from_start == 0:
+        return distance_from_start
+
+    angle = initial_bearing(start[0], start[1], lat, long) - initial_bearing(*start, *end)
+    if math.cos(angle) <= 0:
+        return distance_from_start
+
+    angular_distance = distance_from_start / EARTH_RADIUS_NM
+    cross_track = math.asin(max(-1.0, min(1.0, math.sin(angular_distance) * math.sin(angle))))
+    along_track = math.acos(max(-1.0, min(1.0, math.cos(angular_distance) / math.cos(cross_track))))
+    if along_track * EARTH_RADIUS_NM >= segment_length:
+        return great_circle_distance(end[0], end[1], lat, long)
+    return abs(cross_track) * EARTH_RADIUS_NM
+
+
+def corridor_circles(
+    departure: Airport,
+    destination: Airport,
+    corridor_half_width: float,
+    radius: float = MAX_QUERY_RADIUS_NM,
+) -> list[tuple[float, float, float]]:
+    """
+    Returns the fewest circles of the given radius, centered on the great circle between
+    two airports, that cover every point within corridor_half_width of the route.
+
+    A circle of radius r covers a length of 2 * sqrt(r^2 - w^2) of a corridor of half width w,
+    so the route is split into that many equal segments with a circle in the middle of each.
+
+    Args:
+        departure (Airport): The start of the route.
+        destination (Airport): The end of the route.
+        corridor_half_width (float): The distance either side of the route to cover, in nautical miles.
+        radius (float): The radius of each circle in nautical miles. (max: 100)
+
+    Returns:
+        Circles (List[tuple[float, float, float]]): (lat, long, radius) of each circle, from departure to destination
+    """
+    if radius > MAX_QUERY_RADIUS_NM:
+        raise ValueError("radius must be less than 100")
+    if not 0 <= corridor_half_width < radius:
+        raise ValueError("corridor_half_width must be between 0 and radius")
+
+    distance = great_circle_distance(departure.lat, departure.long, destination.lat, destination.long)
+    covered_length = 2 * math.sqrt(radius**2 - corridor_half_width**2)
+    circle_count = max(1, math.ceil(distance / covered_length))
+
+    return [
+        (
+            *interpolate_great_circle(
+                departure.lat,
+                departure.long,
+                destination.lat,
+                destination.long,
+                (i + 0.5) / circle_count,
+            ),
+            radius,
+        )
+        for i in range(circle_count)
+    ]
+
+
+def merge_notams(notam_lists: Iterable[Iterable[Notam]]) -> list[Notam]:
+    """Concatenates lists of NOTAMs, keeping only the first NOTAM with each id."""
+    seen: set[str] = set()
+    merged: list[Notam] = []
+    for notams in notam_lists:
+        for notam in notams:
+            if notam.id not in seen:
+                seen.add(notam.id)
+                merged.append(notam)
+    return merged
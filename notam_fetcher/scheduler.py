@@ -0,0 +1,279 @@
+"""
+Schedules the requests of NotamFetcher and AsyncNotamFetcher within the limits of the API.
+
+For each credential (client_id) the scheduler:
+- Spends one token of a token bucket per request, if a rate is set, so requests stay within the quota.
+- Limits the requests in flight to a concurrency limit that grows by one for every limit
+  successful requests, and is multiplied by decrease_factor when a request fails (AIMD).
+- Retries failed requests (NotamFetcherRequestError: connection errors, 429 and 5xx) with jittered
+  exponential backoff. After a 429 with a Retry-After header, no request of the credential
+  is sent until Retry-After has passed.
+
+Unless given their own, fetchers share default_scheduler(), so every fetcher of a process using
+the same credentials shares one budget.
+
+Example:
+    scheduler = RequestScheduler(rate=5, burst=10, max_retries=3)
+    notam_fetcher = NotamFetcher(CLIENT_ID, CLIENT_SECRET, max_workers=8, scheduler=scheduler)
+"""
+
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from .exceptions import NotamFetcherRateLimitError, NotamFetcherRequestError, NotamFetcherServerError
+
+T = TypeVar("T")
+
+# How often run_async checks for a free slot while the concurrency limit is reached
+_ASYNC_POLL_INTERVAL = 0.01
+
+
+class _CredentialState:
+    """The budget of one credential. Guarded by condition."""
+
+    def __init__(self, burst: float, concurrency: float):
+        self.condition = threading.Condition()
+        self.tokens = burst
+        self.refilled_at = time.monotonic()
+        self.limit = concurrency
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.decreased_at = 0.0
+
+
+class RequestScheduler:
+    """Runs API requests within a token bucket and an adaptive concurrency limit per credential, with retries."""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        decrease_factor: float = 0.5,
+    ):
+        """
+        Args:
+            rate (float, optional): Requests per second allowed per credential. None for no limit.
+            burst (float, optional): The number of requests that can be sent at once after a pause.
+                Defaults to rate, with a minimum of 1.
+            max_retries (int): The number of times a failed request is retried
+            backoff_base (float): The maximum wait in seconds before the first retry. Doubles every retry.
+            backoff_max (float): The maximum wait in seconds before any retry
+            initial_concurrency (int): The concurrency limit of a new credential
+            min_concurrency (int): The lowest the concurrency limit goes
+            max_concurrency (int): The highest the concurrency limit goes
+            decrease_factor (float): What the concurrency limit is multiplied by when a request fails
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative")
+        if not 1 <= min_concurrency <= initial_concurrency <= max_concurrency:
+            raise ValueError("concurrency must be 1 <= min_concurrency <= initial_concurrency <= max_concurrency")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate or 1.0, 1.0)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self._states: dict[str, _CredentialState] = {}
+        self._states_lock = threading.Lock()
+        self._random = random.Random()
+
+    def concurrency_limit(self, credential: str) -> float:
+        """The current concurrency limit of a credential."""
+        return self._state(credential).limit
+
+    def run(self, credential: str, request: Callable[[], T]) -> T:
+        """
+        Sends a request when the budget of credential allows, retrying it if it fails.
+
+        Only use with idempotent requests, as a request may be sent several times.
+
+        Args:
+            credential (str): The credential the request is sent with, e.g. the client_id
+            request (Callable[[], T]): Sends the request. Raises NotamFetcherRequestError if it can be retried.
+
+        Raises:
+            NotamFetcherRequestError: The error of the last attempt, if every attempt failed.
+        """
+        state = self._state(credential)
+        attempt = 0
+        while True:
+            started = self._acquire(state)
+            try:
+                result = request()
+            except NotamFetcherRequestError as error:
+                self._release(state, started, error)
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+            except BaseException:
+                self._release(state, started, None, succeeded=False)
+                raise
+            else:
+                self._release(state, started, None)
+                return result
+
+    async def run_async(self, credential: str, request: Callable[[], Awaitable[T]]) -> T:
+        """asyncio version of run. The budget of a credential is shared with run."""
+        state = self._state(credential)
+        attempt = 0
+        while True:
+            started = await self._acquire_async(state)
+            try:
+                result = await request()
+            except NotamFetcherRequestError as error:
+                self._release(state, started, error)
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+            except BaseException:
+                self._release(state, started, None, succeeded=False)
+                raise
+            else:
+                self._release(state, started, None)
+                return result
+
+    def _state(self, credential: str) -> _CredentialState:
+        with self._states_lock:
+            state = self._states.get(credential)
+            if state is None:
+                state = self._states[credential] = _CredentialState(self.burst, self.initial_concurrency)
+            return state
+
+    def _try_acquire(self, state: _CredentialState) -> tuple[Optional[float], Optional[float]]:
+        """
+        Takes a slot and a token if both are free. Must hold state.condition.
+
+        Returns:
+            (started, wait): The time the request started, or None and how long to wait before trying
+                again. A wait of None means until a request finishes.
+        """
+        now = time.monotonic()
+        if self.rate is not None:
+            state.tokens = min(self.burst, state.tokens + (now - state.refilled_at) * self.rate)
+            state.refilled_at = now
+        if now < state.cooldown_until:
+            return None, state.cooldown_until - now
+        if state.in_flight >= int(state.limit):
+            return None, None
+        if self.rate is not None:
+            if state.tokens < 1:
+                return None, (1 - state.tokens) / self.rate
+            state.tokens -= 1
+        state.in_flight += 1
+        return now, None
+
+    def _acquire(self, state: _CredentialState) -> float:
+        with state.condition:
+            while True:
+                started, wait = self._try_acquire(state)
+                if started is not None:
+                    return started
+                state.condition.wait(wait)
+
+    async def _acquire_async(self, state: _CredentialState) -> float:
+        while True:
+            with state.condition:
+                started, wait = self._try_acquire(state)
+            if started is not None:
+                return started
+            await asyncio.sleep(wait if wait is not None else _ASYNC_POLL_INTERVAL)
+
+    def _release(
+        self,
+        state: _CredentialState,
+        started: float,
+        error: Optional[NotamFetcherRequestError],
+        succeeded: bool = True,
+    ) -> None:
+        """
+        Frees the slot of a request and adjusts the concurrency limit to its outcome.
+
+        A request that failed for a reason other than a request error (e.g. an invalid response)
+        leaves the limit as it is.
+        """
+        with state.condition:
+            state.in_flight -= 1
+            now = time.monotonic()
+            if error is None:
+                if succeeded:
+                    state.limit = min(self.max_concurrency, state.limit + 1 / state.limit)
+            else:
+                # Requests that were already in flight when the limit was last decreased
+                # failed because of the old limit, so they do not decrease it again
+                if started >= state.decreased_at:
+                    state.limit = max(self.min_concurrency, state.limit * self.decrease_factor)
+                    state.decreased_at = now
+                if isinstance(error, NotamFetcherRateLimitError) and error.retry_after:
+                    state.cooldown_until = max(state.cooldown_until, now + error.retry_after)
+            state.condition.notify_all()
+
+    def _backoff(self, attempt: int) -> float:
+        """A random wait between 0 and backoff_base * 2^attempt seconds, capped at backoff_max ("full jitter")."""
+        with self._states_lock:
+            return self._random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+
+_default_scheduler: Optional[RequestScheduler] = None
+_default_scheduler_lock = threading.Lock()
+
+
+def default_scheduler() -> RequestScheduler:
+    """The scheduler shared by fetchers created without one."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
+
+
+def _raise_for_status(status: int, retry_after: Optional[str]) -> None:
+    """
+    Raises the errors worth retrying for the status of a response.
+
+    Other statuses are left to the body of the response, e.g. the error of a 401.
+
+    Raises:
+        NotamFetcherRateLimitError: If the status is 429.
+        NotamFetcherServerError: If the status is 5xx.
+    """
+    if status == 429:
+        raise NotamFetcherRateLimitError("API rate limit exceeded", _parse_retry_after(retry_after))
+    if status >= 500:
+        raise NotamFetcherServerError(f"API answered with status {status}", status)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Returns a Retry-After header, in seconds or as an HTTP date, as seconds from now."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
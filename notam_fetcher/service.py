@@ -0,0 +1,456 @@
+"""
+A long-running local NOTAM service: keeps airports and areas up to date, serves them from memory over
+HTTP (TCP or a Unix socket) and pushes their changes to subscribers.
+
+Each WatchedFeed is synced with a NotamStore on its own interval, and every change the sync finds is
+recorded as a numbered ChangeEvent: "new", "amended" (a newer last_updated) or "cancelled" (no
+longer in the feed, or ended). The first sync of a feed fills it without events. Queries are
+answered from JSON kept up to date with the feeds, so clients share a single upstream fetch loop.
+
+Endpoints:
+    GET /feeds                          The feeds, their size and the time and error of their last sync
+    GET /notams?feed=&location=         {"seq", "notams"}: the NOTAMs of a feed, or of all feeds
+    GET /notams/<id>                    One NOTAM
+    GET /events?since=&feed=&timeout=   Long-poll: {"seq", "events"} after event since, waiting up to
+                                        timeout seconds for one. 410 if those events are no longer kept.
+    GET /events/stream?since=&feed=     The same events as server-sent events, resuming from Last-Event-ID
+
+A client reads /notams, then follows /events from the seq it returned.
+
+Example:
+    notam_fetcher = NotamFetcher(CLIENT_ID, CLIENT_SECRET, timeout=30)
+    service = NotamService(notam_fetcher, [WatchedFeed("ORD", airport_code="ORD", interval=300)])
+    service.start()
+    make_server(service, ("127.0.0.1", 8080)).serve_forever()
+"""
+
+import json
+import math
+import os
+import socketserver
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from typing import Any, Iterable, Optional, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .api_schema import Notam
+from .notam_fetcher import NotamFetcher
+from .notam_store import NotamDiff, NotamStore
+from .route import MAX_QUERY_RADIUS_NM
+
+# The longest a long-poll waits, and the interval of keep-alive comments on event streams, in seconds
+MAX_POLL_TIMEOUT = 300.0
+STREAM_KEEPALIVE = 15.0
+
+
+@dataclass
+class WatchedFeed:
+    """An airport, or an area around a position, kept up to date by a NotamService."""
+
+    name: str
+    airport_code: Optional[str] = None
+    lat: Optional[float] = None
+    long: Optional[float] = None
+    radius: float = 100.0
+    interval: float = 300.0
+
+    def __post_init__(self) -> None:
+        if (self.airport_code is None) == (self.lat is None or self.long is None):
+            raise ValueError(f"Feed {self.name} needs either an airport_code or a lat and long")
+        if self.airport_code is None and not 0 < self.radius <= MAX_QUERY_RADIUS_NM:
+            raise ValueError(f"The radius of feed {self.name} must be greater than 0 and at most {MAX_QUERY_RADIUS_NM:g}")
+        if self.interval < 0:
+            raise ValueError("interval must not be negative")
+
+    def fetch(self, notam_fetcher: NotamFetcher) -> list[Notam]:
+        if self.airport_code is not None:
+            return notam_fetcher.fetch_notams_by_airport_code(self.airport_code)
+        assert self.lat is not None and self.long is not None
+        return notam_fetcher.fetch_notams_by_latlong(self.lat, self.long, self.radius)
+
+
+@dataclass
+class ChangeEvent:
+    """A change found by the sync of a feed. seq numbers the events of a service from 1."""
+
+    seq: int
+    time: float
+    feed: str
+    kind: str
+    notam: dict[str, Any]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"seq": self.seq, "time": self.time, "feed": self.feed, "kind": self.kind, "notam": self.notam}
+
+
+class _FeedState:
+    def __init__(self, feed: WatchedFeed):
+        self.feed = feed
+        self.store = NotamStore()
+        # The NOTAMs of the feed as JSON data, by id
+        self.notams: dict[str, dict[str, Any]] = {}
+        self.next_poll = 0.0
+        self.last_sync: Optional[float] = None
+        self.last_error: Optional[str] = None
+        # The /notams response of the feed, built on the first query after a change
+        self.body: Optional[bytes] = None
+
+
+class NotamService:
+    """Keeps feeds up to date and records their changes, see the module docstring. Thread-safe."""
+
+    def __init__(self, notam_fetcher: NotamFetcher, feeds: Iterable[WatchedFeed], max_events: int = 10000):
+        """
+        Args:
+            notam_fetcher (NotamFetcher): Fetches the feeds, one after another. Create it with a timeout,
+                or a connection that stalls holds up every feed.
+            feeds (Iterable[WatchedFeed]): The airports and areas to keep up to date. Names must be unique.
+            max_events (int): The number of latest events kept for subscribers catching up
+        """
+        if max_events < 1:
+            raise ValueError("max_events must be greater than 0")
+        self.notam_fetcher = notam_fetcher
+        self._feeds: dict[str, _FeedState] = {}
+        for feed in feeds:
+            if feed.name in self._feeds:
+                raise ValueError(f"Duplicate feed name {feed.name}")
+            self._feeds[feed.name] = _FeedState(feed)
+        self._events: deque[ChangeEvent] = deque(maxlen=max_events)
+        self._seq = 0
+        self._body: Optional[bytes] = None
+        # Guards the feeds' data and events, and is notified when events are added or the service stops
+        self._changed = threading.Condition()
+        self._poll_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def seq(self) -> int:
+        """The seq of the latest event, 0 before the first."""
+        return self._seq
+
+    def poll(self) -> float:
+        """
+        Syncs every feed that is due. A feed that fails to sync, for any reason, keeps its NOTAMs,
+        records the error in last_error and is retried at its next interval.
+
+        Returns:
+            float: The seconds until the next feed is due.
+        """
+        with self._poll_lock:
+            for state in self._feeds.values():
+                if self._stopping.is_set():
+                    break
+                if state.next_poll <= time.monotonic():
+                    try:
+                        self._sync(state)
+                    except Exception as e:
+                        # One failing feed must not stop the others, nor the poll loop
+                        with self._changed:
+                            state.last_error = f"{type(e).__name__}: {e}"
+                    state.next_poll = time.monotonic() + state.feed.interval
+            if not self._feeds:
+                return MAX_POLL_TIMEOUT
+            return max(0.0, min(state.next_poll for state in self._feeds.values()) - time.monotonic())
+
+    def run(self) -> None:
+        """Polls the feeds until stop() is called."""
+        while not self._stopping.is_set():
+            self._stopping.wait(self.poll())
+
+    def start(self) -> None:
+        """Polls the feeds on a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="notam-service-poll", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """
+        Stops polling, and ends the long-polls and event streams of subscribers.
+
+        Args:
+            timeout (float, optional): The longest to wait, in seconds, for a sync in progress to finish.
+                A poll thread still syncing after that is left to finish on its own; it does not keep
+                the process running. If None, waits for the sync however long it takes.
+        """
+        self._stopping.set()
+        with self._changed:
+            self._changed.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def feeds(self) -> list[dict[str, Any]]:
+        """The configuration and state of every feed."""
+        with self._changed:
+            return [
+                {
+                    "name": state.feed.name,
+                    "airport_code": state.feed.airport_code,
+                    "lat": state.feed.lat,
+                    "long": state.feed.long,
+                    "radius": state.feed.radius,
+                    "interval": state.feed.interval,
+                    "notams": len(state.notams),
+                    "last_sync": state.last_sync,
+                    "last_error": state.last_error,
+                }
+                for state in self._feeds.values()
+            ]
+
+    def notams(self, feed: Optional[str] = None, location: Optional[str] = None) -> tuple[int, list[dict[str, Any]]]:
+        """
+        Returns the seq of the latest event and the NOTAMs, as JSON data, of a feed or of every feed.
+
+        Args:
+            feed (str, optional): The name of the feed. Defaults to every feed, without duplicates.
+            location (str, optional): Only NOTAMs whose location or icaoLocation is this
+
+        Raises:
+            KeyError: If there is no such feed.
+        """
+        with self._changed:
+            notams = self._notams(feed)
+            seq = self._seq
+        if location is not None:
+            notams = [notam for notam in notams if location in (notam.get("location"), notam.get("icaoLocation"))]
+        return seq, notams
+
+    def notams_json(self, feed: Optional[str] = None) -> bytes:
+        """The /notams response of a feed or of every feed, built once per change."""
+        with self._changed:
+            if feed is None:
+                if self._body is None:
+                    self._body = _json_body({"seq": self._seq, "notams": self._notams(None)})
+                return self._body
+            state = self._feed(feed)
+            if state.body is None:
+                state.body = _json_body({"seq": self._seq, "notams": list(state.notams.values())})
+            return state.body
+
+    def notam(self, notam_id: str) -> Optional[dict[str, Any]]:
+        """Returns a NOTAM of any feed as JSON data, or None."""
+        with self._changed:
+            for state in self._feeds.values():
+                notam = state.notams.get(notam_id)
+                if notam is not None:
+                    return notam
+        return None
+
+    def wait_for_events(
+        self, since: int, timeout: float, feed: Optional[str] = None
+    ) -> tuple[int, list[ChangeEvent]]:
+        """
+        Returns the events after since, waiting up to timeout seconds for one if there are none yet.
+
+        Args:
+            since (int): The seq of the last event seen, e.g. the seq returned with the NOTAMs
+            timeout (float): The longest to wait, in seconds
+            feed (str, optional): Only the events of this feed
+
+        Raises:
+            KeyError: If there is no such feed.
+            LookupError: If events after since are no longer kept; the client must read the NOTAMs again.
+
+        Returns:
+            tuple[int, list[ChangeEvent]]: The seq to wait from next time, and the events.
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            if feed is not None:
+                self._feed(feed)
+            while True:
+                since = min(since, self._seq)
+                if self._events and since < self._events[0].seq - 1:
+                    raise LookupError(f"Events after {since} are no longer kept")
+                first = self._events[0].seq if self._events else self._seq + 1
+                events = [
+                    event
+                    for event in islice(self._events, max(0, since + 1 - first), None)
+                    if feed is None or event.feed == feed
+                ]
+                # Events of other feeds have been seen too
+                since = self._seq
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0 or self._stopping.is_set():
+                    return since, events
+                self._changed.wait(remaining)
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping.is_set()
+
+    def _sync(self, state: _FeedState) -> NotamDiff:
+        diff = state.store.sync(state.feed.fetch(self.notam_fetcher))
+        now = time.time()
+        with self._changed:
+            first = state.last_sync is None
+            state.last_sync = now
+            state.last_error = None
+            if not (diff or first):
+                return diff
+            for kind, changed in (("new", diff.inserted), ("amended", diff.updated), ("cancelled", diff.expired)):
+                for notam in changed:
+                    data = notam.model_dump(mode="json", by_alias=True)
+                    if kind == "cancelled":
+                        state.notams.pop(notam.id, None)
+                    else:
+                        state.notams[notam.id] = data
+                    if not first:
+                        self._seq += 1
+                        self._events.append(ChangeEvent(self._seq, now, state.feed.name, kind, data))
+            # The responses of other feeds keep an older seq, which is still correct for them
+            state.body = None
+            self._body = None
+            self._changed.notify_all()
+        return diff
+
+    def _feed(self, name: str) -> _FeedState:
+        state = self._feeds.get(name)
+        if state is None:
+            raise KeyError(f"Unknown feed {name}")
+        return state
+
+    def _notams(self, feed: Optional[str]) -> list[dict[str, Any]]:
+        if feed is not None:
+            return list(self._feed(feed).notams.values())
+        notams: dict[str, dict[str, Any]] = {}
+        for state in self._feeds.values():
+            notams.update(state.notams)
+        return list(notams.values())
+
+
+class _ServiceRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, which Nagle's algorithm would delay on kept-alive connections
+    disable_nagle_algorithm = True
+    server: Union["_TCPServer", "_UnixServer"]
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        service = self.server.service
+        try:
+            if url.path == "/feeds":
+                self._send_json(200, _json_body({"feeds": service.feeds()}))
+            elif url.path == "/notams":
+                if "location" in query:
+                    seq, notams = service.notams(query.get("feed"), query["location"])
+                    self._send_json(200, _json_body({"seq": seq, "notams": notams}))
+                else:
+                    self._send_json(200, service.notams_json(query.get("feed")))
+            elif url.path.startswith("/notams/"):
+                notam = service.notam(unquote(url.path[len("/notams/") :]))
+                if notam is None:
+                    self._send_error(404, "Unknown NOTAM")
+                else:
+                    self._send_json(200, _json_body(notam))
+            elif url.path == "/events":
+                timeout = float(query.get("timeout", 30))
+                if not math.isfinite(timeout):
+                    raise ValueError("timeout must be a finite number of seconds")
+                timeout = min(timeout, MAX_POLL_TIMEOUT)
+                since = int(query.get("since", service.seq))
+                seq, events = service.wait_for_events(since, timeout, query.get("feed"))
+                self._send_json(200, _json_body({"seq": seq, "events": [event.to_dict() for event in events]}))
+            elif url.path == "/events/stream":
+                since = int(self.headers.get("Last-Event-ID") or query.get("since", service.seq))
+                self._stream_events(since, query.get("feed"))
+            else:
+                self._send_error(404, "Not found")
+        except KeyError as e:
+            self._send_error(404, str(e.args[0]))
+        except LookupError as e:
+            self._send_error(410, str(e))
+        except ValueError as e:
+            self._send_error(400, str(e))
+
+    def _stream_events(self, since: int, feed: Optional[str]) -> None:
+        service = self.server.service
+        # Raises before the stream starts if the feed or events are unknown
+        since, events = service.wait_for_events(since, 0, feed)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while True:
+                for event in events:
+                    self.wfile.write(
+                        f"id: {event.seq}\nevent: {event.kind}\ndata: {json.dumps(event.to_dict())}\n\n".encode()
+                    )
+                if not events:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+                if service.stopping:
+                    return
+                since, events = service.wait_for_events(since, STREAM_KEEPALIVE, feed)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except LookupError:
+            # The subscriber fell too far behind, it reconnects and reads the NOTAMs again
+            pass
+
+    def _send_json(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str) -> None:
+        self._send_json(status, _json_body({"error": message}))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, service: NotamService, address: tuple[str, int]):
+        self.service = service
+        super().__init__(address, _ServiceRequestHandler)
+
+
+class _UnixRequestHandler(_ServiceRequestHandler):
+    # TCP_NODELAY does not apply to Unix sockets
+    disable_nagle_algorithm = False
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, service: NotamService, path: str):
+        self.service = service
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _UnixRequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def make_server(service: NotamService, address: Union[tuple[str, int], str]) -> socketserver.BaseServer:
+    """
+    Creates the HTTP server of a service. Call serve_forever() on it, and shutdown() from another thread to stop it.
+
+    Args:
+        service (NotamService): The service to serve
+        address (tuple[str, int] | str): A (host, port) to listen on, or the path of a Unix socket
+    """
+    if isinstance(address, str):
+        return _UnixServer(service, address)
+    return _TCPServer(service, address)
+
+
+def _json_body(data: Any) -> bytes:
+    return json.dumps(data).encode()
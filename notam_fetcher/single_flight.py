@@ -0,0 +1,83 @@
+"""
+Single-flight calls: concurrent calls with the same key share one execution.
+
+The first caller of a key runs the function. Callers that arrive while it is running wait
+for it and receive its result, or its exception. Once it finishes the key is free again,
+so a later call runs the function anew; nothing is cached.
+
+Example:
+    flights = SingleFlight()
+    notams = flights.do(("airport_code", "KJFK", 1000), lambda: fetch_all_pages("KJFK"))
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Single-flight calls across threads."""
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, "Future[T]"] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """The number of calls in flight."""
+        return len(self._calls)
+
+    def do(self, key: Hashable, function: Callable[[], T]) -> T:
+        """Returns the result of function, shared with every concurrent call with the same key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result()
+
+        try:
+            result = function()
+        except BaseException as error:
+            self._finish(key)
+            call.set_exception(error)
+            raise
+        self._finish(key)
+        call.set_result(result)
+        return result
+
+    def _finish(self, key: Hashable) -> None:
+        with self._lock:
+            del self._calls[key]
+
+
+class AsyncSingleFlight(Generic[T]):
+    """
+    Single-flight calls across the tasks of one event loop.
+
+    The function runs in its own task, so cancelling one caller does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, "asyncio.Task[T]"] = {}
+
+    def __len__(self) -> int:
+        """The number of calls in flight."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        """Returns the result of function, shared with every concurrent call with the same key."""
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = asyncio.ensure_future(function())
+            call.add_done_callback(lambda _: self._finish(key))
+        return await asyncio.shield(call)
+
+    def _finish(self, key: Hashable) -> None:
+        call = self._calls.pop(key)
+        # Marks the exception as retrieved, in case every caller was cancelled
+        if not call.cancelled():
+            call.exception()
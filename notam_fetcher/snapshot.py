@@ -0,0 +1,280 @@
+"""
+Nationwide snapshots: every NOTAM of a region, fetched as a hexagonal tiling of query circles.
+
+The API only answers circles of at most 100 NM, so a region is covered by the thinnest
+covering of circles, a hexagonal lattice: rows 1.5 radii apart, circles sqrt(3) radii apart
+within a row, every other row shifted by half a circle.
+
+Example:
+    job = SnapshotJob(notam_fetcher, "conus.json", max_concurrency=8)
+    report = job.run()
+    notams = read_snapshot("conus.json")
+
+A job that is interrupted, or that had failing tiles, keeps its progress next to the
+snapshot ("conus.json.progress"). Running it again only fetches the tiles that did not complete,
+unless the progress was started more than max_progress_age seconds ago: its tiles would be
+stale, so the job starts over.
+"""
+
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Iterator, Optional
+
+from .api_schema import Notam
+from .exceptions import NotamFetcherBaseError
+from .notam_fetcher import NotamFetcher
+from .route import EARTH_RADIUS_NM, MAX_QUERY_RADIUS_NM
+
+# (min_lat, min_long, max_lat, max_long) of the contiguous United States
+CONUS_BOUNDS = (24.4, -125.0, 49.4, -66.9)
+
+NM_PER_DEGREE = math.pi * EARTH_RADIUS_NM / 180
+
+
+def hex_tiling(
+    min_lat: float,
+    min_long: float,
+    max_lat: float,
+    max_long: float,
+    radius: float = MAX_QUERY_RADIUS_NM,
+) -> list[tuple[float, float, float]]:
+    """
+    Returns circles of the given radius that cover a latitude/longitude bounding box, on a hexagonal lattice.
+
+    Circles in a row are sqrt(3) radii apart at the latitude closest to the equator that any
+    circle of the region reaches, so they are at most that far apart anywhere in the region.
+
+    Args:
+        min_lat (float): The southern edge of the region
+        min_long (float): The western edge of the region
+        max_lat (float): The northern edge of the region
+        max_long (float): The eastern edge of the region
+        radius (float): The radius of each circle in nautical miles. (max: 100)
+
+    Returns:
+        Circles (list[tuple[float, float, float]]): (lat, long, radius) of each circle, row by row from the south
+    """
+    if radius > MAX_QUERY_RADIUS_NM:
+        raise ValueError("radius must be less than 100")
+    if radius <= 0:
+        raise ValueError("radius must be greater than 0")
+    if min_lat > max_lat or min_long > max_long:
+        raise ValueError("min_lat and min_long must not be greater than max_lat and max_long")
+
+    radius_degrees = radius / NM_PER_DEGREE
+    if min_lat - radius_degrees <= 0 <= max_lat + radius_degrees:
+        reference_lat = 0.0
+    else:
+        reference_lat = min(abs(min_lat), abs(max_lat)) - radius_degrees
+    row_spacing = 1.5 * radius_degrees
+    column_spacing = math.sqrt(3) * radius_degrees / max(math.cos(math.radians(reference_lat)), 0.01)
+
+    circles = []
+    row_count = math.ceil((max_lat - min_lat) / row_spacing) + 1
+    column_count = math.ceil((max_long - min_long) / column_spacing) + 1
+    for row in range(row_count):
+        lat = min(min_lat + row * row_spacing, max_lat + radius_degrees / 2)
+        if row % 2 == 0:
+            longs = [min_long + column * column_spacing for column in range(column_count)]
+        else:
+            longs = [min_long + (column - 0.5) * column_spacing for column in range(column_count + 1)]
+        # A circle past the eastern edge is only needed if the one before it is inside the region
+        circles.extend((lat, long, radius) for long in longs if long - column_spacing < max_long)
+    return circles
+
+
+@dataclass
+class TileReport:
+    """What fetching one tile of a snapshot returned."""
+
+    index: int
+    lat: float
+    long: float
+    radius: float
+    notams: int = 0
+    new_notams: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class SnapshotReport:
+    """
+    The outcome of a SnapshotJob run.
+
+    notams is the number of distinct NOTAMs of the snapshot. complete is False if a tile failed,
+    in which case running the job again fetches the failed tiles.
+    """
+
+    tiles: list[TileReport] = field(default_factory=list)
+    notams: int = 0
+    seconds: float = 0.0
+    resumed_tiles: int = 0
+
+    @property
+    def complete(self) -> bool:
+        return all(tile.error is None for tile in self.tiles)
+
+    @property
+    def coverage(self) -> float:
+        """The fraction of tiles fetched."""
+        if not self.tiles:
+            return 1.0
+        return sum(tile.error is None for tile in self.tiles) / len(self.tiles)
+
+
+class SnapshotJob:
+    """Fetches every NOTAM of a region into one snapshot file, see the module docstring."""
+
+    def __init__(
+        self,
+        notam_fetcher: NotamFetcher,
+        path: str,
+        bounds: tuple[float, float, float, float] = CONUS_BOUNDS,
+        radius: float = MAX_QUERY_RADIUS_NM,
+        max_concurrency: int = 8,
+        max_progress_age: float = 900.0,
+    ):
+        """
+        Args:
+            notam_fetcher (NotamFetcher): Fetches the tiles
+            path (str): The file to write the snapshot to
+            bounds (tuple[float, float, float, float]): (min_lat, min_long, max_lat, max_long) of the region
+            radius (float): The radius of each tile in nautical miles. (max: 100)
+            max_concurrency (int): The number of tiles fetched at once
+            max_progress_age (float): The age, in seconds since its first run started, after which
+                the progress of an unfinished job is discarded instead of resumed
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        if max_progress_age < 0:
+            raise ValueError("max_progress_age must not be negative")
+        self.notam_fetcher = notam_fetcher
+        self.path = path
+        self.progress_path = path + ".progress"
+        self.bounds = bounds
+        self.radius = radius
+        self.max_concurrency = max_concurrency
+        self.max_progress_age = max_progress_age
+        self.tiles = hex_tiling(*bounds, radius=radius)
+
+    def run(self) -> SnapshotReport:
+        """
+        Fetches every tile that has not completed yet and writes the snapshot.
+
+        NOTAMs are de-duplicated by id as tiles complete, and each completed tile is recorded in
+        the progress file with the NOTAMs it added. The progress file is removed once every
+        tile has completed.
+        """
+        start = time.perf_counter()
+        notams: dict[str, Notam] = {}
+        reports: dict[int, TileReport] = {}
+        for report, tile_notams in self._read_progress():
+            reports[report.index] = report
+            for notam in tile_notams:
+                notams.setdefault(notam.id, notam)
+        resumed_tiles = len(reports)
+
+        remaining = [index for index in range(len(self.tiles)) if index not in reports]
+        with open(self.progress_path, "a", encoding="utf-8") as progress:
+            if progress.tell() == 0:
+                progress.write(json.dumps({"tiling": self._tiling_signature(), "started": time.time()}) + "\n")
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                futures = {executor.submit(self._fetch_tile, index): index for index in remaining}
+                for future in as_completed(futures):
+                    report, tile_notams = future.result()
+                    reports[report.index] = report
+                    if report.error is not None:
+                        continue
+                    new_notams = [notam for notam in tile_notams if notam.id not in notams]
+                    for notam in new_notams:
+                        notams[notam.id] = notam
+                    report.new_notams = len(new_notams)
+                    progress.write(
+                        json.dumps(
+                            {
+                                "tile": asdict(report),
+                                "notams": [notam.model_dump(mode="json", by_alias=True) for notam in new_notams],
+                            }
+                        )
+                        + "\n"
+                    )
+                    progress.flush()
+
+        snapshot_report = SnapshotReport(
+            tiles=[reports[index] for index in range(len(self.tiles))],
+            notams=len(notams),
+            seconds=time.perf_counter() - start,
+            resumed_tiles=resumed_tiles,
+        )
+        self._write_snapshot(notams.values(), snapshot_report)
+        if snapshot_report.complete:
+            os.remove(self.progress_path)
+        return snapshot_report
+
+    def _fetch_tile(self, index: int) -> tuple[TileReport, list[Notam]]:
+        lat, long, radius = self.tiles[index]
+        report = TileReport(index, lat, long, radius)
+        start = time.perf_counter()
+        try:
+            notams = self.notam_fetcher.fetch_notams_by_latlong(lat, long, radius)
+        except NotamFetcherBaseError as e:
+            notams = []
+            report.error = f"{type(e).__name__}: {e}"
+        report.notams = len(notams)
+        report.seconds = time.perf_counter() - start
+        return report, notams
+
+    def _tiling_signature(self) -> dict[str, Any]:
+        return {"bounds": list(self.bounds), "radius": self.radius, "tiles": len(self.tiles)}
+
+    def _read_progress(self) -> Iterator[tuple[TileReport, list[Notam]]]:
+        """Yields the completed tiles of the progress file, if it is for the same tiling and recent enough."""
+        if not os.path.exists(self.progress_path):
+            return
+        with open(self.progress_path, "r+b") as progress:
+            lines = progress.readlines()
+            if lines and not lines[-1].endswith(b"\n"):
+                # A line cut short by an interruption: remove it, so that records appended by this
+                # run start on a line of their own. Its tile is fetched again.
+                progress.truncate(progress.tell() - len(lines.pop()))
+        header = json.loads(lines[0]) if lines else {}
+        if (
+            header.get("tiling") != self._tiling_signature()
+            or time.time() - header.get("started", 0.0) > self.max_progress_age
+        ):
+            # Progress of another region, too old to resume, or an empty file: start over
+            os.remove(self.progress_path)
+            return
+        for line in lines[1:]:
+            record = json.loads(line)
+            yield TileReport(**record["tile"]), [Notam.model_validate(notam) for notam in record["notams"]]
+
+    def _write_snapshot(self, notams: Any, report: SnapshotReport) -> None:
+        """Writes the snapshot to a temporary file, then moves it over path in one step."""
+        snapshot = {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "bounds": list(self.bounds),
+            "radius": self.radius,
+            "complete": report.complete,
+            "coverage": report.coverage,
+            "seconds": report.seconds,
+            "tiles": [asdict(tile) for tile in report.tiles],
+            "notams": [notam.model_dump(mode="json", by_alias=True) for notam in notams],
+        }
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file)
+        os.replace(temporary_path, self.path)
+
+
+def read_snapshot(path: str) -> list[Notam]:
+    """Returns the NOTAMs of a snapshot written by SnapshotJob."""
+    with open(path, encoding="utf-8") as file:
+        snapshot = json.load(file)
+    return [Notam.model_validate(notam) for notam in snapshot["notams"]]
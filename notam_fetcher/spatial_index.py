@@ -0,0 +1,296 @@
+"""
+A spatial index of NOTAMs, for local point, radius, bounding box and route queries.
+
+The position of each NOTAM is parsed once, when it is added, from the Q) line of its ICAO
+translation ("Q) KZJX/QCBLS/IV/NBO/A/000/040/3224N07812W049": center and radius in NM, lower
+and upper flight levels). If there is no Q) line position, the geometry of the API item is used.
+
+The flight level band comes from the Q) line rather than the minimumFL/maximumFL fields of the
+NOTAM, which hold the same values but are not kept by the Notam model.
+
+Example:
+    index = NotamSpatialIndex.from_pages(notam_fetcher.iter_pages_by_latlong(41.98, -87.90))
+    notams = index.along_route([(41.98, -87.90), (33.64, -84.43)], 10, flight_levels=(0, 180))
+"""
+
+import math
+import re
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
+
+from .api_schema import ICAOTranslationObject, Notam, NotamAPIResponse, NotamApiItem
+from .route import distance_to_segment, great_circle_distance, interpolate_great_circle
+
+_QLINE_PATTERN = re.compile(
+    r"^Q\)\s*[^/\n]*/[^/\n]*/[^/\n]*/[^/\n]*/[^/\n]*/"
+    r"(?P<lower>\d{3})/(?P<upper>\d{3})/"
+    r"(?P<lat>\d{2})(?P<lat_minutes>\d{2})(?P<lat_hemisphere>[NS])"
+    r"(?P<long>\d{3})(?P<long_minutes>\d{2})(?P<long_hemisphere>[EW])"
+    r"(?P<radius>\d{3})",
+    re.MULTILINE,
+)
+_QLINE_LIMITS_PATTERN = re.compile(
+    r"^Q\)\s*[^/\n]*/[^/\n]*/[^/\n]*/[^/\n]*/[^/\n]*/(?P<lower>\d{3})/(?P<upper>\d{3})",
+    re.MULTILINE,
+)
+
+MIN_FLIGHT_LEVEL = 0
+MAX_FLIGHT_LEVEL = 999
+
+
+class NotamGeometry(NamedTuple):
+    """The circle a NOTAM applies to, and the flight levels between which it applies."""
+
+    lat: float
+    long: float
+    radius: float
+    lower_flight_level: int = MIN_FLIGHT_LEVEL
+    upper_flight_level: int = MAX_FLIGHT_LEVEL
+
+
+def parse_geometry(item: NotamApiItem) -> Optional[NotamGeometry]:
+    """
+    Returns the geometry of a NOTAM item, or None if it has no position.
+
+    The Q) line of the ICAO translation is preferred. Otherwise the Point, Polygon and
+    GeometryCollection geometries of the item are used, as a circle around the center of
+    their bounding box that contains all their points.
+    """
+    lower, upper = MIN_FLIGHT_LEVEL, MAX_FLIGHT_LEVEL
+    for translation in item.properties.coreNOTAMData.notamTranslation:
+        if not isinstance(translation, ICAOTranslationObject):
+            continue
+        match = _QLINE_PATTERN.search(translation.formatted_text)
+        if match:
+            lat = int(match["lat"]) + int(match["lat_minutes"]) / 60
+            long = int(match["long"]) + int(match["long_minutes"]) / 60
+            return NotamGeometry(
+                -lat if match["lat_hemisphere"] == "S" else lat,
+                -long if match["long_hemisphere"] == "W" else long,
+                float(match["radius"]),
+                int(match["lower"]),
+                int(match["upper"]),
+            )
+        limits = _QLINE_LIMITS_PATTERN.search(translation.formatted_text)
+        if limits:
+            lower, upper = int(limits["lower"]), int(limits["upper"])
+
+    points = list(_geometry_points(item.geometry))
+    if not points:
+        return None
+    lat = (min(point[0] for point in points) + max(point[0] for point in points)) / 2
+    long = (min(point[1] for point in points) + max(point[1] for point in points)) / 2
+    radius = max(great_circle_distance(lat, long, *point) for point in points)
+    return NotamGeometry(lat, long, radius, lower, upper)
+
+
+def _geometry_points(geometry: Any) -> Iterator[tuple[float, float]]:
+    """Yields the (lat, long) of every position of a GeoJSON geometry."""
+    if not isinstance(geometry, dict):
+        return
+    if geometry.get("type") == "GeometryCollection":
+        for child in geometry.get("geometries", []):
+            yield from _geometry_points(child)
+        return
+    yield from _coordinate_points(geometry.get("coordinates"))
+
+
+def _coordinate_points(coordinates: Any) -> Iterator[tuple[float, float]]:
+    if not isinstance(coordinates, list):
+        return
+    if len(coordinates) >= 2 and all(isinstance(value, (int, float)) for value in coordinates[:2]):
+        # GeoJSON positions are [long, lat]
+        yield float(coordinates[1]), float(coordinates[0])
+        return
+    for child in coordinates:
+        yield from _coordinate_points(child)
+
+
+class NotamSpatialIndex:
+    """
+    NOTAMs indexed on a grid of cell_size degree cells.
+
+    Each NOTAM is stored in every cell its circle overlaps, so a query only checks the NOTAMs
+    of the cells it overlaps. NOTAMs without a position are kept but never match a query.
+    """
+
+    def __init__(self, cell_size: float = 1.0):
+        """
+        Args:
+            cell_size (float): The size of the grid cells in degrees.
+        """
+        if cell_size <= 0:
+            raise ValueError("cell_size must be greater than 0")
+        self.cell_size = cell_size
+        self._notams: list[Notam] = []
+        self._geometries: list[Optional[NotamGeometry]] = []
+        self._entries_by_id: dict[str, int] = {}
+        self._cells: dict[tuple[int, int], list[int]] = {}
+
+    @classmethod
+    def from_items(cls, items: Iterable[NotamApiItem], cell_size: float = 1.0) -> "NotamSpatialIndex":
+        index = cls(cell_size)
+        for item in items:
+            index.add(item.properties.coreNOTAMData.notam, parse_geometry(item))
+        return index
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[NotamAPIResponse], cell_size: float = 1.0) -> "NotamSpatialIndex":
+        """Builds an index from API pages, e.g. from NotamFetcher.iter_pages_by_latlong."""
+        return cls.from_items(
+            (item for page in pages for item in page.items if isinstance(item, NotamApiItem)),
+            cell_size,
+        )
+
+    def __len__(self) -> int:
+        return len(self._notams)
+
+    def add(self, notam: Notam, geometry: Optional[NotamGeometry]) -> None:
+        """Adds a NOTAM, replacing the NOTAM with the same id if there is one (e.g. from overlapping queries)."""
+        entry = self._entries_by_id.get(notam.id)
+        if entry is None:
+            entry = len(self._notams)
+            self._notams.append(notam)
+            self._geometries.append(geometry)
+            self._entries_by_id[notam.id] = entry
+        else:
+            previous = self._geometries[entry]
+            if previous is not None:
+                for cell in self._cells_around(previous.lat, previous.long, previous.radius):
+                    self._cells[cell].remove(entry)
+            self._notams[entry] = notam
+            self._geometries[entry] = geometry
+        if geometry is None:
+            return
+        for cell in self._cells_around(geometry.lat, geometry.long, geometry.radius):
+            self._cells.setdefault(cell, []).append(entry)
+
+    def geometry(self, notam_id: str) -> Optional[NotamGeometry]:
+        """Returns the geometry of a NOTAM, or None if it has none or is not in the index."""
+        entry = self._entries_by_id.get(notam_id)
+        return None if entry is None else self._geometries[entry]
+
+    def at_point(
+        self, lat: float, long: float, flight_levels: Optional[tuple[int, int]] = None
+    ) -> list[Notam]:
+        """Returns the NOTAMs whose circle contains a point."""
+        return self.within_radius(lat, long, 0, flight_levels)
+
+    def within_radius(
+        self, lat: float, long: float, radius: float, flight_levels: Optional[tuple[int, int]] = None
+    ) -> list[Notam]:
+        """
+        Returns the NOTAMs whose circle overlaps a circle.
+
+        Args:
+            lat (float): The latitude of the center
+            long (float): The longitude of the center
+            radius (float): The radius in nautical miles
+            flight_levels (tuple[int, int], optional): Only NOTAMs overlapping this (lower, upper) band
+        """
+        return self._matching(
+            self._cells_around(lat, long, radius),
+            lambda geometry: great_circle_distance(lat, long, geometry.lat, geometry.long)
+            <= radius + geometry.radius,
+            flight_levels,
+        )
+
+    def in_bbox(
+        self,
+        min_lat: float,
+        min_long: float,
+        max_lat: float,
+        max_long: float,
+        flight_levels: Optional[tuple[int, int]] = None,
+    ) -> list[Notam]:
+        """Returns the NOTAMs whose circle overlaps a latitude/longitude bounding box."""
+
+        def overlaps(geometry: NotamGeometry) -> bool:
+            nearest_lat = min(max(geometry.lat, min_lat), max_lat)
+            nearest_long = min(max(geometry.long, min_long), max_long)
+            return (
+                great_circle_distance(geometry.lat, geometry.long, nearest_lat, nearest_long)
+                <= geometry.radius
+            )
+
+        return self._matching(
+            self._cells_in(min_lat, min_long, max_lat, max_long), overlaps, flight_levels
+        )
+
+    def along_route(
+        self,
+        route: list[tuple[float, float]],
+        corridor_half_width: float,
+        flight_levels: Optional[tuple[int, int]] = None,
+    ) -> list[Notam]:
+        """
+        Returns the NOTAMs whose circle comes within corridor_half_width of a route.
+
+        Args:
+            route (list[tuple[float, float]]): The (lat, long) points of the route, in order
+            corridor_half_width (float): The distance either side of the route in nautical miles
+            flight_levels (tuple[int, int], optional): Only NOTAMs overlapping this (lower, upper) band
+        """
+        if len(route) == 1:
+            return self.within_radius(route[0][0], route[0][1], corridor_half_width, flight_levels)
+        segments = list(zip(route, route[1:]))
+
+        def cells() -> Iterator[tuple[int, int]]:
+            # The cells around points spaced at most half a cell apart along each segment
+            spacing = self.cell_size * 60 / 2
+            for start, end in segments:
+                length = great_circle_distance(*start, *end)
+                steps = max(1, math.ceil(length / spacing))
+                for step in range(steps + 1):
+                    lat, long = interpolate_great_circle(*start, *end, step / steps)
+                    yield from self._cells_around(lat, long, corridor_half_width + spacing)
+
+        return self._matching(
+            cells(),
+            lambda geometry: any(
+                distance_to_segment(geometry.lat, geometry.long, start, end)
+                <= corridor_half_width + geometry.radius
+                for start, end in segments
+            ),
+            flight_levels,
+        )
+
+    def _matching(
+        self,
+        cells: Iterable[tuple[int, int]],
+        overlaps: Callable[[NotamGeometry], bool],
+        flight_levels: Optional[tuple[int, int]],
+    ) -> list[Notam]:
+        """Returns the NOTAMs of cells that are in the flight level band and for which overlaps is True."""
+        candidates: set[int] = set()
+        for cell in cells:
+            candidates.update(self._cells.get(cell, ()))
+
+        matching = []
+        for entry in sorted(candidates):
+            geometry = self._geometries[entry]
+            assert geometry is not None
+            if flight_levels is not None and (
+                geometry.upper_flight_level < flight_levels[0]
+                or geometry.lower_flight_level > flight_levels[1]
+            ):
+                continue
+            if overlaps(geometry):
+                matching.append(self._notams[entry])
+        return matching
+
+    def _cells_around(self, lat: float, long: float, radius: float) -> Iterator[tuple[int, int]]:
+        margin_lat = radius / 60
+        margin_long = radius / (60 * _cos_lat(abs(lat) + margin_lat))
+        return self._cells_in(lat - margin_lat, long - margin_long, lat + margin_lat, long + margin_long)
+
+    def _cells_in(
+        self, min_lat: float, min_long: float, max_lat: float, max_long: float
+    ) -> Iterator[tuple[int, int]]:
+        for i in range(math.floor(min_lat / self.cell_size), math.floor(max_lat / self.cell_size) + 1):
+            for j in range(math.floor(min_long / self.cell_size), math.floor(max_long / self.cell_size) + 1):
+                yield i, j
+
+
+def _cos_lat(lat: float) -> float:
+    """cos of a latitude in degrees, bounded away from 0 near the poles."""
+    return max(math.cos(math.radians(min(lat, 89.0))), 0.01)
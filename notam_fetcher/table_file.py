@@ -0,0 +1,219 @@
+"""
+A versioned, memory-mapped file format for NotamTables, to load a fetched NOTAM set without fetching or validating it again.
+
+A table file holds the columns of a NotamTable in a fixed layout, each aligned to 64 bytes:
+- issued, effective_start, effective_end and last_updated as datetime64[ms]
+- the int32 codes of the categorical columns and of effective_end strings, with their categories
+  in the JSON header of the file
+- id, number and text as UTF-8 bytes and int64 row offsets, like Arrow strings
+and, optionally, named numeric arrays derived from the table ("indexes"), e.g. a sort order.
+
+Opening a file maps it read-only and parses only its header. The columns are numpy arrays over
+the mapping and text is decoded when a row is read, so opening takes milliseconds whatever the
+size of the file, and the processes of a host that open the same file share its pages.
+write_table_file writes a temporary file and renames it over the previous one, so readers see
+either the old or the new file, never a partial one. NotamTableFile.refresh opens the new file.
+
+Example:
+    # In the fetch job
+    table = NotamTable.from_notams(notams)
+    write_table_file("notams.tbl", table, indexes={"by_start": table.argsort("effective_start")})
+
+    # In each worker
+    snapshot = NotamTableFile("notams.tbl")
+    upcoming = snapshot.table.take(snapshot.indexes["by_start"])
+    ...
+    snapshot.refresh()
+"""
+
+import json
+import mmap
+import os
+import secrets
+import stat
+import struct
+import time
+from typing import Any, Mapping, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from .notam_table import (
+    CATEGORICAL_COLUMNS,
+    DATETIME_COLUMNS,
+    TEXT_COLUMNS,
+    NotamTable,
+    _Categorical,
+    _Strings,
+)
+
+MAGIC = b"NOTAMTBL"
+VERSION = 1
+
+# Magic, version, reserved, length of the JSON header
+_PREFIX = struct.Struct("<8sIIQ")
+_ALIGNMENT = 64
+
+
+def write_table_file(path: str, table: NotamTable, indexes: Optional[Mapping[str, npt.ArrayLike]] = None) -> None:
+    """
+    Writes a table, and arrays derived from it, to a table file, replacing the file atomically.
+
+    Args:
+        path (str): The table file. A temporary file is written next to it, then renamed to it.
+        table (NotamTable): The NOTAMs
+        indexes (Mapping[str, ArrayLike], optional): Numeric arrays to store with the table, by name
+
+    Raises:
+        ValueError: If an index is not numeric.
+    """
+    arrays: dict[str, npt.NDArray] = {}
+    categories: dict[str, list[str]] = {}
+    for name in DATETIME_COLUMNS:
+        arrays["datetime/" + name] = table.column(name)
+    for name in CATEGORICAL_COLUMNS:
+        arrays["categorical/" + name], categories[name] = table.codes(name)
+    effective_end_text = _Categorical.from_values(list(table._effective_end_text))
+    arrays["effective_end_text"], categories["effective_end_text"] = effective_end_text.codes, effective_end_text.categories
+    arrays["is_estimated"] = table.is_estimated
+    for name in TEXT_COLUMNS:
+        arrays[f"text/{name}/offsets"], arrays[f"text/{name}/data"] = _encode_strings(table.column(name))
+    for name, index in (indexes or {}).items():
+        array = np.asarray(index)
+        if array.dtype.kind not in "biufcmM":
+            raise ValueError(f"Index {name} is not a numeric array")
+        arrays["index/" + name] = array
+
+    columns: dict[str, dict[str, Any]] = {}
+    offset = 0
+    for name, array in arrays.items():
+        columns[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+    header = json.dumps(
+        {
+            "rows": len(table),
+            "created": time.time(),
+            "categories": categories,
+            "indexes": [name for name in (indexes or {})],
+            "columns": columns,
+        }
+    ).encode()
+    data_start = _align(_PREFIX.size + len(header))
+
+    # Created with the default mode under the umask, unlike mkstemp which makes it readable by its owner only
+    temporary_path = f"{path}.{secrets.token_hex(8)}.tmp"
+    descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        try:
+            # The file being replaced keeps its permissions
+            os.fchmod(descriptor, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(_PREFIX.pack(MAGIC, VERSION, 0, len(header)))
+            file.write(header)
+            for name, array in arrays.items():
+                file.seek(data_start + columns[name]["offset"])
+                file.write(np.ascontiguousarray(array).tobytes())
+            file.truncate(data_start + offset)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+class NotamTableFile:
+    """
+    A table file, memory-mapped read-only.
+
+    table and indexes are views of the mapping; the mapping is released once neither they
+    nor the tables taken from them are referenced.
+    """
+
+    table: NotamTable
+    indexes: dict[str, npt.NDArray]
+    created: float
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): A file written by write_table_file
+
+        Raises:
+            ValueError: If the file is not a table file, or was written in another version of the format.
+        """
+        self.path = path
+        self._open()
+
+    def refresh(self) -> bool:
+        """
+        Opens the file again if it was replaced since it was opened.
+
+        Returns:
+            bool: Whether table and indexes now hold the new file.
+        """
+        try:
+            status = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if (status.st_dev, status.st_ino) == self._identity:
+            return False
+        self._open()
+        return True
+
+    def _open(self) -> None:
+        with open(self.path, "rb") as file:
+            status = os.fstat(file.fileno())
+            if status.st_size < _PREFIX.size:
+                raise ValueError(f"{self.path} is not a NOTAM table file")
+            # The mapping stays valid once the file is closed
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, header_length = _PREFIX.unpack_from(mapping)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a NOTAM table file")
+        if version != VERSION:
+            raise ValueError(f"{self.path} is a version {version} table file, expected version {VERSION}")
+        header = json.loads(mapping[_PREFIX.size : _PREFIX.size + header_length])
+        data_start = _align(_PREFIX.size + header_length)
+        buffer = memoryview(mapping)
+
+        def array(name: str) -> npt.NDArray:
+            column = header["columns"][name]
+            dtype = np.dtype(column["dtype"])
+            count = int(np.prod(column["shape"], dtype=np.int64))
+            start = data_start + column["offset"]
+            if start + count * dtype.itemsize > len(mapping):
+                raise ValueError(f"{self.path} is truncated")
+            return np.frombuffer(buffer, dtype, count, start).reshape(column["shape"])
+
+        def strings(name: str) -> _Strings:
+            data = array(f"text/{name}/data")
+            return _Strings(array(f"text/{name}/offsets"), memoryview(data))
+
+        categories = header["categories"]
+        effective_end_text = _Categorical(array("effective_end_text"), categories["effective_end_text"])
+        self.table = NotamTable(
+            {name: array("datetime/" + name) for name in DATETIME_COLUMNS},
+            {name: _Categorical(array("categorical/" + name), categories[name]) for name in CATEGORICAL_COLUMNS},
+            {name: strings(name) for name in TEXT_COLUMNS},
+            effective_end_text.values(),
+            array("is_estimated"),
+        )
+        self.indexes = {name: array("index/" + name) for name in header["indexes"]}
+        self.created = header["created"]
+        self._identity = (status.st_dev, status.st_ino)
+
+
+def _encode_strings(values: npt.NDArray[np.object_]) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.uint8]]:
+    """The UTF-8 bytes of values, concatenated, and the offset of each value in them."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
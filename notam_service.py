@@ -0,0 +1,70 @@
+"""
+Runs a local NOTAM service, see notam_fetcher.service.
+
+Example:
+    python notam_service.py --airport ORD --airport ATL --area chicago:41.98,-87.90,50 --port 8080
+    curl "localhost:8080/notams?feed=ORD"
+    curl -N "localhost:8080/events/stream"
+"""
+
+from dotenv import load_dotenv
+import argparse
+import os
+import sys
+
+
+from notam_fetcher import NotamFetcher, NotamService, WatchedFeed, make_server
+
+
+def parse_area(value: str) -> tuple[str, float, float, float]:
+    """Parses NAME:LAT,LONG[,RADIUS]."""
+    name, _, position = value.partition(":")
+    fields = position.split(",")
+    if not name or len(fields) not in (2, 3):
+        raise argparse.ArgumentTypeError(f"Invalid area {value!r}, expected NAME:LAT,LONG[,RADIUS]")
+    try:
+        lat, long, radius = float(fields[0]), float(fields[1]), float(fields[2]) if len(fields) == 3 else 100.0
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid area {value!r}, expected NAME:LAT,LONG[,RADIUS]") from None
+    return name, lat, long, radius
+
+
+parser = argparse.ArgumentParser(description="Keeps NOTAMs of airports and areas up to date and serves them locally.")
+parser.add_argument("--airport", action="append", default=[], help="An airport code to watch. Repeatable.")
+parser.add_argument("--area", action="append", default=[], type=parse_area, help="NAME:LAT,LONG[,RADIUS] to watch. Repeatable.")
+parser.add_argument("--interval", type=float, default=300.0, help="Seconds between syncs of each feed")
+parser.add_argument("--request-timeout", type=float, default=30.0, help="Seconds to wait for the API before a sync fails")
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=8080)
+parser.add_argument("--unix-socket", help="Listen on this Unix socket instead of host and port")
+args = parser.parse_args()
+
+load_dotenv()
+
+CLIENT_ID = os.getenv("CLIENT_ID")
+CLIENT_SECRET = os.getenv("CLIENT_SECRET")
+
+if CLIENT_ID is None:
+    sys.exit("Error: CLIENT_ID not set in .env file")
+if CLIENT_SECRET is None:
+    sys.exit("Error: CLIENT_SECRET not set in .env file")
+
+try:
+    feeds = [WatchedFeed(code, airport_code=code, interval=args.interval) for code in args.airport]
+    feeds += [WatchedFeed(name, lat=lat, long=long, radius=radius, interval=args.interval) for name, lat, long, radius in args.area]
+except ValueError as e:
+    sys.exit(f"Error: {e}")
+if not feeds:
+    sys.exit("Error: no --airport or --area to watch")
+
+with NotamFetcher(CLIENT_ID, CLIENT_SECRET, timeout=args.request_timeout) as notam_fetcher:
+    service = NotamService(notam_fetcher, feeds)
+    server = make_server(service, args.unix_socket or (args.host, args.port))
+    service.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
@@ -0,0 +1,114 @@
+import json
+import pytest
+from notam_fetcher.api_schema import Notam, NotamApiItem
+
+from typing import Any, Callable
+
+
+def notam_item(
+    notam_id: str,
+    effective_end: str = "2024-10-14T22:00:00.000Z",
+    last_updated: str = "2024-10-02T19:54:00.000Z",
+    **notam_fields: Any,
+) -> dict[str, Any]:
+    """Builds a single NOTAM item as returned by the API."""
+    notam = {
+        "id": notam_id,
+        "series": "A",
+        "number": "A2157/24",
+        "type": "N",
+        "issued": "2024-10-02T19:54:00.000Z",
+        "affectedFIR": "KZJX",
+        "selectionCode": "QCBLS",
+        "minimumFL": "000",
+        "maximumFL": "040",
+        "location": "ZJX",
+        "effectiveStart": "2024-10-02T19:50:00.000Z",
+        "effectiveEnd": effective_end,
+        "text": "ZJX AIRSPACE ADS-B SER MAY NOT BE AVBL",
+        "classification": "INTL",
+        "accountId": "KZJX",
+        "lastUpdated": last_updated,
+        "icaoLocation": "KZJX",
+        "lowerLimit": "SFC",
+        "upperLimit": "3999FT.",
+    }
+    notam.update(notam_fields)
+    return {
+        "type": "Feature",
+        "properties": {
+            "coreNOTAMData": {
+                "notamEvent": {"scenario": "6000"},
+                "notam": notam,
+                "notamTranslation": [
+                    {
+                        "type": "ICAO",
+                        "formattedText": "A2157/24 NOTAMN\nQ) KZJX/QCBLS////000/040/\nA) KZJX\nB) 2410021950\nC) 2410142200 EST\nE) ZJX AIRSPACE ADS-B SER MAY NOT BE AVBL\nF) SFC   G) 3999FT.",
+                    }
+                ],
+            }
+        },
+        "geometry": {"type": "GeometryCollection"},
+    }
+
+
+def notam(notam_id: str, **kwargs: Any) -> Notam:
+    """Builds a validated Notam, from the item notam_item builds with the same arguments."""
+    return NotamApiItem.model_validate(notam_item(notam_id, **kwargs)).properties.coreNOTAMData.notam
+
+
+def notam_page(
+    page_num: int, total_pages: int, notam_ids: list[str], page_size: int = 1000
+) -> dict[str, Any]:
+    """Builds one page of an API response containing the given NOTAM ids."""
+    return {
+        "pageSize": page_size,
+        "pageNum": page_num,
+        "totalCount": len(notam_ids) * total_pages,
+        "totalPages": total_pages,
+        "items": [notam_item(notam_id) for notam_id in notam_ids],
+    }
+
+
+class MockResponse:
+    """
+    This class only mocks the .json(), .content, .status_code and .headers of a request.Response.
+
+    Used to test different JSON responses.
+
+    Example:
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: mock_response(page))
+
+    """
+    headers: dict[str, str] = {}
+
+    def __init__(self, response: dict[str, Any], status_code: int = 200):
+        self.response = response
+        self.status_code = status_code
+
+    def json(self) -> dict[str, Any]:
+        return self.response
+
+    @property
+    def content(self) -> bytes:
+        return json.dumps(self.response).encode()
+
+
+@pytest.fixture
+def make_notam_item() -> Callable[..., dict[str, Any]]:
+    return notam_item
+
+
+@pytest.fixture
+def make_notam() -> Callable[..., Notam]:
+    return notam
+
+
+@pytest.fixture
+def make_notam_page() -> Callable[..., dict[str, Any]]:
+    return notam_page
+
+
+@pytest.fixture
+def mock_response() -> Callable[..., MockResponse]:
+    return MockResponse
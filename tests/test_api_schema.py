@@ -0,0 +1,48 @@
+import json
+import pytest
+from datetime import datetime, timezone
+from pydantic import ValidationError
+from notam_fetcher.api_schema import NotamAPIResponse, NotamApiItem, OtherResponseItem
+
+from typing import Any, Callable
+
+
+def test_json_and_python_validation_agree(make_notam_page: Callable[..., dict[str, Any]]):
+    data = make_notam_page(1, 1, ["NOTAM_1", "NOTAM_2"])
+    data["items"][1]["properties"]["coreNOTAMData"]["notam"]["effectiveEnd"] = "PERM"
+
+    from_python = NotamAPIResponse.model_validate(data)
+    from_bytes = NotamAPIResponse.model_validate_json(json.dumps(data).encode())
+    assert from_python == from_bytes
+
+    notams = [item.properties.coreNOTAMData.notam for item in from_bytes.items if isinstance(item, NotamApiItem)]
+    assert notams[0].effective_end == "2024-10-14T22:00:00.000Z"
+    assert notams[0].effective_end_datetime == datetime(2024, 10, 14, 22, tzinfo=timezone.utc)
+    assert notams[1].effective_end == "PERM"
+
+
+def test_items_are_discriminated(make_notam_item: Callable[..., dict[str, Any]]):
+    data = {
+        "pageSize": 50,
+        "pageNum": 1,
+        "totalCount": 4,
+        "totalPages": 1,
+        "items": [
+            make_notam_item("NOTAM_1"),
+            {"type": "Point", "geometry": {"type": "Point"}, "properties": {"name": "Dinagat Islands"}},
+            {"type": "Feature", "geometry": {}, "properties": {"name": "Not a NOTAM"}},
+            make_notam_item("MALFORMED", issued="yesterday"),
+        ],
+    }
+    expected = [NotamApiItem, OtherResponseItem, OtherResponseItem, OtherResponseItem]
+    response = NotamAPIResponse.model_validate_json(json.dumps(data))
+    assert [type(item) for item in response.items] == expected
+    response = NotamAPIResponse.model_validate(data)
+    assert [type(item) for item in response.items] == expected
+
+
+def test_unknown_translation_type_is_invalid(make_notam_item: Callable[..., dict[str, Any]]):
+    item = make_notam_item("NOTAM_1")
+    item["properties"]["coreNOTAMData"]["notamTranslation"] = [{"type": "UNKNOWN", "formattedText": ""}]
+    with pytest.raises(ValidationError):
+        NotamApiItem.model_validate(item)
@@ -0,0 +1,101 @@
+from pytest import MonkeyPatch
+import gzip
+import json
+import os
+import pytest
+import requests
+from benchmarks.fake_api import FakeNotamApi, FakeNotamApiConfig
+from notam_fetcher import ArchiveReader, NotamArchive, NotamFetcher, ReplaySession
+from notam_fetcher.exceptions import NotamFetcherUnexpectedError
+
+from typing import Any
+
+
+def test_replay_returns_the_archived_fetch(tmp_path: Any):
+    path = str(tmp_path / "pages.jsonl.gz")
+    with FakeNotamApi(FakeNotamApiConfig(total_pages=3, page_size=10)) as api, NotamArchive(path) as archive:
+        with NotamFetcher("CLIENT_ID", "CLIENT_SECRET", page_size=10, archive=archive) as notam_fetcher:
+            notam_fetcher.FAA_API_URL = api.url
+            expected = notam_fetcher.fetch_notams_by_airport_code("ORD")
+
+    with gzip.open(path, "rt") as archived:
+        lines = [json.loads(line) for line in archived]
+    assert [line["query"]["page_num"] for line in lines] == ["1", "2", "3"]
+
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 3
+        assert sum(len(page.items) for page in reader.iter_pages()) == 30
+
+        # The fake API is stopped, so every page comes from the archive
+        notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET", page_size=10, session=ReplaySession(reader))
+        assert notam_fetcher.fetch_notams_by_airport_code(" ord") == expected
+
+        with pytest.raises(NotamFetcherUnexpectedError):
+            notam_fetcher.fetch_notams_by_airport_code("JFK")
+
+
+def test_archive_keeps_invalid_bodies(monkeypatch: MonkeyPatch, tmp_path: Any):
+    class GatewayTimeoutResponse:
+        status_code = 200
+        headers: dict[str, str] = {}
+        content = b"\xff<html>Gateway Timeout</html>"
+
+    path = str(tmp_path / "pages.jsonl.gz")
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: GatewayTimeoutResponse())
+    with NotamArchive(path) as archive:
+        with pytest.raises(NotamFetcherUnexpectedError):
+            NotamFetcher("CLIENT_ID", "CLIENT_SECRET", archive=archive).fetch_notams_by_airport_code("ORD")
+
+    with ArchiveReader(path) as reader:
+        record = reader.get({"domesticLocation": "ORD", "page_num": "1", "page_size": "1000"})
+        assert record is not None and record.content == GatewayTimeoutResponse.content
+        with pytest.raises(NotamFetcherUnexpectedError):
+            list(reader.iter_pages())
+
+
+def test_index_is_repaired_after_a_crash(tmp_path: Any):
+    path = str(tmp_path / "pages.jsonl.gz")
+    with NotamArchive(path) as archive:
+        for page_num in range(1, 5):
+            archive.append({"domesticLocation": "ORD", "page_num": str(page_num)}, 200, b"{}")
+
+    # The last two index lines were lost, one of them halfway, and the last page was cut short
+    with open(path + ".idx") as index:
+        lines = index.readlines()
+    with open(path + ".idx", "w") as index:
+        index.writelines(lines[:2])
+        index.write(lines[2][:3])
+    size = os.path.getsize(path)
+    with open(path, "r+b") as archived:
+        archived.truncate(size - 5)
+
+    with NotamArchive(path) as archive:
+        archive.append({"domesticLocation": "ORD", "page_num": "4"}, 200, b'{"retried": true}')
+
+    with ArchiveReader(path) as reader:
+        assert [record.query["page_num"] for record in reader] == ["1", "2", "3", "4"]
+        record = reader.get({"domesticLocation": "ORD", "page_num": "4"})
+        assert record is not None and record.content == b'{"retried": true}'
+
+
+def test_reader_does_not_change_a_live_archive(tmp_path: Any):
+    path = str(tmp_path / "pages.jsonl.gz")
+    with NotamArchive(path) as archive:
+        for page_num in range(1, 4):
+            archive.append({"domesticLocation": "ORD", "page_num": str(page_num)}, 200, b"{}")
+
+        # As if the writer had written the last page but not yet its index line,
+        # and had started writing another page
+        with open(path + ".idx") as index:
+            lines = index.readlines()
+        with open(path + ".idx", "w") as index:
+            index.writelines(lines[:2])
+        with open(path, "ab") as archived:
+            archived.write(gzip.compress(b'{"query": {}}\n')[:10])
+        size = os.path.getsize(path)
+
+        with ArchiveReader(path) as reader:
+            assert [record.query["page_num"] for record in reader] == ["1", "2", "3"]
+        with open(path + ".idx") as index:
+            assert index.readlines() == lines[:2]
+        assert os.path.getsize(path) == size
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import pytest
+import aiohttp
+from notam_fetcher import AsyncNotamFetcher, FetchMetrics, RequestScheduler
+from notam_fetcher.exceptions import (
+    NotamFetcherRequestError,
+    NotamFetcherUnauthenticatedError,
+    NotamFetcherValidationError,
+)
+
+from typing import Any, Callable, Optional
+
+
+class MockAsyncResponse:
+    """Mocks the parts of an aiohttp.ClientResponse used by AsyncNotamFetcher."""
+
+    def __init__(self, text: str, status: int = 200, headers: Optional[dict[str, str]] = None):
+        self._text = text
+        self.status = status
+        self.headers = headers or {}
+
+    async def read(self) -> bytes:
+        return self._text.encode()
+
+    async def __aenter__(self) -> "MockAsyncResponse":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        pass
+
+
+class MockSession:
+    """
+    Mocks an aiohttp.ClientSession whose get() answers with respond(params).
+
+    Keeps track of how many requests were in flight at the same time.
+    """
+
+    def __init__(self, respond: Callable[[dict[str, str]], Any]):
+        self.respond = respond
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get(self, url: str, **kwargs: Any) -> "_MockRequest":
+        return _MockRequest(self, kwargs["params"])
+
+
+class _MockRequest:
+    def __init__(self, session: MockSession, params: dict[str, str]):
+        self.session = session
+        self.params = params
+
+    async def __aenter__(self) -> MockAsyncResponse:
+        self.session.in_flight += 1
+        self.session.max_in_flight = max(self.session.max_in_flight, self.session.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            response = self.session.respond(self.params)
+            if isinstance(response, Exception):
+                raise response
+            if isinstance(response, MockAsyncResponse):
+                return response
+            return MockAsyncResponse(json.dumps(response))
+        finally:
+            self.session.in_flight -= 1
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        pass
+
+
+def test_fetch_notams_by_airport_code_pages_in_order(
+    make_notam_page: Callable[..., dict[str, Any]]
+):
+    """Test that all pages are fetched and returned in page order"""
+    session = MockSession(
+        lambda params: make_notam_page(
+            int(params["page_num"]), 6, [f"NOTAM_{params['page_num']}"]
+        )
+    )
+
+    async def fetch():
+        notam_fetcher = AsyncNotamFetcher(
+            "CLIENT_ID", "CLIENT_SECRET", max_concurrent_requests=2, session=session  # type: ignore[arg-type]
+        )
+        return await notam_fetcher.fetch_notams_by_airport_code("ORD")
+
+    notams = asyncio.run(fetch())
+    assert [notam.id for notam in notams] == [f"NOTAM_{page}" for page in range(1, 7)]
+    assert session.max_in_flight == 2
+
+
+def test_fetch_notams_by_latlong_concurrent_lookups_share_limit(
+    make_notam_page: Callable[..., dict[str, Any]]
+):
+    """Test that the in-flight limit applies across concurrent calls"""
+    session = MockSession(lambda params: make_notam_page(1, 1, ["NOTAM_1"]))
+
+    async def fetch():
+        notam_fetcher = AsyncNotamFetcher(
+            "CLIENT_ID", "CLIENT_SECRET", max_concurrent_requests=3, session=session  # type: ignore[arg-type]
+        )
+        return await asyncio.gather(
+            # Distinct queries, as identical ones would be coalesced
+            *(notam_fetcher.fetch_notams_by_latlong(32 + i, 32, 10) for i in range(10))
+        )
+
+    results = asyncio.run(fetch())
+    assert len(results) == 10
+    assert session.max_in_flight == 3
+
+
+def test_fetch_notams_page_error(make_notam_page: Callable[..., dict[str, Any]]):
+    """Test that a request error on one page raises NotamFetcherRequestError"""
+
+    def respond(params: dict[str, str]):
+        if params["page_num"] == "3":
+            return aiohttp.ClientConnectionError("connection reset")
+        return make_notam_page(int(params["page_num"]), 10, ["NOTAM"])
+
+    async def fetch():
+        notam_fetcher = AsyncNotamFetcher(
+            "CLIENT_ID",
+            "CLIENT_SECRET",
+            session=MockSession(respond),  # type: ignore[arg-type]
+            scheduler=RequestScheduler(max_retries=0),
+        )
+        return await notam_fetcher.fetch_notams_by_airport_code("ORD")
+
+    with pytest.raises(NotamFetcherRequestError):
+        asyncio.run(fetch())
+
+
+def test_fetch_notams_retries_rate_limited_pages(make_notam_page: Callable[..., dict[str, Any]]):
+    """Test that a 429 is retried after its Retry-After"""
+    attempts: list[str] = []
+
+    def respond(params: dict[str, str]):
+        attempts.append(params["page_num"])
+        if attempts.count("2") == 1 and params["page_num"] == "2":
+            return MockAsyncResponse("{}", status=429, headers={"Retry-After": "0.05"})
+        return make_notam_page(int(params["page_num"]), 3, [f"NOTAM_{params['page_num']}"])
+
+    async def fetch():
+        notam_fetcher = AsyncNotamFetcher(
+            "CLIENT_ID",
+            "CLIENT_SECRET",
+            session=MockSession(respond),  # type: ignore[arg-type]
+            scheduler=RequestScheduler(backoff_base=0.01),
+        )
+        return await notam_fetcher.fetch_notams_by_airport_code("ORD")
+
+    notams = asyncio.run(fetch())
+    assert [notam.id for notam in notams] == ["NOTAM_1", "NOTAM_2", "NOTAM_3"]
+    assert sorted(attempts) == ["1", "2", "2", "3"]
+
+
+def test_fetch_notams_invalid_json():
+    """Test that an invalid schema from the API raises validation error"""
+    session = MockSession(lambda params: {"Invalid": "This object does not match the schema"})
+
+    async def fetch():
+        notam_fetcher = AsyncNotamFetcher("CLIENT_ID", "CLIENT_SECRET", session=session)  # type: ignore[arg-type]
+        return await notam_fetcher.fetch_notams_by_latlong(32, 32, 10)
+
+    with pytest.raises(NotamFetcherValidationError):
+        asyncio.run(fetch())
+
+
+def test_fetch_notams_unauthenticated():
+    session = MockSession(lambda params: {"error": "Invalid client id or secret"})
+
+    async def fetch():
+        notam_fetcher = AsyncNotamFetcher("CLIENT_ID", "CLIENT_SECRET", session=session)  # type: ignore[arg-type]
+        return await notam_fetcher.fetch_notams_by_airport_code("ORD")
+
+    with pytest.raises(NotamFetcherUnauthenticatedError):
+        asyncio.run(fetch())
+
+
+def test_iter_notams_by_latlong_pages_in_order(make_notam_page: Callable[..., dict[str, Any]]):
+    session = MockSession(
+        lambda params: make_notam_page(
+            int(params["page_num"]), 4, [f"NOTAM_{params['page_num']}"]
+        )
+    )
+
+    async def fetch():
+        notam_fetcher = AsyncNotamFetcher("CLIENT_ID", "CLIENT_SECRET", session=session)  # type: ignore[arg-type]
+        return [notam.id async for notam in notam_fetcher.iter_notams_by_latlong(32, 32, 10)]
+
+    assert asyncio.run(fetch()) == ["NOTAM_1", "NOTAM_2", "NOTAM_3", "NOTAM_4"]
+
+
+def test_identical_concurrent_fetches_are_coalesced(make_notam_page: Callable[..., dict[str, Any]]):
+    """Test that concurrent calls for the same query share one fetch"""
+    requested_pages: list[str] = []
+
+    def respond(params: dict[str, str]):
+        requested_pages.append(params["page_num"])
+        return make_notam_page(int(params["page_num"]), 3, [f"NOTAM_{params['page_num']}"])
+
+    async def fetch():
+        notam_fetcher = AsyncNotamFetcher("CLIENT_ID", "CLIENT_SECRET", session=MockSession(respond))  # type: ignore[arg-type]
+        return await asyncio.gather(
+            *(notam_fetcher.fetch_notams_by_airport_code(code) for code in ["KJFK", "kjfk", "KJFK"])
+        )
+
+    results = asyncio.run(fetch())
+    assert [[notam.id for notam in notams] for notams in results] == [["NOTAM_1", "NOTAM_2", "NOTAM_3"]] * 3
+    assert results[0] is not results[1]
+    assert sorted(requested_pages) == ["1", "2", "3"]
+
+
+def test_hooks_receive_request_and_page_events(make_notam_page: Callable[..., dict[str, Any]]):
+    """Test that hooks see every attempt of a retried page"""
+    attempts: list[str] = []
+
+    def respond(params: dict[str, str]):
+        attempts.append(params["page_num"])
+        if attempts.count("2") == 1 and params["page_num"] == "2":
+            return MockAsyncResponse("{}", status=503)
+        return make_notam_page(int(params["page_num"]), 3, [f"NOTAM_{params['page_num']}"])
+
+    metrics = FetchMetrics()
+
+    async def fetch():
+        notam_fetcher = AsyncNotamFetcher(
+            "CLIENT_ID",
+            "CLIENT_SECRET",
+            session=MockSession(respond),  # type: ignore[arg-type]
+            scheduler=RequestScheduler(backoff_base=0.001),
+            hooks=[metrics],
+        )
+        return await notam_fetcher.fetch_notams_by_airport_code("ORD")
+
+    assert len(asyncio.run(fetch())) == 3
+    assert metrics.value("requests_total", status="200") == 3
+    assert metrics.value("requests_total", status="503") == 1
+    assert metrics.value("retries_total") == 1
+    assert metrics.value("pages_total", cache="none") == 3
+    assert metrics.value("parse_duration_seconds") == 3
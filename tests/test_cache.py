@@ -0,0 +1,166 @@
+from pytest import MonkeyPatch
+import pytest
+import requests
+import time
+from notam_fetcher import MemoryNotamCache, NotamFetcher, SQLiteNotamCache
+from notam_fetcher.api_schema import NotamAPIResponse
+from notam_fetcher.cache import NotamCache, cache_key
+
+from pathlib import Path
+from typing import Any, Callable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: MonkeyPatch) -> FakeClock:
+    fake_clock = FakeClock()
+    monkeypatch.setattr(time, "time", fake_clock)
+    return fake_clock
+
+
+@pytest.fixture
+def mock_api(
+    monkeypatch: MonkeyPatch, make_notam_page: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+) -> list[dict[str, str]]:
+    """Serves 2 pages per query, naming NOTAMs after the request count. Returns the requests made."""
+    requests_made: list[dict[str, str]] = []
+
+    def returnPage(*args: Any, **kwargs: Any) -> Any:
+        requests_made.append(kwargs["params"])
+        page_num = int(kwargs["params"]["page_num"])
+        return mock_response(make_notam_page(page_num, 2, [f"NOTAM_{len(requests_made)}"]))
+
+    monkeypatch.setattr(requests.Session, "get", returnPage)
+    return requests_made
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request: pytest.FixtureRequest, tmp_path: Path) -> Callable[..., NotamCache]:
+    def make(**kwargs: Any) -> NotamCache:
+        if request.param == "memory":
+            return MemoryNotamCache(**kwargs)
+        return SQLiteNotamCache(str(tmp_path / "cache.db"), **kwargs)
+
+    return make
+
+
+def page(make_notam_page: Callable[..., dict[str, Any]], notam_id: str) -> NotamAPIResponse:
+    return NotamAPIResponse.model_validate(make_notam_page(1, 1, [notam_id]))
+
+
+def test_cache_key_normalizes_query():
+    assert cache_key(
+        {"domesticLocation": " kord", "page_num": "1", "page_size": "1000"}
+    ) == cache_key({"page_size": "1000", "page_num": "1", "domesticLocation": "KORD"})
+    assert cache_key(
+        {"locationLatitude": "32", "locationLongitude": "-97.0", "locationRadius": "10"}
+    ) == cache_key(
+        {"locationLatitude": "32.0", "locationLongitude": "-97", "locationRadius": "10.0"}
+    )
+
+
+def test_incomplete_cache_cannot_be_created():
+    class NoDelete(NotamCache):
+        def _get(self, key: str) -> None:
+            return None
+
+        def _set(self, key: str, entry: Any) -> None:
+            pass
+
+    with pytest.raises(TypeError):
+        NoDelete()  # type: ignore[abstract]
+
+
+def test_cache_ttl_and_stale_window(
+    clock: FakeClock,
+    make_cache: Callable[..., NotamCache],
+    make_notam_page: Callable[..., dict[str, Any]],
+):
+    cache = make_cache(ttl=60, stale_ttl=30)
+    cache.set("KORD", page(make_notam_page, "NOTAM_1"))
+
+    entry = cache.get("KORD")
+    assert entry is not None and not entry.is_stale
+    assert entry.page == page(make_notam_page, "NOTAM_1")
+
+    clock.now += 61
+    entry = cache.get("KORD")
+    assert entry is not None and entry.is_stale
+
+    clock.now += 30
+    assert cache.get("KORD") is None
+    assert (cache.stats.hits, cache.stats.stale_hits, cache.stats.misses) == (1, 1, 1)
+
+
+def test_cache_evicts_least_recently_used(
+    clock: FakeClock,
+    make_cache: Callable[..., NotamCache],
+    make_notam_page: Callable[..., dict[str, Any]],
+):
+    cache = make_cache(max_entries=2)
+    cache.set("KORD", page(make_notam_page, "NOTAM_1"))
+    clock.now += 1
+    cache.set("KATL", page(make_notam_page, "NOTAM_2"))
+    clock.now += 1
+    cache.get("KORD")
+    clock.now += 1
+    cache.set("KDFW", page(make_notam_page, "NOTAM_3"))
+
+    assert cache.get("KATL") is None
+    assert cache.get("KORD") is not None
+    assert cache.get("KDFW") is not None
+    assert cache.stats.evictions == 1
+
+
+def test_sqlite_cache_is_shared_between_instances(
+    tmp_path: Path, make_notam_page: Callable[..., dict[str, Any]]
+):
+    """Test that two caches on the same file, as in two processes, see each other's entries"""
+    writer = SQLiteNotamCache(str(tmp_path / "cache.db"))
+    reader = SQLiteNotamCache(str(tmp_path / "cache.db"))
+    writer.set("KORD", page(make_notam_page, "NOTAM_1"))
+
+    entry = reader.get("KORD")
+    assert entry is not None
+    assert entry.page == page(make_notam_page, "NOTAM_1")
+
+
+def test_fetcher_serves_cached_pages(
+    clock: FakeClock, mock_api: list[dict[str, str]], make_cache: Callable[..., NotamCache]
+):
+    cache = make_cache(ttl=60)
+    notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET", cache=cache)
+
+    first = notam_fetcher.fetch_notams_by_airport_code("KORD")
+    second = notam_fetcher.fetch_notams_by_airport_code("kord")
+    assert first == second
+    assert len(mock_api) == 2
+    assert cache.stats.hits == 2
+
+    clock.now += 61
+    notam_fetcher.fetch_notams_by_airport_code("KORD")
+    assert len(mock_api) == 4
+
+
+def test_fetcher_refreshes_stale_pages_in_background(
+    clock: FakeClock, mock_api: list[dict[str, str]]
+):
+    cache = MemoryNotamCache(ttl=60, stale_ttl=60)
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET", cache=cache) as notam_fetcher:
+        first = notam_fetcher.fetch_notams_by_airport_code("KORD")
+
+        clock.now += 61
+        stale = notam_fetcher.fetch_notams_by_airport_code("KORD")
+        assert stale == first
+
+    # close() waits for the background refreshes
+    assert len(mock_api) == 4
+    refreshed = NotamFetcher("CLIENT_ID", "CLIENT_SECRET", cache=cache).fetch_notams_by_airport_code("KORD")
+    assert [notam.id for notam in refreshed] == ["NOTAM_3", "NOTAM_4"]
@@ -0,0 +1,22 @@
+import math
+from datetime import datetime, timezone
+from notam_fetcher.effective_time import PERMANENT_TIMESTAMP, parse_effective_end, timestamp
+from notam_fetcher.notam_table import PERMANENT
+
+
+def test_permanent_timestamp_is_the_table_permanent_end():
+    assert PERMANENT_TIMESTAMP == PERMANENT.astype("int64").item() / 1000
+
+
+def test_naive_datetimes_are_utc():
+    assert timestamp(datetime(2024, 10, 1)) == timestamp(datetime(2024, 10, 1, tzinfo=timezone.utc))
+
+
+def test_parse_effective_end():
+    expected = datetime(2024, 10, 6, tzinfo=timezone.utc).timestamp()
+    assert parse_effective_end("2024-10-06T00:00:00.000Z") == (expected, False)
+    assert parse_effective_end("2024-10-06T00:00EST") == (expected, True)
+    assert parse_effective_end(datetime(2024, 10, 6)) == (expected, False)
+    assert parse_effective_end("PERM") == (PERMANENT_TIMESTAMP, False)
+    end, estimated = parse_effective_end("UNKNOWN")
+    assert math.isnan(end) and not estimated
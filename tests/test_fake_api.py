@@ -0,0 +1,31 @@
+import pytest
+from benchmarks.fake_api import FakeNotamApi, FakeNotamApiConfig
+from notam_fetcher import NotamFetcher, NotamFetcherUnauthenticatedError
+
+from typing import Iterator
+
+
+@pytest.fixture
+def api() -> Iterator[FakeNotamApi]:
+    with FakeNotamApi(FakeNotamApiConfig(total_pages=3, page_size=20)) as fake_api:
+        yield fake_api
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_fetches_every_page_over_http(api: FakeNotamApi, max_workers: int):
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET", page_size=20, max_workers=max_workers) as notam_fetcher:
+        notam_fetcher.FAA_API_URL = api.url
+        notams = notam_fetcher.fetch_notams_by_airport_code("ORD")
+        assert len({notam.id for notam in notams}) == len(notams) == 60
+        assert notam_fetcher.fetch_notams_by_airport_code("ORD") == notams
+        assert len(notam_fetcher.fetch_notams_by_latlong(41.98, -87.90, 50)) == 60
+
+    assert api.stats.pages == 9
+    assert api.stats.items == 180
+
+
+def test_missing_credentials_are_unauthenticated(api: FakeNotamApi):
+    with NotamFetcher("", "") as notam_fetcher:
+        notam_fetcher.FAA_API_URL = api.url
+        with pytest.raises(NotamFetcherUnauthenticatedError):
+            notam_fetcher.fetch_notams_by_airport_code("ORD")
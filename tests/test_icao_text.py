@@ -0,0 +1,93 @@
+import pytest
+import sys
+from datetime import datetime, timezone
+from notam_fetcher import decode_formatted_text, decode_formatted_texts, decode_page
+from notam_fetcher.api_schema import NotamAPIResponse
+
+from typing import Any, Callable
+
+FORMATTED_TEXT = "A2157/24 NOTAMN\nQ) KZJX/QCBLS////000/040/\nA) KZJX\nB) 2410021950\nC) 2410142200 EST\nE) ZJX AIRSPACE ADS-B SER MAY NOT BE AVBL\nF) SFC   G) 3999FT."
+
+PERMANENT_TEXT = (
+    "A0412/24 NOTAMR A0398/24\n"
+    "Q) KZAB/QMRLC/IV/NBO/A/000/999/3326N11200W005\n"
+    "A) KPHX KDVT\n"
+    "B) 2403011200\n"
+    "C) PERM\n"
+    "D) MON-FRI 1300-2100\n"
+    "E) RWY 08/26 CLSD\n"
+    "   EXC TAX"
+)
+
+
+def test_decode_formatted_text():
+    notam = decode_formatted_text(FORMATTED_TEXT)
+
+    assert (notam.number, notam.kind, notam.reference) == ("A2157/24", "N", None)
+    assert (notam.fir, notam.qcode, notam.traffic, notam.purpose, notam.scope) == ("KZJX", "QCBLS", None, None, None)
+    assert (notam.lower, notam.upper) == (0, 40)
+    assert notam.lat is None and notam.radius is None
+    assert notam.locations == ("KZJX",)
+    assert notam.start == datetime(2024, 10, 2, 19, 50, tzinfo=timezone.utc)
+    assert notam.end == datetime(2024, 10, 14, 22, 0, tzinfo=timezone.utc)
+    assert notam.is_estimated and not notam.is_permanent
+    assert notam.text == "ZJX AIRSPACE ADS-B SER MAY NOT BE AVBL"
+    assert (notam.lower_limit, notam.upper_limit) == ("SFC", "3999FT.")
+
+
+def test_decode_permanent_replacement():
+    notam = decode_formatted_text(PERMANENT_TEXT)
+
+    assert (notam.kind, notam.reference) == ("R", "A0398/24")
+    assert (notam.traffic, notam.purpose, notam.scope, notam.upper) == ("IV", "NBO", "A", 999)
+    assert notam.lat == pytest.approx(33 + 26 / 60)
+    assert notam.long == pytest.approx(-112.0)
+    assert notam.radius == 5.0
+    assert notam.locations == ("KPHX", "KDVT")
+    assert notam.end is None and notam.is_permanent and not notam.is_estimated
+    assert notam.schedule == "MON-FRI 1300-2100"
+    assert notam.text == "RWY 08/26 CLSD\n   EXC TAX"
+    assert notam.lower_limit is None and notam.upper_limit is None
+
+
+def test_qcodes_are_interned():
+    first = decode_formatted_text(FORMATTED_TEXT)
+    second = decode_formatted_text(FORMATTED_TEXT.replace("A2157/24", "A2158/24"))
+    assert first.qcode is second.qcode is sys.intern("QCBLS")
+    assert first.fir is second.fir
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "ZJX AIRSPACE ADS-B SER MAY NOT BE AVBL",
+        FORMATTED_TEXT.replace("B) 2410021950", "B) 2413021950"),
+        FORMATTED_TEXT.replace("C) 2410142200", "C) SOON"),
+        FORMATTED_TEXT.replace("/000/040/", "/LOW/040/"),
+    ],
+)
+def test_decode_malformed_text(text: str):
+    with pytest.raises(ValueError):
+        decode_formatted_text(text)
+
+
+def test_decode_batch_reports_malformed_texts():
+    result = decode_formatted_texts([FORMATTED_TEXT, "NOT A NOTAM", PERMANENT_TEXT])
+
+    assert [notam.number if notam else None for notam in result.decoded] == ["A2157/24", None, "A0412/24"]
+    assert [(error.index, error.text) for error in result.errors] == [(1, "NOT A NOTAM")]
+
+
+def test_decode_page(make_notam_page: Callable[..., dict[str, Any]]):
+    data = make_notam_page(2, 3, ["NOTAM_1", "NOTAM_2", "NOTAM_3"])
+    translations = data["items"][1]["properties"]["coreNOTAMData"]["notamTranslation"]
+    translations[0]["formattedText"] = "A2157/24 NOTAMN\nQ) KZJX/QCBLS\nB) 2410021950"
+    del data["items"][2]["properties"]["coreNOTAMData"]["notamTranslation"][0]
+
+    result = decode_page(NotamAPIResponse.model_validate(data))
+
+    assert result.page_num == 2
+    assert list(result.notams) == ["NOTAM_1"]
+    assert result.notams["NOTAM_1"].qcode == "QCBLS"
+    assert [(error.index, error.notam_id) for error in result.errors] == [(1, "NOTAM_2")]
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+import random
+from notam_fetcher import NotamDiff, NotamIntervalIndex
+from notam_fetcher.api_schema import Notam
+
+from typing import Callable
+
+
+def utc(*args: int) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def ids(notams: list[Notam]) -> list[str]:
+    return [notam.id for notam in notams]
+
+
+def test_overlapping_windows(make_notam: Callable[..., Notam]):
+    index = NotamIntervalIndex(
+        [
+            make_notam("BEFORE", effectiveStart="2024-10-01T00:00:00.000Z", effective_end="2024-10-01T12:00:00.000Z"),
+            make_notam("DURING", effectiveStart="2024-10-02T10:00:00.000Z", effective_end="2024-10-02T11:00:00.000Z"),
+            make_notam("SPANNING", effectiveStart="2024-09-01T00:00:00.000Z", effective_end="2024-11-01T00:00:00.000Z"),
+            make_notam("ESTIMATED", effectiveStart="2024-10-02T11:30:00.000Z", effective_end="2024-10-03T00:00:00.000Z EST"),
+            make_notam("PERM", effectiveStart="2024-01-01T00:00:00.000Z", effective_end="PERM"),
+            make_notam("LATER_PERM", effectiveStart="2024-10-05T00:00:00.000Z", effective_end="PERM"),
+            make_notam("AFTER", effectiveStart="2024-10-03T00:00:00.000Z", effective_end="2024-10-04T00:00:00.000Z"),
+        ]
+    )
+    assert len(index) == 7
+
+    flight = (utc(2024, 10, 2, 9), utc(2024, 10, 2, 12))
+    assert ids(index.overlapping(*flight)) == ["PERM", "SPANNING", "DURING", "ESTIMATED"]
+    assert ids(index.active_at(utc(2024, 10, 1, 12))) == ["PERM", "SPANNING", "BEFORE"]
+    assert ids(index.active_at(utc(2030, 1, 1))) == ["PERM", "LATER_PERM"]
+
+
+def test_overlapping_filters_by_location_and_id(make_notam: Callable[..., Notam]):
+    index = NotamIntervalIndex(
+        [
+            make_notam("ORD", effectiveStart="2024-10-02T00:00:00.000Z", effective_end="PERM", location="ORD", icaoLocation="KORD"),
+            make_notam("ATL", effectiveStart="2024-10-02T00:00:00.000Z", effective_end="PERM", location="ATL", icaoLocation="KATL"),
+        ]
+    )
+    window = (utc(2024, 10, 3), utc(2024, 10, 4))
+    assert ids(index.overlapping(*window, locations={"KORD"})) == ["ORD"]
+    assert ids(index.overlapping(*window, locations={"ATL", "DFW"})) == ["ATL"]
+    assert ids(index.overlapping(*window, notam_ids={"ATL"})) == ["ATL"]
+    assert index.overlapping(*window, locations={"ORD"}, notam_ids={"ATL"}) == []
+
+
+def test_incremental_updates(make_notam: Callable[..., Notam]):
+    index = NotamIntervalIndex()
+    index.add(make_notam("A", effectiveStart="2024-10-02T00:00:00.000Z", effective_end="2024-10-03T00:00:00.000Z"))
+    index.add(make_notam("B", effectiveStart="2024-10-02T00:00:00.000Z", effective_end="2024-10-10T00:00:00.000Z"))
+    assert ids(index.active_at(utc(2024, 10, 5))) == ["B"]
+
+    # Replacing a NOTAM moves its window
+    index.add(make_notam("A", effectiveStart="2024-10-02T00:00:00.000Z", effective_end="PERM"))
+    assert len(index) == 2
+    assert ids(index.active_at(utc(2024, 10, 5))) == ["A", "B"]
+
+    assert ids(index.remove_ended(utc(2024, 10, 11))) == ["B"]
+    assert index.remove("B") is None
+    assert "A" in index and "B" not in index
+
+    index.apply_diff(
+        NotamDiff(
+            inserted=[make_notam("C", effectiveStart="2024-10-04T00:00:00.000Z", effective_end="2024-10-06T00:00:00.000Z")],
+            updated=[],
+            expired=[make_notam("A", effectiveStart="2024-10-02T00:00:00.000Z", effective_end="PERM")],
+        )
+    )
+    assert ids(index.active_at(utc(2024, 10, 5))) == ["C"]
+
+
+def test_overlapping_matches_linear_scan(make_notam: Callable[..., Notam]):
+    rng = random.Random(0)
+    base = utc(2024, 10, 1)
+    notams = []
+    windows = {}
+    for i in range(300):
+        start = base + timedelta(minutes=rng.randrange(0, 60 * 24 * 30))
+        end = start + timedelta(minutes=rng.choice([0, 1, 30, 600, 60 * 24 * 20]) + rng.randrange(0, 60))
+        notams.append(
+            make_notam(
+                f"NOTAM_{i}",
+                effectiveStart=start.isoformat().replace("+00:00", "Z"),
+                effective_end=end.isoformat().replace("+00:00", "Z"),
+            )
+        )
+        windows[f"NOTAM_{i}"] = (start, end)
+
+    index = NotamIntervalIndex(notams[:150])
+    for notam in notams[150:]:
+        index.add(notam)
+
+    for _ in range(50):
+        query_start = base + timedelta(minutes=rng.randrange(0, 60 * 24 * 30))
+        query_end = query_start + timedelta(minutes=rng.randrange(0, 60 * 24))
+        expected = {
+            notam_id
+            for notam_id, (start, end) in windows.items()
+            if start <= query_end and end >= query_start
+        }
+        assert set(ids(index.overlapping(query_start, query_end))) == expected
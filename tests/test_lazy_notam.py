@@ -0,0 +1,85 @@
+from pytest import MonkeyPatch
+import json
+from datetime import datetime, timezone
+import pytest
+import requests
+from notam_fetcher import NotamFetcher, NotamTable
+from notam_fetcher.api_schema import Notam
+from notam_fetcher.exceptions import NotamFetcherUnauthenticatedError, NotamFetcherValidationError
+from notam_fetcher.lazy_notam import parse_lazy_page
+from notam_fetcher.response import notams_from_page, parse_response_content
+
+from typing import Any, Callable
+
+FIELDS = list(Notam.model_fields)
+
+
+@pytest.fixture
+def page_content(make_notam_page: Callable[..., dict[str, Any]], make_notam_item: Callable[..., dict[str, Any]]) -> bytes:
+    page = make_notam_page(1, 1, ["NOTAM_1"])
+    page["items"].append(make_notam_item("NOTAM_2", effective_end="PERM", selectionCode=None))
+    page["items"].append(make_notam_item("NOTAM_3", effective_end="2024-10-14T22:00:00.000Z EST"))
+    page["items"].append({"type": "Point", "geometry": {"type": "Point"}, "properties": {"name": "Dinagat Islands"}})
+    return json.dumps(page).encode()
+
+
+def test_lazy_notams_match_validated_notams(page_content: bytes):
+    expected = notams_from_page(parse_response_content(page_content))
+    page = parse_lazy_page(page_content)
+
+    assert (page.page_num, page.total_pages) == (1, 1)
+    assert len(page.notams) == 3
+    for lazy, notam in zip(page.notams, expected):
+        assert [getattr(lazy, name) for name in FIELDS] == [getattr(notam, name) for name in FIELDS]
+        assert lazy.effective_end_datetime == notam.effective_end_datetime
+        assert lazy.to_notam() == notam
+    assert page.notams[0].issued is page.notams[0].issued
+    assert page.notams[2].effective_end_datetime == datetime(2024, 10, 14, 22, tzinfo=timezone.utc)
+
+
+def test_invalid_fields_raise_when_read(make_notam_page: Callable[..., dict[str, Any]]):
+    page = make_notam_page(1, 1, ["NOTAM_1"])
+    notam = page["items"][0]["properties"]["coreNOTAMData"]["notam"]
+    notam["issued"] = "yesterday"
+    del notam["location"]
+    lazy = parse_lazy_page(json.dumps(page)).notams[0]
+
+    assert lazy.id == "NOTAM_1"
+    with pytest.raises(NotamFetcherValidationError):
+        lazy.issued
+    with pytest.raises(NotamFetcherValidationError):
+        lazy.location
+    with pytest.raises(NotamFetcherValidationError):
+        lazy.to_notam()
+
+
+def test_invalid_pages_raise():
+    with pytest.raises(NotamFetcherUnauthenticatedError):
+        parse_lazy_page(b'{"error": "Invalid client id or secret"}')
+    with pytest.raises(NotamFetcherValidationError):
+        parse_lazy_page(b'{"pageNum": 1, "items": []}')
+
+
+def test_fetch_lazy_notams(
+    monkeypatch: MonkeyPatch, make_notam_page: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+):
+    def returnPage(*args: Any, **kwargs: Any) -> Any:
+        page_num = int(kwargs["params"]["page_num"])
+        return mock_response(make_notam_page(page_num, 3, [f"NOTAM_{page_num}_A", f"NOTAM_{page_num}_B"]))
+
+    monkeypatch.setattr(requests.Session, "get", returnPage)
+    notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET", max_workers=2)
+    lazy = notam_fetcher.fetch_lazy_notams_by_airport_code("ORD")
+    notams = notam_fetcher.fetch_notams_by_airport_code("ORD")
+
+    assert [notam.id for notam in lazy] == [notam.id for notam in notams]
+    assert len(notam_fetcher.fetch_lazy_notams_by_latlong(41.98, -87.90, 50)) == 6
+    assert list(NotamTable.from_notams(lazy)) == notams  # type: ignore[arg-type]
+
+
+def test_fetch_lazy_notams_checks_radius():
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET") as notam_fetcher:
+        with pytest.raises(ValueError):
+            notam_fetcher.fetch_lazy_notams_by_latlong(32, 32, 150)
+        with pytest.raises(ValueError):
+            notam_fetcher.fetch_lazy_notams_by_latlong(32, 32, 0)
@@ -0,0 +1,122 @@
+from pytest import MonkeyPatch
+import io
+import json
+import pytest
+import requests
+from benchmarks.fake_api import FakeNotamApi, FakeNotamApiConfig
+from notam_fetcher import FetchMetrics, JsonlEventLog, MemoryNotamCache, NotamFetcher, RequestScheduler
+from notam_fetcher.exceptions import NotamFetcherValidationError
+from notam_fetcher.metrics import FetchHooks, PageEvent
+
+from typing import Any, Callable
+
+
+class RecordingHooks(FetchHooks):
+    def __init__(self) -> None:
+        self.pages: list[PageEvent] = []
+
+    def on_page(self, event: PageEvent) -> None:
+        self.pages.append(event)
+
+
+@pytest.fixture
+def flaky_api(
+    monkeypatch: MonkeyPatch, make_notam_page: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+) -> list[str]:
+    """Serves 3 pages, the first request for page 2 failing with 503. Returns the pages requested."""
+    requested: list[str] = []
+
+    def returnPage(*args: Any, **kwargs: Any) -> Any:
+        page_num = kwargs["params"]["page_num"]
+        requested.append(page_num)
+        if requested.count("2") == 1 and page_num == "2":
+            return mock_response({"error": "Service Unavailable"}, status_code=503)
+        return mock_response(make_notam_page(int(page_num), 3, [f"NOTAM_{page_num}"]))
+
+    monkeypatch.setattr(requests.Session, "get", returnPage)
+    return requested
+
+
+def test_hooks_receive_request_and_page_events(flaky_api: list[str]):
+    metrics = FetchMetrics()
+    log = io.StringIO()
+    notam_fetcher = NotamFetcher(
+        "CLIENT_ID", "CLIENT_SECRET", scheduler=RequestScheduler(backoff_base=0.001), hooks=[metrics, JsonlEventLog(log)]
+    )
+    assert len(notam_fetcher.fetch_notams_by_airport_code("ORD")) == 3
+
+    assert metrics.value("requests_total", status="200") == 3
+    assert metrics.value("requests_total", status="503") == 1
+    assert metrics.value("request_errors_total", error="NotamFetcherServerError") == 1
+    assert metrics.value("retries_total") == 1
+    assert metrics.value("pages_total", cache="none") == 3
+    assert metrics.value("items_total") == 3
+    assert metrics.value("page_duration_seconds") == 3
+
+    events = [json.loads(line) for line in log.getvalue().splitlines()]
+    assert [event["event"] for event in events].count("request") == 4
+    pages = [event for event in events if event["event"] == "page"]
+    assert [(page["page_num"], page["requests"], page["retries"]) for page in pages] == [(1, 1, 0), (2, 2, 1), (3, 1, 0)]
+    assert all(page["http_seconds"] <= page["request_seconds"] <= page["seconds"] for page in pages)
+
+
+def test_prometheus_text_and_jsonl_export(flaky_api: list[str]):
+    metrics = FetchMetrics(duration_buckets=(0.5, 10))
+    notam_fetcher = NotamFetcher(
+        "CLIENT_ID", "CLIENT_SECRET", scheduler=RequestScheduler(backoff_base=0.001), hooks=[metrics]
+    )
+    notam_fetcher.fetch_notams_by_airport_code("ORD")
+
+    text = metrics.prometheus_text()
+    assert "# TYPE notam_fetcher_requests_total counter" in text
+    assert 'notam_fetcher_requests_total{status="503"} 1' in text
+    assert "# TYPE notam_fetcher_page_duration_seconds histogram" in text
+    assert 'notam_fetcher_page_duration_seconds_bucket{le="10"} 3' in text
+    assert 'notam_fetcher_page_duration_seconds_bucket{le="+Inf"} 3' in text
+    assert "notam_fetcher_page_duration_seconds_count 3" in text
+
+    out = io.StringIO()
+    metrics.write_jsonl(out)
+    snapshot = json.loads(out.getvalue())
+    assert snapshot["metrics"]["pages_total"] == {"cache=none": 3}
+    assert snapshot["metrics"]["page_duration_seconds"][""]["count"] == 3
+
+
+def test_page_events_record_cache_outcome(flaky_api: list[str]):
+    hooks = RecordingHooks()
+    notam_fetcher = NotamFetcher(
+        "CLIENT_ID",
+        "CLIENT_SECRET",
+        cache=MemoryNotamCache(),
+        scheduler=RequestScheduler(backoff_base=0.001),
+        hooks=[hooks],
+    )
+    notam_fetcher.fetch_notams_by_airport_code("ORD")
+    notam_fetcher.fetch_notams_by_airport_code("ORD")
+
+    assert [event.cache for event in hooks.pages] == ["miss"] * 3 + ["hit"] * 3
+    assert [event.requests for event in hooks.pages[3:]] == [0, 0, 0]
+    assert [event.items for event in hooks.pages[3:]] == [1, 1, 1]
+
+
+def test_failed_page_is_reported(monkeypatch: MonkeyPatch, mock_response: Callable[..., Any]):
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: mock_response({"Invalid": "page"}))
+    metrics = FetchMetrics()
+    with pytest.raises(NotamFetcherValidationError):
+        NotamFetcher("CLIENT_ID", "CLIENT_SECRET", hooks=[metrics]).fetch_notams_by_airport_code("ORD")
+
+    assert metrics.value("pages_total", cache="none") == 1
+    assert metrics.value("page_errors_total", error="NotamFetcherValidationError") == 1
+
+
+def test_pipelined_fetch_reports_every_page():
+    hooks = RecordingHooks()
+    with FakeNotamApi(FakeNotamApiConfig(total_pages=4, page_size=10)) as api:
+        with NotamFetcher(
+            "CLIENT_ID", "CLIENT_SECRET", page_size=10, max_workers=2, parse_workers=1, hooks=[hooks]
+        ) as notam_fetcher:
+            notam_fetcher.FAA_API_URL = api.url
+            assert len(notam_fetcher.fetch_notams_by_airport_code("ORD")) == 40
+
+    assert [event.page_num for event in hooks.pages] == [1, 2, 3, 4]
+    assert all(event.items == 10 and event.bytes > 0 and event.parse_seconds > 0 for event in hooks.pages)
@@ -1,43 +1,33 @@
 from pytest import MonkeyPatch
 import pytest
 import requests
-from notam_fetcher.exceptions import NotamFetcherValidationError
+import threading
+import time
+from notam_fetcher.exceptions import (
+    NotamFetcherRequestError,
+    NotamFetcherUnexpectedError,
+    NotamFetcherValidationError,
+)
 from notam_fetcher.notam_fetcher import NotamFetcher
+from notam_fetcher.scheduler import RequestScheduler
 
-from typing import Any
-
-
-class MockResponse:
-    """
-    This class only mocks the .json() of a request.Response.
-
-    Used to test different JSON responses.
-
-    Example:
-    monkeypatch.setattr(requests, "get", returnInvalid)
-
-    """
-    def __init__(self, response: dict[str, Any]):
-        self.response = response
-
-    def json(self) -> dict[str, Any]:
-        return self.response
+from typing import Any, Callable
 
 
 @pytest.fixture
-def mock_api_received_invalid_json(monkeypatch: MonkeyPatch):
-    def returnInvalid(*args: Any, **kwargs: Any) -> MockResponse:
-        return MockResponse(
+def mock_api_received_invalid_json(monkeypatch: MonkeyPatch, mock_response: Callable[..., Any]):
+    def returnInvalid(*args: Any, **kwargs: Any) -> Any:
+        return mock_response(
             {"Invalid": "This object does not match the schema and cannot be validated"}
         )
 
-    monkeypatch.setattr(requests, "get", returnInvalid)
+    monkeypatch.setattr(requests.Session, "get", returnInvalid)
 
 
 @pytest.fixture
-def mock_one_unexpected_response(monkeypatch: MonkeyPatch):
-    def returnUnexpected(*args: Any, **kwargs: Any) -> MockResponse:
-        return MockResponse(
+def mock_one_unexpected_response(monkeypatch: MonkeyPatch, mock_response: Callable[..., Any]):
+    def returnUnexpected(*args: Any, **kwargs: Any) -> Any:
+        return mock_response(
             {
                 "pageSize": 50,
                 "pageNum": 1,
@@ -89,13 +79,13 @@ def mock_one_unexpected_response(monkeypatch: MonkeyPatch):
             }
         )
 
-    monkeypatch.setattr(requests, "get", returnUnexpected)
+    monkeypatch.setattr(requests.Session, "get", returnUnexpected)
 
 
 @pytest.fixture
-def mock_unexpected_response(monkeypatch: MonkeyPatch):
-    def returnUnexpected(*args: Any, **kwargs: Any) -> MockResponse:
-        return MockResponse(
+def mock_unexpected_response(monkeypatch: MonkeyPatch, mock_response: Callable[..., Any]):
+    def returnUnexpected(*args: Any, **kwargs: Any) -> Any:
+        return mock_response(
             {
                 "pageSize": 10,
                 "pageNum": 3,
@@ -111,13 +101,13 @@ def mock_unexpected_response(monkeypatch: MonkeyPatch):
             }
         )
 
-    monkeypatch.setattr(requests, "get", returnUnexpected)
+    monkeypatch.setattr(requests.Session, "get", returnUnexpected)
 
 
 @pytest.fixture
-def mock_empty_response(monkeypatch: MonkeyPatch):
-    def returnEmpty(*args: Any, **kwargs: Any) -> MockResponse:
-        return MockResponse(
+def mock_empty_response(monkeypatch: MonkeyPatch, mock_response: Callable[..., Any]):
+    def returnEmpty(*args: Any, **kwargs: Any) -> Any:
+        return mock_response(
             {
                 "pageSize": 50,
                 "pageNum": 1,
@@ -127,7 +117,41 @@ def mock_empty_response(monkeypatch: MonkeyPatch):
             }
         )
 
-    monkeypatch.setattr(requests, "get", returnEmpty)
+    monkeypatch.setattr(requests.Session, "get", returnEmpty)
+
+
+@pytest.fixture
+def mock_paginated_response(
+    monkeypatch: MonkeyPatch, make_notam_page: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+) -> list[int]:
+    """Serves 5 pages of 2 NOTAMs each, with earlier pages answering slower. Returns the requested page numbers."""
+    requested_pages: list[int] = []
+    lock = threading.Lock()
+
+    def returnPage(*args: Any, **kwargs: Any) -> Any:
+        page_num = int(kwargs["params"]["page_num"])
+        with lock:
+            requested_pages.append(page_num)
+        time.sleep((5 - page_num) * 0.01)
+        return mock_response(
+            make_notam_page(page_num, 5, [f"NOTAM_{page_num}_1", f"NOTAM_{page_num}_2"])
+        )
+
+    monkeypatch.setattr(requests.Session, "get", returnPage)
+    return requested_pages
+
+
+@pytest.fixture
+def mock_failing_page_response(
+    monkeypatch: MonkeyPatch, make_notam_page: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+):
+    def returnPageOrFail(*args: Any, **kwargs: Any) -> Any:
+        page_num = int(kwargs["params"]["page_num"])
+        if page_num == 3:
+            raise requests.exceptions.ConnectionError("connection reset")
+        return mock_response(make_notam_page(page_num, 20, [f"NOTAM_{page_num}"]))
+
+    monkeypatch.setattr(requests.Session, "get", returnPageOrFail)
 
 
 def test_fetch_notams_by_latlong_invalid_json(mock_api_received_invalid_json: None):
@@ -143,6 +167,21 @@ def test_fetch_notams_by_latlong_invalid_json(mock_api_received_invalid_json: No
     )
 
 
+def test_fetch_notams_by_latlong_not_json(monkeypatch: MonkeyPatch):
+    """Test that a response that is not JSON raises NotamFetcherUnexpectedError"""
+
+    class NotJsonResponse:
+        status_code = 200
+        headers: dict[str, str] = {}
+        content = b"<html>Bad Gateway</html>"
+
+    monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: NotJsonResponse())
+    notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET")
+
+    with pytest.raises(NotamFetcherUnexpectedError, match="Bad Gateway"):
+        notam_fetcher.fetch_notams_by_latlong(32, 32, 10)
+
+
 def test_fetch_notams_by_latlong_one_unexpected_response(mock_one_unexpected_response: None):
     """Test that fetch_notams_by_latlong filters a non-notam object in the NOTAMs API response"""
     notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET")
@@ -170,3 +209,123 @@ def test_fetchNotamsByAirportCode_no_notams(mock_empty_response: None):
     notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET")
     notams = notam_fetcher.fetch_notams_by_airport_code("LAX")
     assert len(notams) == 0
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_fetch_notams_by_airport_code_pages_in_order(
+    mock_paginated_response: list[int], max_workers: int
+):
+    """Test that every page is fetched and NOTAMs are returned in page order"""
+    notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET", max_workers=max_workers)
+    notams = notam_fetcher.fetch_notams_by_airport_code("ORD")
+    assert [notam.id for notam in notams] == [
+        f"NOTAM_{page}_{i}" for page in range(1, 6) for i in (1, 2)
+    ]
+    assert sorted(mock_paginated_response) == [1, 2, 3, 4, 5]
+
+
+def test_fetch_notams_by_latlong_concurrent_page_error(mock_failing_page_response: None):
+    """Test that an error on one page raises the fetcher error when fetching concurrently"""
+    notam_fetcher = NotamFetcher(
+        "CLIENT_ID", "CLIENT_SECRET", max_workers=2, scheduler=RequestScheduler(max_retries=0)
+    )
+    with pytest.raises(NotamFetcherRequestError):
+        notam_fetcher.fetch_notams_by_latlong(32, 32, 10)
+
+
+def test_invalid_max_workers():
+    with pytest.raises(ValueError):
+        NotamFetcher("CLIENT_ID", "CLIENT_SECRET", max_workers=0)
+
+
+def test_requests_time_out(
+    monkeypatch: MonkeyPatch, make_notam_page: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+):
+    timeouts: list[float] = []
+
+    def returnPage(*args: Any, **kwargs: Any) -> Any:
+        timeouts.append(kwargs["timeout"])
+        return mock_response(make_notam_page(1, 1, ["NOTAM_1"]))
+
+    monkeypatch.setattr(requests.Session, "get", returnPage)
+    NotamFetcher("CLIENT_ID", "CLIENT_SECRET", timeout=5).fetch_notams_by_airport_code("ORD")
+    assert timeouts == [5]
+    with pytest.raises(ValueError):
+        NotamFetcher("CLIENT_ID", "CLIENT_SECRET", timeout=0)
+
+
+def test_fetcher_reuses_one_session(
+    monkeypatch: MonkeyPatch, make_notam_page: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+):
+    """Test that every page goes through the same session, with the credentials"""
+    sessions: list[requests.Session] = []
+
+    def returnPage(session: requests.Session, *args: Any, **kwargs: Any) -> Any:
+        sessions.append(session)
+        assert kwargs["headers"] == {"client_id": "CLIENT_ID", "client_secret": "CLIENT_SECRET"}
+        page_num = int(kwargs["params"]["page_num"])
+        return mock_response(make_notam_page(page_num, 3, [f"NOTAM_{page_num}"]))
+
+    monkeypatch.setattr(requests.Session, "get", returnPage)
+
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET", max_workers=2, pool_size=4) as notam_fetcher:
+        notam_fetcher.fetch_notams_by_airport_code("ORD")
+        notam_fetcher.fetch_notams_by_latlong(32, 32, 10)
+
+    assert len(sessions) == 6
+    assert all(session is sessions[0] for session in sessions)
+    assert "client_id" not in sessions[0].headers
+    assert "gzip" in sessions[0].headers["Accept-Encoding"]
+    assert sessions[0].get_adapter(NotamFetcher.FAA_API_URL)._pool_maxsize == 4  # type: ignore[attr-defined]
+
+
+def test_close_only_closes_own_session(monkeypatch: MonkeyPatch):
+    closed: list[requests.Session] = []
+    monkeypatch.setattr(requests.Session, "close", lambda session: closed.append(session))
+
+    shared_session = requests.Session()
+    shared_headers = dict(shared_session.headers)
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET", session=shared_session):
+        pass
+    assert closed == []
+    # The credentials are not left on the caller's session
+    assert dict(shared_session.headers) == shared_headers
+
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET"):
+        pass
+    assert len(closed) == 1
+
+
+def test_iter_notams_by_airport_code_is_lazy(mock_paginated_response: list[int]):
+    """Test that the iterator yields the first page before requesting the next ones"""
+    notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET")
+    notams = notam_fetcher.iter_notams_by_airport_code("ORD")
+    assert mock_paginated_response == []
+
+    assert next(notams).id == "NOTAM_1_1"
+    assert next(notams).id == "NOTAM_1_2"
+    assert mock_paginated_response == [1]
+
+    assert [notam.id for notam in notams][-1] == "NOTAM_5_2"
+    assert mock_paginated_response == [1, 2, 3, 4, 5]
+
+
+def test_iter_notams_by_latlong_stops_prefetching_when_closed(
+    monkeypatch: MonkeyPatch, make_notam_page: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+):
+    """Test that at most 2 * max_workers pages are prefetched and none after the iterator is closed"""
+    requested_pages: list[int] = []
+
+    def returnPage(*args: Any, **kwargs: Any) -> Any:
+        page_num = int(kwargs["params"]["page_num"])
+        requested_pages.append(page_num)
+        return mock_response(make_notam_page(page_num, 50, [f"NOTAM_{page_num}"]))
+
+    monkeypatch.setattr(requests.Session, "get", returnPage)
+
+    notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET", max_workers=2)
+    notams = notam_fetcher.iter_notams_by_latlong(32, 32, 10)
+    assert [next(notams).id for _ in range(3)] == ["NOTAM_1", "NOTAM_2", "NOTAM_3"]
+    notams.close()
+
+    assert len(requested_pages) <= 3 + 2 * 2
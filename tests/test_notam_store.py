@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+from notam_fetcher import NotamDiff, NotamStore
+from notam_fetcher.api_schema import Notam
+
+from typing import Callable
+
+
+NOW = datetime(2024, 10, 5, tzinfo=timezone.utc)
+
+
+def test_sync_reports_inserted_updated_and_expired(make_notam: Callable[..., Notam]):
+    store = NotamStore()
+    diff = store.sync(
+        [
+            make_notam("UNCHANGED"),
+            make_notam("AMENDED"),
+            make_notam("CANCELLED"),
+            make_notam("ENDING", effective_end="2024-10-06T00:00:00.000Z"),
+        ],
+        now=NOW,
+    )
+    assert [notam.id for notam in diff.inserted] == ["UNCHANGED", "AMENDED", "CANCELLED", "ENDING"]
+    assert len(store) == 4
+
+    diff = store.sync(
+        [
+            make_notam("UNCHANGED"),
+            make_notam("AMENDED", last_updated="2024-10-04T00:00:00.000Z"),
+            make_notam("ENDING", effective_end="2024-10-06T00:00:00.000Z"),
+            make_notam("NEW"),
+        ],
+        now=datetime(2024, 10, 7, tzinfo=timezone.utc),
+    )
+    assert [notam.id for notam in diff.inserted] == ["NEW"]
+    assert [notam.id for notam in diff.updated] == ["AMENDED"]
+    assert sorted(notam.id for notam in diff.expired) == ["CANCELLED", "ENDING"]
+    assert sorted(notam.id for notam in store) == ["AMENDED", "NEW", "UNCHANGED"]
+    assert store.get("AMENDED").last_updated == datetime(2024, 10, 4, tzinfo=timezone.utc)  # type: ignore[union-attr]
+
+
+def test_sync_without_changes_is_empty(make_notam: Callable[..., Notam]):
+    notams = [make_notam("PERMANENT", effective_end="PERM")]
+    store = NotamStore(notams)
+    diff = store.sync(notams, now=NOW)
+    assert diff == NotamDiff()
+    assert not diff
+    assert "PERMANENT" in store
+
+
+def test_estimated_end_expires(make_notam: Callable[..., Notam]):
+    estimated = make_notam("ESTIMATED", effective_end="2024-10-14T22:00:00.000Z EST")
+    assert estimated.effective_end_datetime == datetime(2024, 10, 14, 22, tzinfo=timezone.utc)
+
+    store = NotamStore()
+    assert store.sync([estimated], now=NOW).inserted == [estimated]
+    diff = store.sync([estimated], now=datetime(2030, 1, 1, tzinfo=timezone.utc))
+    assert diff.inserted == [] and diff.expired == [estimated]
+    assert "ESTIMATED" not in store
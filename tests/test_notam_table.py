@@ -0,0 +1,85 @@
+import numpy as np
+from datetime import datetime, timezone
+from notam_fetcher import NotamTable
+from notam_fetcher.api_schema import Notam
+from notam_fetcher.notam_table import PERMANENT
+
+from typing import Callable
+
+
+def make_table(make_notam: Callable[..., Notam]) -> tuple[list[Notam], NotamTable]:
+    notams = [
+        make_notam("RWY_CLOSED", selectionCode="QMRLC", classification="DOM",
+                   effectiveStart="2024-10-03T00:00:00.000Z", effective_end="2024-10-04T00:00:00.000Z"),
+        make_notam("OBSTACLE", selectionCode="QOBCE", classification="DOM",
+                   effectiveStart="2024-10-01T00:00:00.000Z", effective_end="PERM"),
+        make_notam("TWY_CLOSED", selectionCode="QMXLC", classification="INTL",
+                   effectiveStart="2024-10-02T00:00:00.000Z", effective_end="2024-10-10T12:00:00.000Z"),
+        make_notam("ESTIMATED", selectionCode="QMRLC", classification="FDC",
+                   effectiveStart="2024-10-05T00:00:00.000Z", effective_end="2024-10-06T00:00EST"),
+        make_notam("NO_CODE", selectionCode=None, classification="DOM",
+                   effectiveStart="2024-10-09T00:00:00.000Z", effective_end="UNKNOWN"),
+    ]
+    return notams, NotamTable.from_notams(iter(notams))
+
+
+def ids(table: NotamTable) -> list[str]:
+    return list(table.column("id"))
+
+
+def test_rows_materialize_to_the_same_notams(make_notam: Callable[..., Notam]):
+    notams, table = make_table(make_notam)
+    assert len(table) == 5
+    assert list(table) == notams
+    assert table[-1] == notams[-1]
+
+
+def test_effective_end_strings(make_notam: Callable[..., Notam]):
+    _, table = make_table(make_notam)
+    effective_end = table.column("effective_end")
+    assert list(table.is_permanent) == [False, True, False, False, False]
+    assert list(table.is_estimated) == [False, False, False, True, False]
+    assert effective_end[1] == PERMANENT
+    assert effective_end[3] == np.datetime64("2024-10-06T00:00")
+    assert np.isnat(effective_end[4])
+
+
+def test_filters(make_notam: Callable[..., Notam]):
+    _, table = make_table(make_notam)
+    active = table.active_between(
+        datetime(2024, 10, 4, 12, tzinfo=timezone.utc), datetime(2024, 10, 5, 1, tzinfo=timezone.utc)
+    )
+    assert ids(table.filter(active)) == ["OBSTACLE", "TWY_CLOSED", "ESTIMATED"]
+    assert ids(table.filter(table.startswith("selection_code", "QMR"))) == ["RWY_CLOSED", "ESTIMATED"]
+    assert ids(table.filter(table.isin("classification", ["INTL", "FDC", "MIL"]))) == ["TWY_CLOSED", "ESTIMATED"]
+    assert ids(table.filter(table.equals("selection_code", None) | table.equals("selection_code", "QOBCE"))) == [
+        "OBSTACLE",
+        "NO_CODE",
+    ]
+    assert len(table.filter(table.equals("location", "NOWHERE"))) == 0
+
+
+def test_sort_and_group_by(make_notam: Callable[..., Notam]):
+    _, table = make_table(make_notam)
+    assert ids(table.sort("effective_end")) == ["RWY_CLOSED", "ESTIMATED", "TWY_CLOSED", "OBSTACLE", "NO_CODE"]
+    assert ids(table.sort("effective_start", descending=True)) == [
+        "NO_CODE", "ESTIMATED", "RWY_CLOSED", "TWY_CLOSED", "OBSTACLE",
+    ]
+    assert ids(table.sort("selection_code", descending=True)) == [
+        "OBSTACLE", "TWY_CLOSED", "RWY_CLOSED", "ESTIMATED", "NO_CODE",
+    ]
+
+    groups = table.group_by("classification")
+    assert {name: ids(group) for name, group in groups.items()} == {
+        "DOM": ["RWY_CLOSED", "OBSTACLE", "NO_CODE"],
+        "INTL": ["TWY_CLOSED"],
+        "FDC": ["ESTIMATED"],
+    }
+    assert table.value_counts("selection_code") == {None: 1, "QMRLC": 2, "QOBCE": 1, "QMXLC": 1}
+
+
+def test_empty_table():
+    table = NotamTable.from_notams([])
+    assert len(table) == 0
+    assert len(table.sort("issued")) == 0
+    assert table.group_by("location") == {}
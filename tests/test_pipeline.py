@@ -0,0 +1,73 @@
+from pytest import MonkeyPatch
+import json
+import pytest
+import requests
+import threading
+import time
+from benchmarks.fake_api import FakeNotamApi, FakeNotamApiConfig
+from concurrent.futures import ThreadPoolExecutor
+from notam_fetcher import MemoryNotamCache, NotamFetcher
+from notam_fetcher.exceptions import NotamFetcherValidationError
+from notam_fetcher.pipeline import iter_page_batches
+
+from typing import Any, Callable
+
+
+def test_pipelined_fetch_matches_sequential_fetch():
+    with FakeNotamApi(FakeNotamApiConfig(total_pages=6, page_size=20)) as api:
+        with NotamFetcher("CLIENT_ID", "CLIENT_SECRET", page_size=20) as sequential:
+            sequential.FAA_API_URL = api.url
+            expected = sequential.fetch_notams_by_airport_code("ORD")
+
+        with NotamFetcher(
+            "CLIENT_ID", "CLIENT_SECRET", page_size=20, max_workers=3, parse_workers=2
+        ) as pipelined:
+            pipelined.FAA_API_URL = api.url
+            assert pipelined.fetch_notams_by_airport_code("ORD") == expected
+            assert len(list(pipelined.iter_notams_by_latlong(41.98, -87.90, 50))) == 120
+
+    assert len(expected) == 120
+
+
+def test_pipelined_fetch_raises_validation_error_with_page(
+    monkeypatch: MonkeyPatch, make_notam_page: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+):
+    def returnPage(*args: Any, **kwargs: Any) -> Any:
+        page_num = int(kwargs["params"]["page_num"])
+        if page_num == 3:
+            return mock_response({"Invalid": "page 3"})
+        return mock_response(make_notam_page(page_num, 5, [f"NOTAM_{page_num}"]))
+
+    monkeypatch.setattr(requests.Session, "get", returnPage)
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET", max_workers=2, parse_workers=1) as notam_fetcher:
+        with pytest.raises(NotamFetcherValidationError) as e:
+            notam_fetcher.fetch_notams_by_airport_code("ORD")
+
+    assert e.value.page_num == 3
+    assert e.value.invalid_object == {"Invalid": "page 3"}
+
+
+def test_pipeline_holds_back_downloads_for_a_slow_consumer(make_notam_page: Callable[..., dict[str, Any]]):
+    downloaded: list[int] = []
+    lock = threading.Lock()
+
+    def fetch_content(page_num: int) -> bytes:
+        with lock:
+            downloaded.append(page_num)
+        return json.dumps(make_notam_page(page_num, 20, [f"NOTAM_{page_num}"])).encode()
+
+    with ThreadPoolExecutor(max_workers=2) as parse_pool:
+        batches = iter_page_batches(fetch_content, io_workers=2, parse_pool=parse_pool, max_pending=3)
+        page_nums = [next(batches).page_num for _ in range(3)]
+        time.sleep(0.1)
+        # The 3 pages consumed and at most 3 pending
+        assert len(downloaded) <= 6
+        page_nums += [batch.page_num for batch in batches]
+
+    assert page_nums == list(range(1, 21))
+    assert sorted(downloaded) == list(range(1, 21))
+
+
+def test_parse_workers_cannot_be_combined_with_cache():
+    with pytest.raises(ValueError):
+        NotamFetcher("CLIENT_ID", "CLIENT_SECRET", parse_workers=2, cache=MemoryNotamCache())
@@ -0,0 +1,74 @@
+import numpy as np
+from datetime import datetime, timezone
+from notam_fetcher import NotamPrioritizer, NotamTable, PriorityRules
+from notam_fetcher.api_schema import Notam
+
+from typing import Callable
+
+
+RULES = PriorityRules(
+    qcode_weights={"QMR": 10.0, "QMRLC": 100.0, "QOB": 5.0},
+    classification_weights={"FDC": 1.0},
+    keyword_weights={"CLSD": 20.0, "U/S": 2.0},
+    time_weight=8.0,
+    time_half_life_hours=1.0,
+)
+WINDOW = (datetime(2024, 10, 5, 12, tzinfo=timezone.utc), datetime(2024, 10, 5, 14, tzinfo=timezone.utc))
+
+
+def make_table(make_notam: Callable[..., Notam]) -> NotamTable:
+    common = {"effectiveStart": "2024-10-01T00:00:00.000Z", "effective_end": "PERM", "classification": "DOM"}
+    return NotamTable.from_notams(
+        [
+            make_notam("RWY_CLOSED", **{**common, "selectionCode": "QMRLC"}, text="RWY 10L CLSD"),
+            make_notam("RWY_LIGHTS", **{**common, "selectionCode": "QMRLH"}, text="RWY 10L EDGE LGT U/S"),
+            make_notam("OBSTACLE", **{**common, "selectionCode": "QOBCE", "classification": "FDC"}, text="CRANE"),
+            make_notam("NO_CODE", **{**common, "selectionCode": None}, text="ENCLSD U/SX"),
+            make_notam(
+                "ENDED_EARLIER",
+                **{**common, "selectionCode": None, "effective_end": "2024-10-05T10:00:00.000Z"},
+                text="",
+            ),
+        ]
+    )
+
+
+def test_score_sums_rule_weights(make_notam: Callable[..., Notam]):
+    table = make_table(make_notam)
+    prioritizer = NotamPrioritizer(RULES)
+
+    # Longest Q-code prefix wins, keywords only match whole words
+    np.testing.assert_allclose(prioritizer.score(table), [120.0, 12.0, 6.0, 0.0, 0.0])
+    # In effect during the window, or ended 2 half lives before it
+    np.testing.assert_allclose(prioritizer.score(table, WINDOW), [128.0, 20.0, 14.0, 8.0, 2.0])
+
+
+def test_rank_and_top_k(make_notam: Callable[..., Notam]):
+    table = make_table(make_notam)
+    prioritizer = NotamPrioritizer(RULES)
+
+    rows = prioritizer.rank(table, WINDOW)
+    assert list(table.take(rows).column("id")) == ["RWY_CLOSED", "RWY_LIGHTS", "OBSTACLE", "NO_CODE", "ENDED_EARLIER"]
+    assert list(prioritizer.rank(table, WINDOW, top_k=2)) == list(rows[:2])
+    assert list(prioritizer.rank(table, WINDOW, top_k=0)) == []
+
+    # Ties keep the table order
+    tied = NotamPrioritizer(PriorityRules(qcode_weights={}, classification_weights={}, keyword_weights={}))
+    assert list(tied.rank(table, top_k=3)) == [0, 1, 2]
+
+
+def test_top_k_matches_full_sort_on_large_tables(make_notam: Callable[..., Notam]):
+    rng = np.random.default_rng(0)
+    codes = ["QMRLC", "QMXLC", "QOBCE", "QFAAH", "QWULW"]
+    table = NotamTable.from_notams(
+        [
+            make_notam(
+                f"NOTAM_{i}",
+                selectionCode=codes[rng.integers(len(codes))],
+                effectiveStart=f"2024-10-{rng.integers(1, 28):02d}T00:00:00.000Z",
+            )
+            for i in range(500)
+        ]
+    )
+    prioritizer = NotamPrioritizer()
+    assert list(prioritizer.rank(table, WINDOW, top_k=40)) == list(prioritizer.rank(table, WINDOW)[:40])
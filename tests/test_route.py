@@ -0,0 +1,84 @@
+from pytest import MonkeyPatch
+import math
+import pytest
+import requests
+from notam_fetcher import Airport, NotamFetcher
+from notam_fetcher.route import (
+    corridor_circles,
+    great_circle_distance,
+    interpolate_great_circle,
+)
+
+from typing import Any, Callable
+
+
+KORD = Airport("ORD", 41.9786, -87.9048)
+KATL = Airport("ATL", 33.6367, -84.4281)
+
+
+def test_great_circle_distance():
+    assert great_circle_distance(KORD.lat, KORD.long, KATL.lat, KATL.long) == pytest.approx(527, abs=3)
+    assert great_circle_distance(0, 0, 0, 1) == pytest.approx(60.04, abs=0.1)
+
+
+@pytest.mark.parametrize("corridor_half_width", [0, 25, 60])
+def test_corridor_circles_cover_corridor(corridor_half_width: float):
+    circles = corridor_circles(KORD, KATL, corridor_half_width)
+    distance = great_circle_distance(KORD.lat, KORD.long, KATL.lat, KATL.long)
+    covered_length = 2 * math.sqrt(100**2 - corridor_half_width**2)
+    assert len(circles) == math.ceil(distance / covered_length)
+
+    for step in range(101):
+        lat, long = interpolate_great_circle(KORD.lat, KORD.long, KATL.lat, KATL.long, step / 100)
+        next_lat, next_long = interpolate_great_circle(
+            KORD.lat, KORD.long, KATL.lat, KATL.long, step / 100 + 0.001
+        )
+        # Points on either side of the route, corridor_half_width away from it
+        east = (next_long - long) * math.cos(math.radians(lat)) * 60
+        north = (next_lat - lat) * 60
+        length = math.hypot(east, north)
+        normal = (-north / length * corridor_half_width, east / length * corridor_half_width)
+        for sign in (1, -1):
+            point_lat = lat + sign * normal[1] / 60
+            point_long = long + sign * normal[0] / 60 / math.cos(math.radians(lat))
+            assert min(
+                great_circle_distance(point_lat, point_long, circle_lat, circle_long)
+                for circle_lat, circle_long, _ in circles
+            ) <= 100.5
+
+
+def test_corridor_circles_same_airport():
+    assert corridor_circles(KORD, KORD, 25) == [(KORD.lat, KORD.long, 100.0)]
+
+
+def test_corridor_circles_invalid_width():
+    with pytest.raises(ValueError):
+        corridor_circles(KORD, KATL, 100)
+
+
+def test_fetch_notams_by_route_merges_and_deduplicates(
+    monkeypatch: MonkeyPatch, make_notam_page: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+):
+    queries: list[dict[str, str]] = []
+
+    def returnPage(*args: Any, **kwargs: Any) -> Any:
+        params = kwargs["params"]
+        queries.append(params)
+        if "domesticLocation" in params:
+            notam_ids = [f"{params['domesticLocation']}_AIRPORT", "SHARED"]
+        else:
+            notam_ids = ["SHARED", f"AREA_{params['locationLatitude'][:5]}"]
+        return mock_response(make_notam_page(1, 1, notam_ids))
+
+    monkeypatch.setattr(requests.Session, "get", returnPage)
+
+    notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET")
+    notams = notam_fetcher.fetch_notams_by_route(KORD, KATL)
+    circles = corridor_circles(KORD, KATL, 25)
+
+    ids = [notam.id for notam in notams]
+    assert len(queries) == len(circles) + 2
+    assert ids[0] == "ORD_AIRPORT"
+    assert ids[-1] == "ATL_AIRPORT"
+    assert ids.count("SHARED") == 1
+    assert len(ids) == len(set(ids)) == 3 + len(circles)
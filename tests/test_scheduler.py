@@ -0,0 +1,140 @@
+import pytest
+import threading
+import time
+from benchmarks.fake_api import FakeNotamApi, FakeNotamApiConfig
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from notam_fetcher import NotamFetcher, RequestScheduler
+from notam_fetcher.exceptions import (
+    NotamFetcherRateLimitError,
+    NotamFetcherServerError,
+    NotamFetcherValidationError,
+)
+from notam_fetcher.scheduler import _parse_retry_after
+
+from typing import Callable
+
+
+def failing(errors: list[Exception], result: str = "OK") -> tuple[Callable[[], str], list[int]]:
+    """Returns a request that raises errors one after another, then returns result, and its call count."""
+    calls = [0]
+
+    def request() -> str:
+        calls[0] += 1
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return request, calls
+
+
+def test_fetcher_retries_server_errors_and_rate_limits():
+    config = FakeNotamApiConfig(total_pages=5, page_size=10, error_rate=0.3, rate_limit_rate=0.2, retry_after=0, seed=1)
+    scheduler = RequestScheduler(max_retries=10, backoff_base=0.001)
+    with FakeNotamApi(config) as api:
+        with NotamFetcher("CLIENT_ID", "CLIENT_SECRET", page_size=10, max_workers=3, scheduler=scheduler) as notam_fetcher:
+            notam_fetcher.FAA_API_URL = api.url
+            assert len(notam_fetcher.fetch_notams_by_airport_code("ORD")) == 50
+
+    assert api.stats.pages == 5
+    assert api.stats.errors > 0 and api.stats.rate_limited > 0
+
+
+def test_gives_up_after_max_retries():
+    scheduler = RequestScheduler(max_retries=2, backoff_base=0.001)
+    request, calls = failing([NotamFetcherServerError("Bad Gateway", 502) for _ in range(3)])
+    with pytest.raises(NotamFetcherServerError):
+        scheduler.run("CLIENT_ID", request)
+    assert calls[0] == 3
+
+
+def test_does_not_retry_invalid_responses():
+    scheduler = RequestScheduler(backoff_base=0.001)
+    request, calls = failing([NotamFetcherValidationError("Invalid", {})])
+    with pytest.raises(NotamFetcherValidationError):
+        scheduler.run("CLIENT_ID", request)
+    assert calls[0] == 1
+    assert scheduler.concurrency_limit("CLIENT_ID") == scheduler.initial_concurrency
+
+
+def test_retry_after_pauses_the_credential():
+    scheduler = RequestScheduler(backoff_base=0.001)
+    request, calls = failing([NotamFetcherRateLimitError("Too Many Requests", retry_after=0.2)])
+    start = time.monotonic()
+    assert scheduler.run("CLIENT_ID", request) == "OK"
+    assert time.monotonic() - start >= 0.2
+    # Other credentials have their own budget
+    start = time.monotonic()
+    scheduler.run("OTHER_CLIENT_ID", lambda: "OK")
+    assert time.monotonic() - start < 0.1
+
+
+def test_concurrency_limit_is_aimd():
+    scheduler = RequestScheduler(initial_concurrency=8, backoff_base=0.001)
+    request, _ = failing([NotamFetcherServerError("Internal Server Error", 500)])
+    scheduler.run("CLIENT_ID", request)
+    # Halved by the failure, then increased by 1 / limit by the successful retry
+    assert scheduler.concurrency_limit("CLIENT_ID") == pytest.approx(4.25)
+
+    for _ in range(20):
+        scheduler.run("CLIENT_ID", lambda: "OK")
+    assert 6 < scheduler.concurrency_limit("CLIENT_ID") < 8
+
+
+def test_failures_of_one_burst_decrease_the_limit_once():
+    scheduler = RequestScheduler(initial_concurrency=8, max_retries=0)
+    barrier = threading.Barrier(4)
+
+    def request() -> str:
+        barrier.wait()
+        raise NotamFetcherServerError("Service Unavailable", 503)
+
+    def run() -> None:
+        with pytest.raises(NotamFetcherServerError):
+            scheduler.run("CLIENT_ID", request)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert scheduler.concurrency_limit("CLIENT_ID") == 4
+
+
+def test_concurrency_limit_bounds_requests_in_flight():
+    scheduler = RequestScheduler(initial_concurrency=2, max_concurrency=2)
+    in_flight = [0]
+    max_in_flight = [0]
+    lock = threading.Lock()
+
+    def request() -> str:
+        with lock:
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return "OK"
+
+    threads = [threading.Thread(target=scheduler.run, args=("CLIENT_ID", request)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max_in_flight[0] == 2
+
+
+def test_token_bucket_limits_the_rate():
+    scheduler = RequestScheduler(rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        scheduler.run("CLIENT_ID", lambda: "OK")
+    assert time.monotonic() - start >= 0.1
+
+
+def test_parse_retry_after():
+    assert _parse_retry_after(None) is None
+    assert _parse_retry_after("2") == 2
+    assert _parse_retry_after("soon") is None
+    retry_after = _parse_retry_after(format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True))
+    assert retry_after is not None and 25 < retry_after <= 30
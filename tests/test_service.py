@@ -0,0 +1,236 @@
+from pytest import MonkeyPatch
+import http.client
+import json
+import pytest
+import requests
+import socket
+import threading
+import time
+from notam_fetcher import NotamFetcher, NotamService, RequestScheduler, WatchedFeed, make_server
+
+from typing import Any, Callable, Iterator
+
+
+@pytest.fixture
+def feeds_api(
+    monkeypatch: MonkeyPatch, make_notam_item: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+) -> dict[str, Any]:
+    """Returns the items of state[airport_code] or state["area"]. Airports in failing return 500."""
+    state: dict[str, Any] = {
+        "ORD": [make_notam_item("ORD_1", effective_end="PERM", location="ORD")],
+        "ATL": [make_notam_item("ATL_1", effective_end="PERM", location="ATL")],
+        "area": [make_notam_item("AREA_1", effective_end="PERM", location="ZAU")],
+        "failing": set(),
+    }
+
+    def returnPage(*args: Any, **kwargs: Any) -> Any:
+        params = kwargs["params"]
+        key = params.get("domesticLocation", "area")
+        if key in state["failing"]:
+            return mock_response({"error": "Internal Server Error"}, status_code=500)
+        items = state[key]
+        return mock_response({"pageSize": 1000, "pageNum": 1, "totalCount": len(items), "totalPages": 1, "items": items})
+
+    monkeypatch.setattr(requests.Session, "get", returnPage)
+    return state
+
+
+@pytest.fixture
+def service(feeds_api: dict[str, Any]) -> Iterator[NotamService]:
+    notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET", scheduler=RequestScheduler(max_retries=0))
+    service = NotamService(
+        notam_fetcher,
+        [
+            WatchedFeed("ORD", airport_code="ORD", interval=0),
+            WatchedFeed("ATL", airport_code="ATL", interval=0),
+            WatchedFeed("chicago", lat=41.98, long=-87.9, radius=50, interval=0),
+        ],
+    )
+    service.poll()
+    yield service
+    service.stop()
+    notam_fetcher.close()
+
+
+@pytest.fixture
+def server(service: NotamService) -> Iterator[tuple[str, int]]:
+    server = make_server(service, ("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address  # type: ignore[misc]
+    service.stop()
+    server.shutdown()
+    server.server_close()
+
+
+def get(address: tuple[str, int], path: str) -> tuple[int, Any]:
+    connection = http.client.HTTPConnection(*address, timeout=10)
+    connection.request("GET", path)
+    response = connection.getresponse()
+    body = json.loads(response.read())
+    connection.close()
+    return response.status, body
+
+
+def test_sync_records_changes(service: NotamService, feeds_api: dict[str, Any], make_notam_item: Callable[..., dict[str, Any]]):
+    # The first sync fills the feeds without events
+    assert service.seq == 0
+    assert [feed["notams"] for feed in service.feeds()] == [1, 1, 1]
+
+    feeds_api["ORD"] = [
+        make_notam_item("ORD_1", effective_end="PERM", location="ORD", last_updated="2024-10-03T00:00:00.000Z"),
+        make_notam_item("ORD_2", effective_end="PERM", location="ORD"),
+    ]
+    feeds_api["area"] = []
+    service.poll()
+
+    seq, events = service.wait_for_events(0, 0)
+    assert seq == 3
+    assert [(event.seq, event.feed, event.kind, event.notam["id"]) for event in events] == [
+        (1, "ORD", "new", "ORD_2"),
+        (2, "ORD", "amended", "ORD_1"),
+        (3, "chicago", "cancelled", "AREA_1"),
+    ]
+    assert [event.seq for event in service.wait_for_events(1, 0, feed="chicago")[1]] == [3]
+    assert sorted(notam["id"] for notam in service.notams()[1]) == ["ATL_1", "ORD_1", "ORD_2"]
+    assert service.notams(location="ATL")[1][0]["id"] == "ATL_1"
+
+
+def test_failed_sync_keeps_notams(service: NotamService, feeds_api: dict[str, Any]):
+    feeds_api["failing"] = {"ORD"}
+    service.poll()
+
+    ord_feed = service.feeds()[0]
+    assert ord_feed["notams"] == 1
+    assert "NotamFetcherServerError" in ord_feed["last_error"]
+    assert service.seq == 0
+
+
+def test_old_events_are_gone(feeds_api: dict[str, Any], make_notam_item: Callable[..., dict[str, Any]]):
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET") as notam_fetcher:
+        service = NotamService(notam_fetcher, [WatchedFeed("ORD", airport_code="ORD", interval=0)], max_events=2)
+        service.poll()
+        feeds_api["ORD"] = [make_notam_item(f"ORD_{i}", effective_end="PERM") for i in range(2, 6)]
+        service.poll()
+
+    assert service.wait_for_events(3, 0)[1][0].seq == 4
+    with pytest.raises(LookupError):
+        service.wait_for_events(1, 0)
+
+
+def test_http_queries(server: tuple[str, int]):
+    status, body = get(server, "/notams?feed=ORD")
+    assert status == 200
+    assert body["seq"] == 0
+    assert [notam["id"] for notam in body["notams"]] == ["ORD_1"]
+
+    assert get(server, "/notams/ATL_1")[1]["location"] == "ATL"
+    assert [notam["id"] for notam in get(server, "/notams?location=ZAU")[1]["notams"]] == ["AREA_1"]
+    assert [feed["name"] for feed in get(server, "/feeds")[1]["feeds"]] == ["ORD", "ATL", "chicago"]
+    assert get(server, "/notams?feed=JFK")[0] == 404
+    assert get(server, "/notams/UNKNOWN")[0] == 404
+    assert get(server, "/events?since=abc")[0] == 400
+
+
+def test_long_poll(
+    server: tuple[str, int],
+    service: NotamService,
+    feeds_api: dict[str, Any],
+    make_notam_item: Callable[..., dict[str, Any]],
+):
+    assert get(server, "/events?since=0&timeout=0.05") == (200, {"seq": 0, "events": []})
+
+    feeds_api["ATL"].append(make_notam_item("ATL_2", effective_end="PERM"))
+    threading.Timer(0.1, service.poll).start()
+    status, body = get(server, "/events?since=0&timeout=10")
+
+    assert status == 200
+    assert body["seq"] == 1
+    assert [(event["kind"], event["notam"]["id"]) for event in body["events"]] == [("new", "ATL_2")]
+    assert [notam["id"] for notam in get(server, "/notams?feed=ATL")[1]["notams"]] == ["ATL_1", "ATL_2"]
+
+
+def test_event_stream(
+    server: tuple[str, int],
+    service: NotamService,
+    feeds_api: dict[str, Any],
+    make_notam_item: Callable[..., dict[str, Any]],
+):
+    feeds_api["ORD"] = []
+    service.poll()
+    feeds_api["ATL"] = []
+    service.poll()
+
+    connection = http.client.HTTPConnection(*server, timeout=10)
+    connection.request("GET", "/events/stream?feed=ATL", headers={"Last-Event-ID": "0"})
+    response = connection.getresponse()
+    assert response.getheader("Content-Type") == "text/event-stream"
+    lines = [response.readline() for _ in range(4)]
+    connection.close()
+
+    assert lines[:2] == [b"id: 2\n", b"event: cancelled\n"]
+    assert json.loads(lines[2][len(b"data: ") :])["notam"]["id"] == "ATL_1"
+
+
+def test_unix_socket(service: NotamService, tmp_path: Any):
+    path = str(tmp_path / "notams.sock")
+    server = make_server(service, path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = socket.socket(socket.AF_UNIX)
+        client.connect(path)
+        client.sendall(b"GET /notams?feed=ORD HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+        response = b""
+        while chunk := client.recv(65536):
+            response += chunk
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    headers, body = response.split(b"\r\n\r\n", 1)
+    assert headers.startswith(b"HTTP/1.1 200")
+    assert [notam["id"] for notam in json.loads(body)["notams"]] == ["ORD_1"]
+
+
+def test_feed_radius_is_checked():
+    with pytest.raises(ValueError):
+        WatchedFeed("wide", lat=41.0, long=-87.0, radius=150)
+    with pytest.raises(ValueError):
+        WatchedFeed("empty", lat=41.0, long=-87.0, radius=0)
+
+
+def test_unexpected_errors_are_recorded(service: NotamService, monkeypatch: MonkeyPatch):
+    def fail(*args: Any, **kwargs: Any) -> Any:
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(NotamFetcher, "fetch_notams_by_airport_code", fail)
+    service.poll()
+
+    feeds = service.feeds()
+    assert [feed["last_error"] for feed in feeds] == ["RuntimeError: boom", "RuntimeError: boom", None]
+    assert [feed["notams"] for feed in feeds] == [1, 1, 1]
+
+
+def test_non_finite_timeout_is_rejected(server: tuple[str, int]):
+    assert get(server, "/events?timeout=nan")[0] == 400
+    assert get(server, "/events?timeout=inf")[0] == 400
+
+
+def test_stop_does_not_wait_for_a_stalled_sync(service: NotamService, monkeypatch: MonkeyPatch):
+    stalled = threading.Event()
+    release = threading.Event()
+
+    def stall(*args: Any, **kwargs: Any) -> Any:
+        stalled.set()
+        release.wait(10)
+        raise requests.exceptions.ReadTimeout()
+
+    monkeypatch.setattr(requests.Session, "get", stall)
+    service.start()
+    assert stalled.wait(10)
+    start = time.monotonic()
+    service.stop(timeout=0.1)
+    assert time.monotonic() - start < 5
+    release.set()
@@ -0,0 +1,125 @@
+from pytest import MonkeyPatch
+import asyncio
+import pytest
+import requests
+import threading
+import time
+from notam_fetcher import NotamFetcher
+from notam_fetcher.single_flight import AsyncSingleFlight, SingleFlight
+
+from typing import Any, Callable
+
+
+def run_in_threads(function: Callable[[], Any], count: int) -> list[Any]:
+    """Calls function from count threads at once and returns the results or exceptions."""
+    results: list[Any] = [None] * count
+    barrier = threading.Barrier(count)
+
+    def run(i: int) -> None:
+        barrier.wait()
+        try:
+            results[i] = function()
+        except Exception as error:
+            results[i] = error
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_result():
+    flights: SingleFlight[int] = SingleFlight()
+    calls = []
+
+    def slow() -> int:
+        calls.append(1)
+        time.sleep(0.1)
+        return 42
+
+    assert run_in_threads(lambda: flights.do("KJFK", slow), 8) == [42] * 8
+    assert len(calls) == 1
+    assert len(flights) == 0
+
+    # Finished calls are not cached
+    flights.do("KJFK", slow)
+    assert len(calls) == 2
+
+
+def test_concurrent_calls_share_one_exception():
+    flights: SingleFlight[int] = SingleFlight()
+    error = ValueError("upstream failed")
+
+    def fail() -> int:
+        time.sleep(0.1)
+        raise error
+
+    assert run_in_threads(lambda: flights.do("KJFK", fail), 4) == [error] * 4
+    assert len(flights) == 0
+
+
+def test_async_calls_share_one_result_and_survive_cancellation():
+    flights: AsyncSingleFlight[int] = AsyncSingleFlight()
+    calls = []
+
+    async def slow() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main() -> list[Any]:
+        first = asyncio.ensure_future(flights.do("KJFK", slow))
+        await asyncio.sleep(0)
+        others = [asyncio.ensure_future(flights.do("KJFK", slow)) for _ in range(4)]
+        first.cancel()
+        results = await asyncio.gather(first, *others, return_exceptions=True)
+        assert len(flights) == 0
+        return results
+
+    results = asyncio.run(main())
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert results[1:] == [42] * 4
+    assert len(calls) == 1
+
+
+@pytest.fixture
+def slow_api(
+    monkeypatch: MonkeyPatch, make_notam_page: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+) -> list[dict[str, str]]:
+    """Serves 3 pages per query, slowly. Returns the requests made."""
+    requests_made: list[dict[str, str]] = []
+
+    def returnPage(*args: Any, **kwargs: Any) -> Any:
+        requests_made.append(kwargs["params"])
+        time.sleep(0.05)
+        page_num = int(kwargs["params"]["page_num"])
+        return mock_response(make_notam_page(page_num, 3, [f"NOTAM_{page_num}"]))
+
+    monkeypatch.setattr(requests.Session, "get", returnPage)
+    return requests_made
+
+
+def test_fetcher_coalesces_identical_queries(slow_api: list[dict[str, str]]):
+    notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET")
+    codes = iter(["KJFK", "kjfk", " KJFK"] * 2)
+    lock = threading.Lock()
+
+    def fetch() -> list[str]:
+        with lock:
+            code = next(codes)
+        return [notam.id for notam in notam_fetcher.fetch_notams_by_airport_code(code)]
+
+    results = run_in_threads(fetch, 6)
+    assert results == [["NOTAM_1", "NOTAM_2", "NOTAM_3"]] * 6
+    assert len(slow_api) == 3
+
+    run_in_threads(lambda: notam_fetcher.fetch_notams_by_latlong(40.64, -73.78, 10), 4)
+    assert len(slow_api) == 6
+
+
+def test_fetcher_without_coalescing(slow_api: list[dict[str, str]]):
+    notam_fetcher = NotamFetcher("CLIENT_ID", "CLIENT_SECRET", coalesce=False)
+    run_in_threads(lambda: notam_fetcher.fetch_notams_by_airport_code("KJFK"), 3)
+    assert len(slow_api) == 9
@@ -0,0 +1,151 @@
+from pytest import MonkeyPatch
+import json
+import os
+import pytest
+import random
+import requests
+from notam_fetcher import NotamFetcher, RequestScheduler, SnapshotJob, hex_tiling, read_snapshot
+from notam_fetcher.route import great_circle_distance
+from notam_fetcher.snapshot import CONUS_BOUNDS
+
+from typing import Any, Callable
+
+BOUNDS = (30.0, -90.0, 34.0, -84.0)
+
+
+@pytest.mark.parametrize(
+    "bounds,radius", [(CONUS_BOUNDS, 100), ((-10.0, 10.0, 12.0, 40.0), 60), ((60.0, -170.0, 70.0, -140.0), 100)]
+)
+def test_hex_tiling_covers_region(bounds: tuple[float, float, float, float], radius: float):
+    tiles = hex_tiling(*bounds, radius=radius)
+    samples = random.Random(0)
+    for _ in range(500):
+        lat = samples.uniform(bounds[0], bounds[2])
+        long = samples.uniform(bounds[1], bounds[3])
+        assert min(great_circle_distance(lat, long, tile[0], tile[1]) for tile in tiles) <= radius
+
+
+def test_hex_tiling_is_close_to_the_thinnest_covering():
+    # A hexagonal covering of the ~2.5 million square NM of the region needs about 190 circles
+    assert len(hex_tiling(*CONUS_BOUNDS)) < 260
+    with pytest.raises(ValueError):
+        hex_tiling(*CONUS_BOUNDS, radius=150)
+
+
+@pytest.fixture
+def tile_api(
+    monkeypatch: MonkeyPatch, make_notam_page: Callable[..., dict[str, Any]], mock_response: Callable[..., Any]
+) -> dict[str, Any]:
+    """Every tile returns a NOTAM of its own and one shared with its row. Tiles in failing return 500."""
+    state: dict[str, Any] = {"requests": 0, "failing": set()}
+
+    def returnPage(*args: Any, **kwargs: Any) -> Any:
+        params = kwargs["params"]
+        state["requests"] += 1
+        tile = (float(params["locationLatitude"]), float(params["locationLongitude"]))
+        if tile in state["failing"]:
+            return mock_response({"error": "Internal Server Error"}, status_code=500)
+        ids = [f"TILE_{tile[0]:.3f}_{tile[1]:.3f}", f"ROW_{tile[0]:.3f}"]
+        return mock_response(make_notam_page(1, 1, ids))
+
+    monkeypatch.setattr(requests.Session, "get", returnPage)
+    return state
+
+
+def test_snapshot_dedupes_notams(tile_api: dict[str, Any], tmp_path: Any):
+    path = str(tmp_path / "snapshot.json")
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET") as notam_fetcher:
+        job = SnapshotJob(notam_fetcher, path, bounds=BOUNDS, max_concurrency=4)
+        report = job.run()
+
+    rows = {tile[0] for tile in job.tiles}
+    assert report.complete and report.coverage == 1.0
+    assert report.notams == len(job.tiles) + len(rows)
+    assert sum(tile.new_notams for tile in report.tiles) == report.notams
+    assert len({notam.id for notam in read_snapshot(path)}) == report.notams
+    assert not os.path.exists(path + ".progress")
+
+
+def test_snapshot_resumes_after_failed_tiles(tile_api: dict[str, Any], tmp_path: Any):
+    path = str(tmp_path / "snapshot.json")
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET", scheduler=RequestScheduler(max_retries=0)) as notam_fetcher:
+        job = SnapshotJob(notam_fetcher, path, bounds=BOUNDS, max_concurrency=4)
+        tile_api["failing"] = {job.tiles[1][:2], job.tiles[-1][:2]}
+        report = job.run()
+
+        assert not report.complete
+        assert [tile.index for tile in report.tiles if tile.error] == [1, len(job.tiles) - 1]
+        assert "NotamFetcherServerError" in str(report.tiles[1].error)
+        assert json.load(open(path))["complete"] is False
+        assert os.path.exists(path + ".progress")
+
+        tile_api["failing"] = set()
+        tile_api["requests"] = 0
+        report = SnapshotJob(notam_fetcher, path, bounds=BOUNDS, max_concurrency=4).run()
+
+    assert tile_api["requests"] == 2
+    assert report.complete
+    assert report.resumed_tiles == len(job.tiles) - 2
+    assert report.notams == len(job.tiles) + len({tile[0] for tile in job.tiles})
+    assert len(read_snapshot(path)) == report.notams
+    assert not os.path.exists(path + ".progress")
+
+
+def test_snapshot_resumes_after_an_interrupted_write(tile_api: dict[str, Any], tmp_path: Any):
+    path = str(tmp_path / "snapshot.json")
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET", scheduler=RequestScheduler(max_retries=0)) as notam_fetcher:
+        job = SnapshotJob(notam_fetcher, path, bounds=BOUNDS, max_concurrency=4)
+        tile_api["failing"] = {job.tiles[1][:2], job.tiles[-1][:2]}
+        job.run()
+
+        # Cut the last record short, as if the job had been killed while writing it
+        with open(path + ".progress", "r+b") as progress:
+            progress.truncate(os.path.getsize(path + ".progress") - 10)
+
+        tile_api["failing"] = {job.tiles[-1][:2]}
+        tile_api["requests"] = 0
+        report = SnapshotJob(notam_fetcher, path, bounds=BOUNDS, max_concurrency=4).run()
+
+    assert tile_api["requests"] == 3
+    assert report.resumed_tiles == len(job.tiles) - 3
+    with open(path + ".progress") as progress:
+        lines = progress.readlines()
+    assert len(lines) == len(job.tiles)
+    assert all(line.endswith("\n") and json.loads(line) for line in lines)
+
+
+def test_snapshot_ignores_progress_of_another_region(tile_api: dict[str, Any], tmp_path: Any):
+    path = str(tmp_path / "snapshot.json")
+    with open(path + ".progress", "w") as progress:
+        progress.write(json.dumps({"tiling": {"bounds": [0, 0, 1, 1], "radius": 100, "tiles": 1}}) + "\n")
+
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET") as notam_fetcher:
+        job = SnapshotJob(notam_fetcher, path, bounds=BOUNDS)
+        report = job.run()
+
+    assert report.resumed_tiles == 0
+    assert tile_api["requests"] == len(job.tiles)
+
+
+def test_snapshot_starts_over_from_old_progress(tile_api: dict[str, Any], tmp_path: Any):
+    path = str(tmp_path / "snapshot.json")
+    with NotamFetcher("CLIENT_ID", "CLIENT_SECRET", scheduler=RequestScheduler(max_retries=0)) as notam_fetcher:
+        job = SnapshotJob(notam_fetcher, path, bounds=BOUNDS, max_concurrency=4, max_progress_age=600)
+        tile_api["failing"] = {job.tiles[1][:2]}
+        job.run()
+
+        # As if the first run had started an hour ago
+        with open(path + ".progress") as progress:
+            lines = progress.readlines()
+        header = json.loads(lines[0])
+        header["started"] -= 3600
+        with open(path + ".progress", "w") as progress:
+            progress.writelines([json.dumps(header) + "\n"] + lines[1:])
+
+        tile_api["failing"] = set()
+        tile_api["requests"] = 0
+        report = job.run()
+
+    assert report.complete
+    assert report.resumed_tiles == 0
+    assert tile_api["requests"] == len(job.tiles)
@@ -0,0 +1,116 @@
+import pytest
+from notam_fetcher import NotamSpatialIndex
+from notam_fetcher.api_schema import NotamAPIResponse, NotamApiItem
+from notam_fetcher.spatial_index import NotamGeometry, parse_geometry
+
+from typing import Any, Callable
+
+
+def make_item(
+    make_notam_item: Callable[..., dict[str, Any]],
+    notam_id: str,
+    qline: str,
+    geometry: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    item = make_notam_item(notam_id)
+    item["properties"]["coreNOTAMData"]["notamTranslation"][0]["formattedText"] = (
+        f"A0001/24 NOTAMN\nQ) {qline}\nA) KORD\nE) TEST"
+    )
+    if geometry is not None:
+        item["geometry"] = geometry
+    return item
+
+
+@pytest.fixture
+def index(make_notam_item: Callable[..., dict[str, Any]]) -> NotamSpatialIndex:
+    page = {
+        "pageSize": 1000,
+        "pageNum": 1,
+        "totalCount": 5,
+        "totalPages": 1,
+        "items": [
+            # 5 NM around ORD, surface to FL 030
+            make_item(make_notam_item, "ORD", "KZAU/QMRLC/IV/NBO/A/000/030/4159N08754W005"),
+            # 25 NM around ATL, FL 180 to FL 600
+            make_item(make_notam_item, "ATL_HIGH", "KZTL/QRTCA/IV/BO/W/180/600/3338N08426W025"),
+            # 1 NM around IND, no flight levels
+            make_item(make_notam_item, "IND", "KZID/QOBCE/IV/M/A/000/999/3943N08618W001"),
+            # No Q) line position, a point geometry in Denver
+            make_item(
+                make_notam_item,
+                "DEN_POINT",
+                "KZDV/QFAAH////000/999/",
+                {"type": "GeometryCollection", "geometries": [{"type": "Point", "coordinates": [-104.67, 39.86]}]},
+            ),
+            # No position at all
+            make_item(make_notam_item, "NOWHERE", "KZDV/QFAAH////000/999/"),
+        ],
+    }
+    return NotamSpatialIndex.from_pages([NotamAPIResponse.model_validate(page)])
+
+
+def ids(notams: list[Any]) -> list[str]:
+    return [notam.id for notam in notams]
+
+
+def test_parse_geometry(index: NotamSpatialIndex):
+    ord_geometry = index.geometry("ORD")
+    assert ord_geometry is not None
+    assert ord_geometry.lat == pytest.approx(41 + 59 / 60)
+    assert ord_geometry.long == pytest.approx(-(87 + 54 / 60))
+    assert ord_geometry[2:] == (5.0, 0, 30)
+    assert index.geometry("DEN_POINT") == NotamGeometry(39.86, -104.67, 0.0, 0, 999)
+    assert index.geometry("NOWHERE") is None
+    assert len(index) == 5
+
+
+def test_parse_geometry_polygon(make_notam_item: Callable[..., dict[str, Any]]):
+    item = NotamApiItem.model_validate(
+        make_item(
+            make_notam_item,
+            "POLYGON",
+            "KZDV/QFAAH////000/999/",
+            {"type": "Polygon", "coordinates": [[[-105, 39], [-104, 39], [-104, 40], [-105, 40], [-105, 39]]]},
+        )
+    )
+    geometry = parse_geometry(item)
+    assert geometry is not None
+    assert geometry.lat == pytest.approx(39.5)
+    assert 30 < geometry.radius < 40
+
+
+def test_point_and_radius_queries(index: NotamSpatialIndex):
+    assert ids(index.at_point(41.98, -87.90)) == ["ORD"]
+    assert ids(index.at_point(41.98, -87.70)) == []
+    assert ids(index.within_radius(41.98, -87.70, 10)) == ["ORD"]
+    assert ids(index.within_radius(39.86, -104.67, 1)) == ["DEN_POINT"]
+    assert ids(index.within_radius(38, -86, 150)) == ["IND"]
+
+
+def test_bbox_query(index: NotamSpatialIndex):
+    assert ids(index.in_bbox(33, -89, 43, -84)) == ["ORD", "ATL_HIGH", "IND"]
+    assert ids(index.in_bbox(34.0, -84.5, 35, -84)) == ["ATL_HIGH"]
+    assert ids(index.in_bbox(34.1, -84.5, 35, -84)) == []
+
+
+def test_route_query_with_flight_levels(index: NotamSpatialIndex):
+    route = [(41.98, -87.90), (39.72, -86.29), (33.64, -84.43)]
+    assert ids(index.along_route(route, 5)) == ["ORD", "ATL_HIGH", "IND"]
+    assert ids(index.along_route(route, 5, flight_levels=(100, 150))) == ["IND"]
+    assert ids(index.along_route(route, 5, flight_levels=(0, 20))) == ["ORD", "IND"]
+    # Direct ORD to ATL passes about 40 NM east of IND
+    assert ids(index.along_route([route[0], route[2]], 5)) == ["ORD", "ATL_HIGH"]
+
+
+def test_adding_a_notam_again_replaces_it(make_notam_item: Callable[..., dict[str, Any]]):
+    ord_item = NotamApiItem.model_validate(make_item(make_notam_item, "ORD", "KZAU/QMRLC/IV/NBO/A/000/030/4159N08754W005"))
+    moved = NotamApiItem.model_validate(make_item(make_notam_item, "ORD", "KZTL/QMRLC/IV/NBO/A/000/030/3338N08426W005"))
+
+    index = NotamSpatialIndex.from_items([ord_item, ord_item])
+    assert len(index) == 1
+    assert ids(index.at_point(41.98, -87.90)) == ["ORD"]
+
+    index.add(moved.properties.coreNOTAMData.notam, parse_geometry(moved))
+    assert len(index) == 1
+    assert ids(index.at_point(41.98, -87.90)) == []
+    assert ids(index.at_point(33.64, -84.43)) == ["ORD"]
@@ -0,0 +1,114 @@
+from pytest import MonkeyPatch
+import numpy as np
+import os
+import pytest
+from datetime import datetime, timezone
+from notam_fetcher import NotamTable, NotamTableFile, write_table_file
+from notam_fetcher.api_schema import Notam, NotamApiItem
+
+from typing import Any, Callable
+
+
+def make_notams(make_notam_item: Callable[..., dict[str, Any]]) -> list[Notam]:
+    items = [
+        make_notam_item("RWY_CLOSED", selectionCode="QMRLC", effectiveStart="2024-10-03T00:00:00.000Z",
+                        effective_end="2024-10-04T00:00:00.000Z", text="RWY 09/27 CLSD"),
+        make_notam_item("OBSTACLE", selectionCode="QOBCE", effectiveStart="2024-10-01T00:00:00.000Z",
+                        effective_end="PERM", text="CRANE 1.2NM NE ÉLÉVATION 420FT"),
+        make_notam_item("ESTIMATED", selectionCode=None, effectiveStart="2024-10-05T00:00:00.000Z",
+                        effective_end="2024-10-06T00:00EST", text=""),
+    ]
+    return [NotamApiItem.model_validate(item).properties.coreNOTAMData.notam for item in items]
+
+
+def test_round_trip(make_notam_item: Callable[..., dict[str, Any]], tmp_path: Any):
+    notams = make_notams(make_notam_item)
+    table = NotamTable.from_notams(notams)
+    path = str(tmp_path / "notams.tbl")
+    write_table_file(path, table, indexes={"by_start": table.argsort("effective_start")})
+
+    snapshot = NotamTableFile(path)
+    mapped = snapshot.table
+
+    assert list(mapped) == notams
+    assert mapped[-1] == notams[-1]
+    assert list(snapshot.indexes["by_start"]) == [1, 0, 2]
+    assert list(mapped.take(snapshot.indexes["by_start"]).column("id")) == ["OBSTACLE", "RWY_CLOSED", "ESTIMATED"]
+    assert list(mapped.is_permanent) == [False, True, False]
+    assert list(mapped.is_estimated) == [False, False, True]
+    active = mapped.active_at(datetime(2024, 10, 3, 12, tzinfo=timezone.utc))
+    assert list(mapped.filter(active).column("id")) == ["RWY_CLOSED", "OBSTACLE"]
+    assert list(mapped.sort("text").column("id")) == ["ESTIMATED", "OBSTACLE", "RWY_CLOSED"]
+    assert mapped.value_counts("selection_code") == {"QMRLC": 1, "QOBCE": 1, None: 1}
+    # Columns are views of the mapping, not copies
+    assert not mapped.column("effective_start").flags.writeable
+
+
+def test_empty_table(tmp_path: Any):
+    path = str(tmp_path / "notams.tbl")
+    write_table_file(path, NotamTable.from_notams([]))
+    assert len(NotamTableFile(path).table) == 0
+
+
+def test_replace_and_refresh(make_notam_item: Callable[..., dict[str, Any]], tmp_path: Any):
+    notams = make_notams(make_notam_item)
+    path = str(tmp_path / "notams.tbl")
+    write_table_file(path, NotamTable.from_notams(notams[:1]))
+    snapshot = NotamTableFile(path)
+    old_table = snapshot.table
+    assert not snapshot.refresh()
+
+    write_table_file(path, NotamTable.from_notams(notams))
+
+    assert os.listdir(tmp_path) == ["notams.tbl"]
+    assert snapshot.refresh()
+    assert len(snapshot.table) == 3
+    # Tables of the replaced file stay readable
+    assert list(old_table) == notams[:1]
+
+
+def test_invalid_files(make_notam_item: Callable[..., dict[str, Any]], tmp_path: Any):
+    path = str(tmp_path / "notams.tbl")
+    table = NotamTable.from_notams(make_notams(make_notam_item))
+    with pytest.raises(ValueError):
+        write_table_file(path, table, indexes={"ids": table.column("id")})
+    assert os.listdir(tmp_path) == []
+
+    with open(path, "wb") as file:
+        file.write(b"not a table file at all")
+    with pytest.raises(ValueError, match="not a NOTAM table file"):
+        NotamTableFile(path)
+
+    write_table_file(path, table)
+    with open(path, "r+b") as file:
+        file.seek(8)
+        file.write(np.uint32(2).tobytes())
+    with pytest.raises(ValueError, match="version 2"):
+        NotamTableFile(path)
+
+
+def test_file_permissions(make_notam_item: Callable[..., dict[str, Any]], tmp_path: Any):
+    path = str(tmp_path / "notams.tbl")
+    table = NotamTable.from_notams(make_notams(make_notam_item))
+    umask = os.umask(0o022)
+    try:
+        write_table_file(path, table)
+        assert os.stat(path).st_mode & 0o777 == 0o644
+
+        # Replacing a file keeps its permissions
+        os.chmod(path, 0o640)
+        write_table_file(path, table)
+        assert os.stat(path).st_mode & 0o777 == 0o640
+    finally:
+        os.umask(umask)
+
+
+def test_writing_leaves_the_umask_alone(
+    make_notam_item: Callable[..., dict[str, Any]], tmp_path: Any, monkeypatch: MonkeyPatch
+):
+    def umask(mask: int) -> int:
+        raise AssertionError("The umask applies to every thread of the process")
+
+    monkeypatch.setattr(os, "umask", umask)
+    write_table_file(str(tmp_path / "notams.tbl"), NotamTable.from_notams(make_notams(make_notam_item)))
+    assert os.listdir(tmp_path) == ["notams.tbl"]